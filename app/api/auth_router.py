@@ -4,10 +4,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_password, create_access_token, AUTH_PERMS_CLAIMS
 from app.core.deps import get_current_user, require_permission
 from app.schemas.auth_schema import TokenResponse
 from app.models.usuario_model import Usuario
+from app.services.rbac_service import get_user_snapshot, build_permission_claims
+from app.services.perfiles_carga import opciones_carga, PERFIL_MINIMO
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 from app.schemas.auth_schema import MeResponse
@@ -18,13 +20,22 @@ def login(
     db: Session = Depends(get_db),
 ):
     user = db.execute(
-        select(Usuario).where(Usuario.username == form_data.username, Usuario.activo == True)
+        select(Usuario)
+        .where(Usuario.username == form_data.username, Usuario.activo == True)
+        .options(*opciones_carga(Usuario, PERFIL_MINIMO))  # para validar la contraseña no hacen falta roles
     ).scalar_one_or_none()
 
     if not user or not verify_password(form_data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Credenciales inválidas")
 
-    token = create_access_token(subject=str(user.id))
+    extra = None
+    if AUTH_PERMS_CLAIMS:
+        # Token "con permisos": require_permission puede autorizar sin consultar la DB
+        snapshot = get_user_snapshot(db, user.id, perms_version=user.perms_version)
+        if snapshot:
+            extra = build_permission_claims(snapshot)
+
+    token = create_access_token(subject=str(user.id), extra=extra)
     return TokenResponse(access_token=token)
 
 @router.get("/me", response_model=MeResponse)
@@ -32,7 +43,7 @@ def me(
     user = Depends(get_current_user),
 ):
     roles = [r.nombre for r in (user.roles or [])]
-    perms_map = getattr(user, "_perms_map", {})
+    perms_map = user.perms_map
     permissions = {k: list(v) for k, v in perms_map.items()}
 
     return {
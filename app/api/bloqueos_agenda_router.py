@@ -7,6 +7,8 @@ from app.database import get_db
 from app.schemas.bloqueo_agenda_schema import BloqueoAgendaCreate, BloqueoAgendaOut
 from app.models.bloqueo_agenda_model import BloqueoAgenda
 from app.core.deps import get_current_user, require_permission
+from app.services.perfiles_carga import opciones_carga, PERFIL_FOR_UPDATE, PERFIL_API_DETALLE, PERFIL_API_LISTA
+from app.services.cache_agenda import invalidar_agenda
 
 bloqueos_agenda_router = APIRouter(prefix="/bloqueos_agenda", tags=["bloqueos_agenda"])
 
@@ -36,6 +38,7 @@ def crear_bloqueo_agenda(
 
     db.add(bloqueo_agenda)
     try:
+        invalidar_agenda(db, [bloqueo_agenda.profesional_id])
         db.commit()
     except Exception as e:
         db.rollback()
@@ -51,7 +54,7 @@ def obtener_bloqueos_agenda(
     scope: str = Depends(require_permission("agenda.bloqueos.ver")),
 ):
 
-    q = db.query(BloqueoAgenda).filter(BloqueoAgenda.activo == True)
+    q = db.query(BloqueoAgenda).options(*opciones_carga(BloqueoAgenda, PERFIL_API_LISTA)).filter(BloqueoAgenda.activo == True)
 
     if scope == "OWN":
         if not getattr(user, "profesional_id", None):
@@ -67,7 +70,7 @@ def obtener_bloqueo_por_id(
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("agenda.bloqueos.ver")),
 ):
-    bloqueo = db.get(BloqueoAgenda, bloqueo_id)
+    bloqueo = db.get(BloqueoAgenda, bloqueo_id, options=opciones_carga(BloqueoAgenda, PERFIL_API_DETALLE))
     if not bloqueo:
         raise HTTPException(status_code=404, detail="Bloqueo de agenda no encontrado.")
 
@@ -86,7 +89,13 @@ def eliminar_bloqueo(
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("agenda.bloqueos.eliminar")),
 ):
-    bloqueo = db.get(BloqueoAgenda, bloqueo_id)
+    # FOR UPDATE OF bloqueos_agenda: solo la fila del bloqueo
+    bloqueo = db.get(
+        BloqueoAgenda,
+        bloqueo_id,
+        options=opciones_carga(BloqueoAgenda, PERFIL_FOR_UPDATE),
+        with_for_update={"of": BloqueoAgenda},
+    )
     if not bloqueo or not bloqueo.activo:
         raise HTTPException(status_code=404, detail="Bloqueo no encontrado.")
 
@@ -100,5 +109,6 @@ def eliminar_bloqueo(
     bloqueo.eliminado_en = datetime.utcnow()
     bloqueo.eliminado_por_usuario_id = user.id
 
+    invalidar_agenda(db, [bloqueo.profesional_id])
     db.commit()
     return {"ok": True}
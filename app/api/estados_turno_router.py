@@ -1,21 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 estados_turno_router = APIRouter(prefix="/estados_turno", tags=["estados_turno"])  
 
-from app.models.estado_turno_model import EstadoTurno
+from app.services.estados_turno_service import estados_json
 from app.schemas.estado_turno_schema import EstadoTurnoOut
 from app.database import get_db
 
 from app.core.deps import get_current_user, require_permission
+from app.core.condicional import respuesta_condicional
 
 
 @estados_turno_router.get("", response_model=list[EstadoTurnoOut])
 def obtener_estados_turno(
+    request: Request,
     db: Session = Depends(get_db),
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("estados_turno.ver")),
 ):
-    estados = db.query(EstadoTurno).all()
-    return estados
\ No newline at end of file
+    # Catálogo precargado en memoria (y ya serializado): no consulta la DB salvo en la primera carga.
+    # Con If-None-Match vigente devuelve 304 sin cuerpo
+    cuerpo, etag = estados_json(db)
+    return respuesta_condicional(request, cuerpo, etag)
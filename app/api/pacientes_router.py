@@ -1,16 +1,22 @@
 #En este archivo definimos las rutas o endpoints relacionados con la gestión de pacientes.
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.database import get_db
 from app.models.paciente_model import Paciente
 from app.schemas.paciente_schema import PacienteCreate, PacienteOut, PacienteUpdate
+from app.services.busqueda_service import indexar_pacientes, buscar_pacientes
+from app.services.cache_agenda import invalidar_agenda_paciente
+from app.core.paginacion import HEADER_NEXT_CURSOR, codificar_cursor, decodificar_cursor
 
 from app.core.deps import get_current_user, require_permission
 
 paciente_router = APIRouter(prefix = "/pacientes", tags=["pacientes"])
 
+# Los datos del paciente que van en cada turno de GET /api/turnos (TurnoOut.paciente)
+_CAMPOS_EN_AGENDA = frozenset(PacienteOut.model_fields)
+
 @paciente_router.post("", response_model=PacienteOut)
 def crear_paciente(
     payload: PacienteCreate, 
@@ -35,6 +41,8 @@ def crear_paciente(
     )
     db.add(paciente)
     try:
+        db.flush() # para tener el id antes de indexarlo
+        indexar_pacientes(db, [paciente])
         db.commit()
     except Exception as e:
         db.rollback()
@@ -46,14 +54,48 @@ def crear_paciente(
 
 @paciente_router.get("", response_model=list[PacienteOut])
 def obtener_pacientes(
+    response: Response,
+    limit: int = Query(default=200, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
     db: Session = Depends(get_db),
     user  = Depends(get_current_user),
     scope: str = Depends(require_permission("pacientes.ver")),
 ):
-    pacientes = db.query(Paciente).all()
+    """
+    Devuelve pacientes ordenados por id, de a `limit`.
+    - Si hay más resultados, el header X-Next-Cursor trae el cursor de la página siguiente.
+    - Para elegir un paciente (autocompletar) usá /pacientes/buscar.
+    """
+    q = db.query(Paciente)
+    if cursor:
+        (ultimo_id,) = decodificar_cursor(cursor, 1)
+        if not isinstance(ultimo_id, int):
+            raise HTTPException(status_code=400, detail="Cursor inválido.")
+        q = q.filter(Paciente.id > ultimo_id)
+
+    pacientes = q.order_by(Paciente.id.asc()).limit(limit + 1).all()
+    if len(pacientes) > limit:
+        pacientes = pacientes[:limit]
+        response.headers[HEADER_NEXT_CURSOR] = codificar_cursor(pacientes[-1].id)
     return pacientes
 
 
+@paciente_router.get("/buscar", response_model=list[PacienteOut])
+def buscar(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    solo_activos: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    user  = Depends(get_current_user),
+    scope: str = Depends(require_permission("pacientes.ver")),
+):
+    """
+    Autocompletar: pacientes con alguna palabra de nombre, DNI, CUIL o teléfono que empiece con cada palabra de `q`.
+    Sin distinguir mayúsculas ni acentos ("jose mu" encuentra a "José Muñoz"; la ñ no es n).
+    """
+    return buscar_pacientes(db, q, limit=limit, solo_activos=solo_activos)
+
+
 @paciente_router.get("/{paciente_id}", response_model=PacienteOut)
 def obtener_paciente_por_id(
     paciente_id: int, 
@@ -94,10 +136,16 @@ def editar_paciente(
         if 'admin' not in role_names:
             raise HTTPException(status_code=403, detail="Solo admin puede cambiar el estado activo del paciente")
 
+    # Solo lo que de verdad cambia (el frontend manda el formulario entero)
+    cambiados = {field for field, value in data.items() if getattr(paciente, field) != value}
     for field, value in data.items():
         setattr(paciente, field, value)
 
     try:
+        if cambiados & {"nombre", "dni", "cuil", "telefono"}:
+            indexar_pacientes(db, [paciente])
+        if cambiados & _CAMPOS_EN_AGENDA:
+            invalidar_agenda_paciente(db, paciente.id)
         db.commit()
     except Exception as e:
         db.rollback()
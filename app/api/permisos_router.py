@@ -1,19 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.database import get_db
 from app.core.deps import require_permission
+from app.core.condicional import CatalogoJSON, respuesta_condicional, serializar_lista
 from app.models.permiso_model import Permiso
 from app.schemas.permiso_schema import PermisoOut
 
 router = APIRouter(prefix="/permisos", tags=["permisos"])
 
 
+def _cargar_permisos(db: Session) -> bytes:
+    # Solo las columnas de PermisoOut (el modelo trae relaciones selectin que acá no hacen falta)
+    filas = db.execute(select(Permiso.id, Permiso.codigo, Permiso.descripcion).order_by(Permiso.codigo)).all()
+    return serializar_lista(PermisoOut, filas)
+
+
+# Sin endpoints que lo modifiquen (se carga por migraciones): un cambio se ve cuando vence el TTL
+_catalogo_permisos = CatalogoJSON("permisos", _cargar_permisos)
+
+
 @router.get("", response_model=list[PermisoOut])
 def listar_permisos(
+    request: Request,
     db: Session = Depends(get_db),
     _scope: str = Depends(require_permission("auth.usuarios.editar_roles")),
 ):
-    permisos = db.execute(select(Permiso).order_by(Permiso.codigo)).scalars().all()
-    return permisos
+    cuerpo, etag = _catalogo_permisos.obtener(db)
+    return respuesta_condicional(request, cuerpo, etag)
@@ -1,16 +1,30 @@
 # En este archivo definimos las rutas o endpoints relacionados con la gestión de profesionales.
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.profesional_schema import ProfesionalCreate, ProfesionalOut, ProfesionalUpdate
+from app.schemas.disponibilidad_schema import DisponibilidadOut
 from app.models.profesional_model import Profesional
+from app.services.disponibilidad_service import calcular_disponibilidad
+from app.services.busqueda_service import indexar_profesionales
+from app.services.cache_agenda import invalidar_agenda
 
 from app.core.deps import get_current_user, require_permission
+from app.core.condicional import CatalogoJSON, invalidar_catalogo, respuesta_condicional, serializar_lista
 
 
 profesionales_router = APIRouter(prefix="/profesionales", tags=["profesionales"])
 
+
+def _cargar_profesionales(db: Session) -> bytes:
+    return serializar_lista(ProfesionalOut, db.query(Profesional).all())
+
+
+# GET /api/profesionales ya serializado (se invalida al crear o editar un profesional, en cualquier proceso)
+_catalogo_profesionales = CatalogoJSON("profesionales", _cargar_profesionales, clave_gen="catalogo:profesionales")
+
 @profesionales_router.post("", response_model=ProfesionalOut)
 def crear_profesional(
     payload: ProfesionalCreate, 
@@ -26,6 +40,9 @@ def crear_profesional(
 
     db.add(profesional)
     try:
+        db.flush() # para tener el id antes de indexarlo
+        indexar_profesionales(db, [profesional])
+        invalidar_catalogo(db, "profesionales")
         db.commit()
     except Exception as e:
         db.rollback()
@@ -37,12 +54,14 @@ def crear_profesional(
 
 @profesionales_router.get("", response_model=list[ProfesionalOut])
 def obtener_profesionales(
+    request: Request,
     db: Session = Depends(get_db),
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("profesionales.ver")),
 ):
-    profesionales = db.query(Profesional).all()
-    return profesionales
+    # Con If-None-Match vigente devuelve 304 (solo lee la generación del catálogo)
+    cuerpo, etag = _catalogo_profesionales.obtener(db)
+    return respuesta_condicional(request, cuerpo, etag)
 
 @profesionales_router.get("/{profesional_id}", response_model=ProfesionalOut)
 def obtener_profesional_por_id(
@@ -57,6 +76,36 @@ def obtener_profesional_por_id(
     return profesional
 
 
+@profesionales_router.get("/{profesional_id}/disponibilidad", response_model=DisponibilidadOut)
+def obtener_disponibilidad(
+    profesional_id: int,
+    desde: datetime = Query(...),
+    hasta: datetime = Query(...),
+    db: Session = Depends(get_db),
+    user = Depends(get_current_user),
+    scope: str = Depends(require_permission("turnos.ver")),
+):
+    """
+    Huecos reservables del profesional en [desde, hasta): horario laboral menos bloqueos y turnos activos,
+    cortados en slots de `duracion_turno_min`.
+    """
+    # RBAC OWN: solo puede consultar su propia agenda
+    if scope == "OWN":
+        if not getattr(user, "profesional_id", None):
+            raise HTTPException(status_code=403, detail="Usuario sin profesional asociado.")
+        if profesional_id != user.profesional_id:
+            raise HTTPException(status_code=403, detail="No tenés acceso a esta agenda.")
+
+    profesional, slots = calcular_disponibilidad(db, profesional_id, desde, hasta)
+    return {
+        "profesional_id": profesional.id,
+        "duracion_turno_min": profesional.duracion_turno_min,
+        "desde": desde,
+        "hasta": hasta,
+        "slots": [{"fecha_hora_inicio": i, "fecha_hora_fin": f} for i, f in slots],
+    }
+
+
 @profesionales_router.patch("/{profesional_id}", response_model=ProfesionalOut)
 def editar_profesional(
     profesional_id: int,
@@ -80,6 +129,10 @@ def editar_profesional(
         setattr(profesional, field, value)
     
     try:
+        if "nombre" in data:
+            indexar_profesionales(db, [profesional])
+        invalidar_agenda(db, [profesional.id]) # los datos del profesional van en cada turno de su agenda
+        invalidar_catalogo(db, "profesionales")
         db.commit()
     except Exception as e:
         db.rollback()
@@ -1,19 +1,31 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.database import get_db
 from app.core.deps import require_permission
+from app.core.condicional import CatalogoJSON, respuesta_condicional, serializar_lista
 from app.models.rol_model import Rol
 from app.schemas.rol_schema import RolOut
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
 
+def _cargar_roles(db: Session) -> bytes:
+    # Solo las columnas de RolOut (el modelo trae relaciones selectin que acá no hacen falta)
+    filas = db.execute(select(Rol.id, Rol.nombre, Rol.descripcion).order_by(Rol.nombre)).all()
+    return serializar_lista(RolOut, filas)
+
+
+# Sin endpoints que lo modifiquen (se carga por migraciones): un cambio se ve cuando vence el TTL
+_catalogo_roles = CatalogoJSON("roles", _cargar_roles)
+
+
 @router.get("", response_model=list[RolOut])
 def listar_roles(
+    request: Request,
     db: Session = Depends(get_db),
     _scope: str = Depends(require_permission("auth.usuarios.editar_roles")),
 ):
-    roles = db.execute(select(Rol).order_by(Rol.nombre)).scalars().all()
-    return roles
+    cuerpo, etag = _catalogo_roles.obtener(db)
+    return respuesta_condicional(request, cuerpo, etag)
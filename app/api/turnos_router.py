@@ -1,10 +1,11 @@
 # En este archivo definimos las rutas o endpoints relacionados con los pedidos de turnos.
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
-from app.schemas.turno_schema import TurnoOut, TurnoCreate
+from app.schemas.turno_schema import TurnoOut, TurnoCreate, TurnoSerieCreate, TurnoSerieOut, TurnosEventosIn, TurnoEventoResultadoOut
 from app.database import get_db
 from app.models.turno_model import Turno
 from app.models.paciente_model import Paciente
@@ -12,17 +13,25 @@ from app.models.profesional_model import Profesional
 from app.services.notificaciones_service import programar_notifs_creacion_turno
 from app.services.turnos_service import (
     crear_turno as crear_turno_service,
+    crear_serie_turnos,
     validar_solapamiento_paciente,
     validar_solapamiento_profesional,
     hay_bloqueo_agenda,
     aplicar_evento_turno,
+    aplicar_eventos_turnos,
     _estado_id_por_codigo,
     EVENTO_CONFIRMAR,
     EVENTO_CANCELAR,
     EVENTO_COMPLETAR,
     EVENTO_NO_ASISTIO,
-    query_turnos_filtrados,
+    condiciones_turnos_filtrados,
+    obtener_turno_o_archivado,
     )
+from app.services.perfiles_carga import PERFIL_API_DETALLE
+from app.services.turnos_lectura_service import listar_turnos_json, incluir_archivo, exportar_turnos, FORMATOS_EXPORT
+from app.services.cache_agenda import cache_agenda, clave_listado, profesional_de_listado
+from app.core.paginacion import HEADER_NEXT_CURSOR
+from app.core.condicional import calcular_etag, respuesta_condicional
 
 from app.core.deps import get_current_user, require_permission
 from app.services.ownership_service import assert_turno_ownership
@@ -36,6 +45,10 @@ def crear_turno(
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("turnos.crear")),
 ):
+    """
+    Reserva un turno. 400 si el fin no es posterior al inicio o si dura más de 24 h (DURACION_MAXIMA_TURNO:
+    la detección de solapamientos se apoya en esa cota).
+    """
     turno = crear_turno_service(
         db,
         paciente_id = payload.paciente_id,
@@ -49,8 +62,51 @@ def crear_turno(
     return turno
 
 
+@turnos_router.post("/series", response_model=TurnoSerieOut)
+def crear_serie(
+    payload: TurnoSerieCreate,
+    db: Session = Depends(get_db),
+    user = Depends(get_current_user),
+    scope: str = Depends(require_permission("turnos.crear")),
+):
+    """
+    Crea una serie de turnos recurrentes en una sola transacción.
+    Devuelve los turnos creados y las ocurrencias que chocaron (con el motivo).
+    """
+    creados, conflictos = crear_serie_turnos(
+        db,
+        paciente_id = payload.paciente_id,
+        profesional_id = payload.profesional_id,
+        fecha_desde = payload.fecha_desde,
+        dias_semana = payload.dias_semana,
+        hora_inicio = payload.hora_inicio,
+        sesiones = payload.sesiones,
+        duracion_min = payload.duracion_min,
+        todo_o_nada = payload.todo_o_nada,
+        user = user,
+        scope = scope,
+    )
+
+    return {"creados": creados, "conflictos": conflictos}
+
+
+@turnos_router.post("/eventos", response_model=list[TurnoEventoResultadoOut])
+def aplicar_eventos(
+    payload: TurnosEventosIn,
+    db: Session = Depends(get_db),
+    user = Depends(get_current_user),
+):
+    """
+    Aplica varias transiciones (turno_id, evento) en una sola transacción.
+    El permiso se valida por item según el evento (turnos.confirmar, turnos.cancelar, ...).
+    Devuelve un resultado por item: los que fallan (403/404/409) no abortan al resto.
+    """
+    return aplicar_eventos_turnos(db, [(i.turno_id, i.evento) for i in payload.items], user=user)
+
+
 @turnos_router.get("", response_model=list[TurnoOut])
 def obtener_turnos(
+    request: Request,
     db: Session = Depends(get_db),
     profesional_id: int | None = Query(default=None),
     paciente_id: int | None = Query(default=None),
@@ -61,15 +117,77 @@ def obtener_turnos(
     estado: str | None = Query(default=None),
     solo_activos: bool = Query(default=False),
     limit: int = Query(default=200, ge=1, le=1000),
+    cursor: str | None = Query(default=None),
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("turnos.ver")),
 ):
     """
-    Devuelve turnos filtrados.
+    Devuelve turnos filtrados, ordenados por (fecha_hora_inicio, id).
     - Si pasás desde/hasta: devuelve turnos que se solapan con ese rango.
-    - Si no pasás rango: devuelve los últimos `limit` turnos.
+    - Si hay más resultados, el header X-Next-Cursor trae el cursor de la página siguiente
+      (se pasa tal cual en `cursor`, con los mismos filtros).
+    - El cuerpo se arma directo desde filas Core (mismo JSON que list[TurnoOut], sin hidratar ORM).
+    - Incluye los turnos archivados (historial viejo) cuando el rango pedido los alcanza.
+    - Las respuestas se cachean por filtros + alcance RBAC y se invalidan con cada cambio en la agenda
+      del profesional (ver cache_agenda).
+    - Manda ETag: con If-None-Match vigente devuelve 304 sin cuerpo (si la página está en cache,
+      solo lee la generación de la agenda).
+    """
+    filtros = dict(
+        profesional_id = profesional_id,
+        paciente_id = paciente_id,
+        desde = desde,
+        hasta = hasta,
+        paciente_nombre = paciente_nombre,
+        profesional_nombre = profesional_nombre,
+        estado = estado,
+        solo_activos = solo_activos,
+    )
+    clave = clave_listado(scope=scope, user=user, filtros={**filtros, "limit": limit, "cursor": cursor})
+    pagina, generacion = cache_agenda.obtener(
+        db, clave, profesional_de_listado(scope=scope, user=user, profesional_id=profesional_id)
+    )
+    if pagina is None:
+        condiciones = condiciones_turnos_filtrados(db, user=user, scope=scope, **filtros)
+        cuerpo, next_cursor = listar_turnos_json(
+            db,
+            condiciones,
+            limit=limit,
+            cursor=cursor,
+            con_archivo=incluir_archivo(db, desde=desde, solo_activos=solo_activos),
+        )
+        # El cursor entra en el ETag: la misma página puede pasar a tener (o dejar de tener) una siguiente
+        pagina = (cuerpo, next_cursor, calcular_etag(cuerpo, (next_cursor or "").encode()))
+        cache_agenda.guardar(clave, generacion, pagina)
+
+    cuerpo, next_cursor, etag = pagina
+    headers = {HEADER_NEXT_CURSOR: next_cursor} if next_cursor else None
+    return respuesta_condicional(request, cuerpo, etag, headers)
+
+
+@turnos_router.get("/export")
+def exportar(
+    db: Session = Depends(get_db),
+    formato: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    profesional_id: int | None = Query(default=None),
+    paciente_id: int | None = Query(default=None),
+    desde: datetime | None = Query(default=None),
+    hasta: datetime | None = Query(default=None),
+    paciente_nombre: str | None = Query(default=None),
+    profesional_nombre: str | None = Query(default=None),
+    estado: str | None = Query(default=None),
+    solo_activos: bool = Query(default=False),
+    user = Depends(get_current_user),
+    scope: str = Depends(require_permission("turnos.ver")),
+):
+    """
+    Exporta todos los turnos que cumplen los filtros (los mismos que GET /turnos, sin límite), archivados incluidos,
+    ordenados por (fecha_hora_inicio, id).
+    - formato=ndjson: un JSON por línea, igual a cada elemento de GET /turnos.
+    - formato=csv: una fila por turno con paciente, profesional y estado aplanados.
+    Se transmite a medida que se lee (cursor del lado del servidor), así que sirve para años de historial.
     """
-    q =  query_turnos_filtrados(
+    condiciones = condiciones_turnos_filtrados(
         db,
         user = user,
         scope = scope,
@@ -82,11 +200,13 @@ def obtener_turnos(
         estado = estado,
         solo_activos = solo_activos,
     )
+    con_archivo = incluir_archivo(db, desde=desde, solo_activos=solo_activos)
 
-    return (
-        q.order_by(Turno.fecha_hora_inicio.asc())
-        .limit(limit)
-        .all()
+    nombre = f"turnos_{datetime.now():%Y%m%d_%H%M}.{formato}"
+    return StreamingResponse(
+        exportar_turnos(condiciones, formato=formato, con_archivo=con_archivo),
+        media_type=FORMATOS_EXPORT[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'},
     )
 
 
@@ -97,12 +217,7 @@ def obtener_turno_por_id(
     user = Depends(get_current_user),
     scope: str = Depends(require_permission("turnos.ver")),
 ):
-    turno = (
-        db.query(Turno)
-        .options(joinedload(Turno.estado))
-        .filter(Turno.id == turno_id)
-        .first()
-    )
+    turno = obtener_turno_o_archivado(db, turno_id, PERFIL_API_DETALLE)
     if not turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado.")
 
@@ -123,7 +238,6 @@ def confirmar_turno(
     scope: str = Depends(require_permission("turnos.confirmar")),
 ):
     turno = aplicar_evento_turno(db, turno_id, EVENTO_CONFIRMAR, user=user, scope=scope)
-    db.refresh(turno, attribute_names=["estado"])
     return turno
 
 
@@ -135,7 +249,6 @@ def cancelar_turno(
     scope: str = Depends(require_permission("turnos.cancelar")),
 ):
     turno = aplicar_evento_turno(db, turno_id, EVENTO_CANCELAR, user=user, scope=scope)
-    db.refresh(turno, attribute_names=["estado"])
     return turno
 
 
@@ -147,7 +260,6 @@ def completar_turno(
     scope: str = Depends(require_permission("turnos.completar"))
 ):
     turno = aplicar_evento_turno(db, turno_id, EVENTO_COMPLETAR, user=user, scope=scope)
-    db.refresh(turno, attribute_names=["estado"])
     return turno
 
 
@@ -159,5 +271,4 @@ def marcar_no_asistio(
     scope: str = Depends(require_permission("turnos.no_asistio"))
 ):
     turno = aplicar_evento_turno(db, turno_id, EVENTO_NO_ASISTIO, user=user, scope=scope)
-    db.refresh(turno, attribute_names=["estado"])
     return turno
\ No newline at end of file
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.database import get_db
 from app.core.deps import require_permission
 from app.core.security import hash_password
+from app.services.rbac_service import invalidar_cache_usuario, incrementar_perms_version
+from app.services.perfiles_carga import opciones_carga, PERFIL_API_DETALLE, PERFIL_API_LISTA
 
 from app.models.usuario_model import Usuario
 from app.models.rol_model import Rol
@@ -60,6 +62,7 @@ def crear_usuario(
     db.add(u)
     db.commit()
     db.refresh(u)
+    invalidar_cache_usuario(u.id)
 
     # asegura que roles esté disponible para armar response
     _ = u.roles
@@ -74,7 +77,7 @@ def actualizar_roles_usuario(
     db: Session = Depends(get_db),
     scope: str = Depends(require_permission("auth.usuarios.editar_roles")),
 ):
-    u = db.get(Usuario, usuario_id)
+    u = db.get(Usuario, usuario_id, options=opciones_carga(Usuario, PERFIL_API_DETALLE))
     if not u:
         raise HTTPException(status_code=404, detail="Usuario no encontrado.")
 
@@ -84,8 +87,12 @@ def actualizar_roles_usuario(
 
     # Reemplazo total (MVP claro): lo que mandás = lo que queda
     u.roles = roles
+    # Los permisos efectivos cambian: los tokens con la versión anterior dejan de autorizar (en todos los procesos)
+    incrementar_perms_version(db, [u.id])
 
     db.commit()
+    # ... y que el próximo request no use el snapshot cacheado
+    invalidar_cache_usuario(u.id)
     db.refresh(u)
     _ = u.roles
 
@@ -99,7 +106,7 @@ def listar_usuarios(
 ):
     stmt = (
         select(Usuario)
-        .options(selectinload(Usuario.roles))
+        .options(*opciones_carga(Usuario, PERFIL_API_LISTA))
         .order_by(Usuario.id)
     )
     usuarios = db.execute(stmt).scalars().all()
@@ -0,0 +1,114 @@
+# Retención: mueve a tablas de archivo las notificaciones y turnos cerrados más viejos que el horizonte,
+# para que `turnos` y `notificaciones` (y sus índices) solo crezcan con lo que está vivo.
+# No se usa particionado por rango de MySQL porque no admite foreign keys en tablas particionadas.
+#
+# Corre como job (ver app/jobs.py): de a ARCHIVO_LOTE filas por transacción (INSERT ... SELECT + DELETE),
+# con una pausa entre lotes y un tope de tiempo por corrida; lo que no entra queda para la siguiente.
+from datetime import datetime, timedelta
+import logging
+import os
+import time
+
+from sqlalchemy import select, insert, delete, exists, literal
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.notificacion_model import Notificacion
+from app.models.notificacion_archivo_model import NotificacionArchivo
+from app.models.recordatorio_model import Recordatorio
+from app.models.turno_model import Turno
+from app.models.turno_archivo_model import TurnoArchivo
+from app.services.turnos_service import _estado_id_por_codigo
+
+logger = logging.getLogger(__name__)
+
+ARCHIVO_HORIZONTE_DIAS = int(os.getenv("ARCHIVO_HORIZONTE_DIAS", "365"))  # se archiva lo cerrado más viejo que esto
+ARCHIVO_LOTE = int(os.getenv("ARCHIVO_LOTE", "1000"))  # filas por transacción
+ARCHIVO_PAUSA_SEG = float(os.getenv("ARCHIVO_PAUSA_SEG", "0.2"))  # entre lotes, para no acaparar la base
+ARCHIVO_MAX_SEG = float(os.getenv("ARCHIVO_MAX_SEG", "120"))  # tope por corrida
+
+ESTADOS_NOTIF_CERRADOS = ("ENVIADA", "CANCELADA", "FALLIDA")
+CODIGOS_TURNO_CERRADOS = ("COMPLETADO", "CANCELADO", "NO_ASISTIO")
+
+
+def _mover(db: Session, origen, destino, condicion, orden, limite: float) -> int:
+    """
+    Mueve de `origen` a `destino` (mismo id y columnas, más archivado_en) las filas que cumplen `condicion`.
+    Cada lote se toma con FOR UPDATE SKIP LOCKED: si alguien está tocando una fila, queda para otra corrida.
+    """
+    tabla, tabla_archivo = origen.__table__, destino.__table__
+    columnas = [c.key for c in tabla_archivo.columns if c.key != "archivado_en"]
+    total = 0
+    while True:
+        ids = db.execute(
+            select(tabla.c.id)
+            .where(condicion)
+            .order_by(orden)
+            .limit(ARCHIVO_LOTE)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            db.rollback()
+            return total
+
+        db.execute(
+            insert(tabla_archivo).from_select(
+                [*columnas, "archivado_en"],
+                select(*(tabla.c[c] for c in columnas), literal(datetime.utcnow())).where(tabla.c.id.in_(ids)),
+            )
+        )
+        db.execute(delete(tabla).where(tabla.c.id.in_(ids)))
+        db.commit()
+
+        total += len(ids)
+        if len(ids) < ARCHIVO_LOTE or time.monotonic() >= limite:
+            return total
+        time.sleep(ARCHIVO_PAUSA_SEG)
+
+
+def archivar_historico() -> dict:
+    db: Session = SessionLocal()
+    t0 = time.perf_counter()
+    limite = time.monotonic() + ARCHIVO_MAX_SEG
+    conteo = {"notificaciones": 0, "turnos": 0}
+    try:
+        corte = datetime.utcnow() - timedelta(days=ARCHIVO_HORIZONTE_DIAS)
+
+        # 1) Notificaciones primero: un turno solo se puede mover cuando ya no tiene notificaciones vivas (FK)
+        conteo["notificaciones"] = _mover(
+            db,
+            Notificacion,
+            NotificacionArchivo,
+            # proxima_ejecucion >= programada_para siempre: el rango va sobre idx_notif_estado_proxima
+            Notificacion.estado.in_(ESTADOS_NOTIF_CERRADOS) & (Notificacion.proxima_ejecucion < corte),
+            Notificacion.proxima_ejecucion,
+            limite,
+        )
+
+        # 2) Turnos cerrados que terminaron antes del corte (índice idx_turno_estado_fin). Los que todavía tienen
+        #    notificaciones o filas en recordatorios (tabla heredada, FK sin archivo) se quedan en turnos
+        estados_cerrados = [_estado_id_por_codigo(db, c) for c in CODIGOS_TURNO_CERRADOS]
+        conteo["turnos"] = _mover(
+            db,
+            Turno,
+            TurnoArchivo,
+            Turno.estado_id.in_(estados_cerrados)
+            & (Turno.fecha_hora_fin < corte)
+            & ~exists().where(Notificacion.turno_id == Turno.id)
+            & ~exists().where(Recordatorio.turno_id == Turno.id),
+            Turno.fecha_hora_fin,
+            limite,
+        )
+    except Exception:
+        db.rollback()
+        logger.exception("Archivado falló (lo ya commiteado queda aplicado): %s", conteo)
+        raise
+    finally:
+        db.close()
+
+    conteo["duracion_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    if conteo["notificaciones"] or conteo["turnos"]:
+        logger.info(
+            "Archivado: %(notificaciones)d notificaciones y %(turnos)d turnos en %(duracion_ms)sms", conteo
+        )
+    return conteo
@@ -0,0 +1,121 @@
+# Interfaz común de los adaptadores de canal (WhatsApp, Telegram, SMS) y las piezas que comparten:
+# errores tipados y un circuit breaker por proveedor.
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CanalError(Exception):
+    """
+    Error al enviar por un canal. `reintentable=False` es un rechazo definitivo del proveedor
+    (ej: destino inválido): reintentarlo no sirve, la notificación pasa directo a FALLIDA.
+    """
+
+    def __init__(self, mensaje: str, *, reintentable: bool = True):
+        super().__init__(mensaje)
+        self.reintentable = reintentable
+
+
+class CircuitoAbierto(CanalError):
+    # El proveedor viene fallando: no se le pega hasta que pase la pausa (no cuenta como intento)
+    def __init__(self, nombre: str, reintentar_en_seg: float):
+        super().__init__(f"Circuito abierto para {nombre}")
+        self.reintentar_en_seg = reintentar_en_seg
+
+
+class CircuitBreaker:
+    """
+    Cerrado -> abierto tras `umbral` fallas seguidas; abierto -> semiabierto al pasar `pausa_seg`, donde
+    se deja pasar un solo pedido de prueba: si anda se cierra, si falla vuelve a abrirse otra pausa.
+    """
+
+    def __init__(self, nombre: str, *, umbral: int, pausa_seg: float):
+        self.nombre = nombre
+        self.umbral = umbral
+        self.pausa_seg = pausa_seg
+        self._fallas = 0
+        self._abierto_hasta: float | None = None
+        self._probando = False
+        self._lock = threading.Lock()
+
+    def permitir(self) -> float:
+        # 0 si se puede enviar; si no, cuántos segundos faltan para volver a probar
+        with self._lock:
+            if self._abierto_hasta is None:
+                return 0.0
+            faltan = self._abierto_hasta - time.monotonic()
+            if faltan > 0:
+                return faltan
+            if self._probando:
+                return self.pausa_seg  # ya hay un pedido de prueba en vuelo
+            self._probando = True
+            return 0.0
+
+    def exito(self) -> None:
+        with self._lock:
+            if self._abierto_hasta is not None:
+                logger.info("Circuito cerrado: %s", self.nombre)
+            self._fallas = 0
+            self._abierto_hasta = None
+            self._probando = False
+
+    def falla(self) -> None:
+        with self._lock:
+            self._fallas += 1
+            if self._probando or self._fallas >= self.umbral:
+                logger.warning("Circuito abierto por %ss: %s", self.pausa_seg, self.nombre)
+                self._abierto_hasta = time.monotonic() + self.pausa_seg
+                self._probando = False
+
+
+class Adaptador:
+    """
+    Envía mensajes por un canal. Los adaptadores concretos implementan `_enviar_lote`; el despachador llama
+    a `enviar_lote` con hasta `max_lote` envíos (1 si el proveedor no tiene envío en lote), desde varios hilos.
+    """
+
+    canal: str = ""
+    max_lote: int = 1
+
+    def __init__(self, breaker: CircuitBreaker | None = None):
+        self.breaker = breaker
+
+    def enviar_lote(self, envios: list[tuple[str, str]]) -> list[str | CanalError]:
+        """
+        `envios` son (destino, mensaje). Devuelve, en el mismo orden, el id del proveedor o el error de cada uno.
+        Nunca levanta: una falla del pedido entero (timeout, 5xx, conexión) es el mismo error para todos.
+        """
+        if self.breaker is not None:
+            faltan = self.breaker.permitir()
+            if faltan > 0:
+                return [CircuitoAbierto(self.breaker.nombre, faltan)] * len(envios)
+        try:
+            resultados = self._enviar_lote(envios)
+        except Exception as e:
+            error = e if isinstance(e, CanalError) else CanalError(f"{type(e).__name__}: {e}")
+            if self.breaker is not None and error.reintentable:
+                self.breaker.falla()
+            return [error] * len(envios)
+        if self.breaker is not None:
+            self.breaker.exito()
+        return resultados
+
+    def _enviar_lote(self, envios: list[tuple[str, str]]) -> list[str | CanalError]:
+        raise NotImplementedError
+
+    def cerrar(self) -> None:
+        pass
+
+
+class AdaptadorStub(Adaptador):
+    # Para desarrollo: canales sin proveedor configurado solo imprimen
+    def __init__(self, canal: str):
+        super().__init__()
+        self.canal = canal
+
+    def _enviar_lote(self, envios):
+        for destino, mensaje in envios:
+            print(f"[SEND:{self.canal}] {destino}: {mensaje}")
+        return ["stub-id"] * len(envios)
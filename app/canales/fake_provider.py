@@ -0,0 +1,139 @@
+"""
+Proveedor de mensajería falso para pruebas de carga sin salir a internet. Habla el protocolo de AdaptadorHTTP
+para cualquier canal (/v1/<canal>/mensajes y /v1/<canal>/mensajes/lote), con latencia y errores configurables.
+
+    python -m app.canales.fake_provider --puerto 8099 --latencia-ms 80 --tasa-error 0.02
+    NOTIF_WHATSAPP_URL=http://127.0.0.1:8099/v1/whatsapp NOTIF_WHATSAPP_LOTE=50 python -m app.worker
+
+GET /stats devuelve cuántos pedidos, mensajes y conexiones TCP recibió (para ver que el keep-alive funcione).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+
+
+@dataclass
+class ConfigFake:
+    latencia_ms: float = 50.0  # por pedido (media; desvío de un cuarto)
+    latencia_por_msg_ms: float = 1.0  # extra por cada mensaje de un lote
+    tasa_error: float = 0.0  # fracción de pedidos que responden 503
+    tasa_rechazo: float = 0.0  # fracción de mensajes rechazados en forma definitiva (400 / error no reintentable)
+    lote_max: int = 100
+    stats: dict = field(default_factory=lambda: {"pedidos": 0, "mensajes": 0, "conexiones": 0, "errores": 0})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    config: ConfigFake
+    _ids = count(1)
+    _lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        self._contar("conexiones")
+
+    def _contar(self, clave: str, n: int = 1):
+        with self._lock:
+            self.config.stats[clave] += n
+
+    def _responder(self, estado: int, cuerpo: dict):
+        datos = json.dumps(cuerpo).encode()
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _demorar(self, mensajes: int):
+        c = self.config
+        ms = max(0.0, random.gauss(c.latencia_ms, c.latencia_ms / 4)) + c.latencia_por_msg_ms * mensajes
+        time.sleep(ms / 1000)
+
+    def _resultado(self) -> dict:
+        if random.random() < self.config.tasa_rechazo:
+            return {"error": "destino inválido", "reintentable": False}
+        return {"id": f"fake-{next(self._ids)}"}
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self._lock:
+                return self._responder(200, dict(self.config.stats))
+        self._responder(404, {"error": "no existe"})
+
+    def do_POST(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        try:
+            cuerpo = json.loads(self.rfile.read(largo) or b"{}")
+        except ValueError:
+            return self._responder(400, {"error": "JSON inválido"})
+        partes = self.path.strip("/").split("/")  # v1/<canal>/mensajes[/lote]
+        if len(partes) not in (3, 4) or partes[0] != "v1" or partes[2] != "mensajes":
+            return self._responder(404, {"error": "no existe"})
+        es_lote = len(partes) == 4 and partes[3] == "lote"
+        mensajes = (cuerpo.get("mensajes") or []) if es_lote else [cuerpo]
+        if es_lote and not 0 < len(mensajes) <= self.config.lote_max:
+            return self._responder(400, {"error": f"lote de 1 a {self.config.lote_max} mensajes"})
+
+        self._contar("pedidos")
+        self._demorar(len(mensajes))
+        if random.random() < self.config.tasa_error:
+            self._contar("errores")
+            return self._responder(503, {"error": "proveedor no disponible"})
+        self._contar("mensajes", len(mensajes))
+        if es_lote:
+            return self._responder(200, {"resultados": [self._resultado() for _ in mensajes]})
+        r = self._resultado()
+        self._responder(200 if "id" in r else 400, r)
+
+    def log_message(self, *args):
+        pass  # sin una línea por pedido
+
+
+def crear_servidor(config: ConfigFake, host: str = "127.0.0.1", puerto: int = 0) -> ThreadingHTTPServer:
+    servidor = ThreadingHTTPServer((host, puerto), type("Handler", (_Handler,), {"config": config}))
+    servidor.daemon_threads = True
+    return servidor
+
+
+def iniciar_servidor(config: ConfigFake, host: str = "127.0.0.1", puerto: int = 0) -> ThreadingHTTPServer:
+    # Levanta el servidor en un hilo (puerto 0 = uno libre, ver server.server_address) para usarlo desde un benchmark
+    servidor = crear_servidor(config, host, puerto)
+    threading.Thread(target=servidor.serve_forever, name="fake-provider", daemon=True).start()
+    return servidor
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Proveedor de mensajería falso")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--puerto", type=int, default=8099)
+    ap.add_argument("--latencia-ms", type=float, default=50.0)
+    ap.add_argument("--latencia-por-msg-ms", type=float, default=1.0)
+    ap.add_argument("--tasa-error", type=float, default=0.0, help="fracción de pedidos que responden 503")
+    ap.add_argument("--tasa-rechazo", type=float, default=0.0, help="fracción de mensajes rechazados (no reintentable)")
+    ap.add_argument("--lote-max", type=int, default=100)
+    args = ap.parse_args()
+    config = ConfigFake(
+        latencia_ms=args.latencia_ms,
+        latencia_por_msg_ms=args.latencia_por_msg_ms,
+        tasa_error=args.tasa_error,
+        tasa_rechazo=args.tasa_rechazo,
+        lote_max=args.lote_max,
+    )
+    servidor = crear_servidor(config, args.host, args.puerto)
+    print(f"Proveedor fake en http://{args.host}:{args.puerto}/v1/<canal>  (Ctrl+C para salir)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print("stats:", config.stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Adaptador HTTP/JSON sobre un pool de conexiones keep-alive (http.client, sin dependencias nuevas).
+#
+# Protocolo (el del proveedor fake, ver fake_provider.py; para un proveedor real se hereda y se pisan
+# `_armar_uno` / `_armar_lote` / `_leer_lote`):
+#   POST {url}/mensajes       {"destino", "mensaje"}                  -> {"id"}
+#   POST {url}/mensajes/lote  {"mensajes": [{"destino", "mensaje"}]}  -> {"resultados": [{"id"} | {"error", "reintentable"}]}
+import http.client
+import json
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.canales.base import Adaptador, CanalError, CircuitBreaker
+
+# Errores típicos de una conexión keep-alive que el servidor cerró por inactividad
+_CONEXION_VIEJA = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class PoolHTTP:
+    """
+    Conexiones persistentes a un host, compartidas entre hilos: como mucho `max_conexiones` en uso a la vez
+    (el resto espera), y las libres se reusan en orden LIFO para que las más viejas puedan expirar. Una libre
+    que lleva más de `max_ocioso_seg` sin uso se cierra en vez de reusarla (el servidor probablemente ya la cerró).
+    """
+
+    def __init__(self, url_base: str, *, max_conexiones: int, timeout_seg: float, max_ocioso_seg: float = 4.0):
+        partes = urlsplit(url_base)
+        self._clase = http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        self._host = partes.hostname
+        self._puerto = partes.port
+        self._prefijo = partes.path.rstrip("/")
+        self._timeout = timeout_seg
+        self._max_ocioso = max_ocioso_seg
+        self._libres: queue.LifoQueue = queue.LifoQueue()  # (conexión, cuándo se liberó)
+        self._cupo = threading.BoundedSemaphore(max_conexiones)
+
+    def post_json(self, ruta: str, cuerpo: dict, headers: dict | None = None) -> tuple[int, dict]:
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode()
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive", **(headers or {})}
+        with self._cupo:
+            conn, reusada = self._tomar()
+            try:
+                conn.request("POST", self._prefijo + ruta, body=datos, headers=headers)
+            except _CONEXION_VIEJA:
+                conn.close()
+                if not reusada:
+                    raise
+                # El pedido no llegó a salir (el servidor había cerrado la conexión ociosa): se manda una vez por
+                # una nueva
+                conn = self._nueva()
+                try:
+                    conn.request("POST", self._prefijo + ruta, body=datos, headers=headers)
+                except Exception:
+                    conn.close()
+                    raise
+            except Exception:
+                conn.close()
+                raise
+            try:
+                resp = conn.getresponse()
+                estado, crudo, cerrar = resp.status, resp.read(), resp.will_close
+            except _CONEXION_VIEJA as e:
+                conn.close()
+                # El pedido ya salió y el proveedor pudo haberlo aceptado: reenviarlo acá podría mandar el mensaje
+                # dos veces. Vuelve como error reintentable y decide el backoff de la notificación.
+                raise CanalError(f"Conexión cortada esperando la respuesta ({type(e).__name__})") from e
+            except Exception:
+                conn.close()  # estado desconocido (ej: timeout a mitad de respuesta): no vuelve al pool
+                raise
+            if cerrar:
+                conn.close()
+            else:
+                self._libres.put((conn, time.monotonic()))
+        try:
+            return estado, json.loads(crudo) if crudo else {}
+        except ValueError:
+            return estado, {"error": crudo[:200].decode(errors="replace")}
+
+    def _tomar(self) -> tuple[http.client.HTTPConnection, bool]:
+        # (conexión, si es reusada)
+        while True:
+            try:
+                conn, liberada = self._libres.get_nowait()
+            except queue.Empty:
+                return self._nueva(), False
+            if time.monotonic() - liberada <= self._max_ocioso:
+                return conn, True
+            conn.close()
+
+    def _nueva(self) -> http.client.HTTPConnection:
+        return self._clase(self._host, self._puerto, timeout=self._timeout)
+
+    def cerrar(self) -> None:
+        while True:
+            try:
+                conn, _ = self._libres.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+
+class AdaptadorHTTP(Adaptador):
+    def __init__(
+        self,
+        canal: str,
+        url_base: str,
+        *,
+        token: str | None = None,
+        max_lote: int = 1,
+        max_conexiones: int = 4,
+        timeout_seg: float = 10.0,
+        max_ocioso_seg: float = 4.0,
+        breaker: CircuitBreaker | None = None,
+    ):
+        super().__init__(breaker)
+        self.canal = canal
+        self.max_lote = max(1, max_lote)
+        self._pool = PoolHTTP(
+            url_base, max_conexiones=max_conexiones, timeout_seg=timeout_seg, max_ocioso_seg=max_ocioso_seg
+        )
+        self._headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _enviar_lote(self, envios):
+        if len(envios) == 1:
+            estado, cuerpo = self._pool.post_json("/mensajes", self._armar_uno(*envios[0]), self._headers)
+            self._verificar(estado, cuerpo)
+            return [str(cuerpo["id"])]
+        estado, cuerpo = self._pool.post_json("/mensajes/lote", self._armar_lote(envios), self._headers)
+        self._verificar(estado, cuerpo)
+        return self._leer_lote(cuerpo, len(envios))
+
+    def _armar_uno(self, destino: str, mensaje: str) -> dict:
+        return {"destino": destino, "mensaje": mensaje}
+
+    def _armar_lote(self, envios) -> dict:
+        return {"mensajes": [self._armar_uno(d, m) for d, m in envios]}
+
+    def _leer_lote(self, cuerpo: dict, cantidad: int) -> list[str | CanalError]:
+        resultados = cuerpo.get("resultados") or []
+        if len(resultados) != cantidad:
+            raise CanalError(f"Respuesta de lote con {len(resultados)} resultados para {cantidad} mensajes")
+        return [
+            str(r["id"]) if "id" in r else CanalError(str(r.get("error")), reintentable=bool(r.get("reintentable", True)))
+            for r in resultados
+        ]
+
+    def _verificar(self, estado: int, cuerpo: dict) -> None:
+        if 200 <= estado < 300:
+            return
+        detalle = f"HTTP {estado}: {cuerpo.get('error', '')}"[:500]
+        # 429 y 5xx son del proveedor (reintentar, y cuentan para el circuito); el resto de 4xx es del pedido
+        raise CanalError(detalle, reintentable=estado == 429 or estado >= 500)
+
+    def cerrar(self) -> None:
+        self._pool.cerrar()
@@ -0,0 +1,56 @@
+# Un adaptador por canal y por proceso (así el pool de conexiones se reusa entre corridas del despachador).
+# Se configuran por variables de entorno, ej. para WhatsApp:
+#
+#     NOTIF_WHATSAPP_URL=https://proveedor/v1/whatsapp   (sin URL el canal usa el stub que imprime)
+#     NOTIF_WHATSAPP_TOKEN=...
+#     NOTIF_WHATSAPP_LOTE=50                             (1 = el proveedor no tiene envío en lote)
+#
+# Para probar contra el proveedor fake: NOTIF_WHATSAPP_URL=http://127.0.0.1:8099/v1/whatsapp
+import os
+import threading
+
+from app.canales.base import Adaptador, AdaptadorStub, CircuitBreaker
+from app.canales.http_json import AdaptadorHTTP
+
+NOTIF_HTTP_TIMEOUT_SEG = float(os.getenv("NOTIF_HTTP_TIMEOUT_SEG", "10"))
+# Las conexiones se abren a demanda: el tope real es la concurrencia del canal (NOTIF_LIMITES)
+NOTIF_HTTP_CONEXIONES = int(os.getenv("NOTIF_HTTP_CONEXIONES", "16"))
+# Una conexión libre más vieja que esto se descarta: menor que el keep-alive del proveedor
+NOTIF_HTTP_OCIOSO_SEG = float(os.getenv("NOTIF_HTTP_OCIOSO_SEG", "4"))
+NOTIF_CIRCUITO_FALLAS = int(os.getenv("NOTIF_CIRCUITO_FALLAS", "5"))  # fallas seguidas para abrir
+NOTIF_CIRCUITO_PAUSA_SEG = float(os.getenv("NOTIF_CIRCUITO_PAUSA_SEG", "30"))
+
+_adaptadores: dict[str, Adaptador] = {}
+_lock = threading.Lock()
+
+
+def _crear(canal: str) -> Adaptador:
+    prefijo = f"NOTIF_{canal.upper()}_"
+    url = os.getenv(prefijo + "URL")
+    if not url:
+        return AdaptadorStub(canal)
+    return AdaptadorHTTP(
+        canal,
+        url,
+        token=os.getenv(prefijo + "TOKEN"),
+        max_lote=int(os.getenv(prefijo + "LOTE", "1")),
+        max_conexiones=NOTIF_HTTP_CONEXIONES,
+        timeout_seg=NOTIF_HTTP_TIMEOUT_SEG,
+        max_ocioso_seg=NOTIF_HTTP_OCIOSO_SEG,
+        breaker=CircuitBreaker(canal, umbral=NOTIF_CIRCUITO_FALLAS, pausa_seg=NOTIF_CIRCUITO_PAUSA_SEG),
+    )
+
+
+def obtener_adaptador(canal: str) -> Adaptador:
+    with _lock:
+        adaptador = _adaptadores.get(canal)
+        if adaptador is None:
+            adaptador = _adaptadores[canal] = _crear(canal)
+        return adaptador
+
+
+def cerrar_adaptadores() -> None:
+    with _lock:
+        for adaptador in _adaptadores.values():
+            adaptador.cerrar()
+        _adaptadores.clear()
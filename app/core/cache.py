@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Registro de caches del proceso (para exponer métricas en /health/cache)
+CACHES: dict[str, "TTLCache"] = {}
+
+_SIN_VALOR = object()
+
+
+class TTLCache:
+    """
+    Cache en memoria acotada (LRU) con vencimiento por TTL.
+    Es por proceso: con N workers cada uno tiene la suya, el TTL acota lo desactualizado.
+    """
+
+    def __init__(self, nombre: str, *, maxsize: int, ttl_seg: float):
+        self.nombre = nombre
+        self.maxsize = maxsize
+        self.ttl_seg = ttl_seg
+        self._datos: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        CACHES[nombre] = self
+
+    def get(self, clave: Hashable, default: Any = None) -> Any:
+        ahora = time.monotonic()
+        with self._lock:
+            item = self._datos.get(clave, _SIN_VALOR)
+            if item is _SIN_VALOR:
+                self.misses += 1
+                return default
+            vence, valor = item
+            if vence <= ahora:
+                del self._datos[clave]
+                self.misses += 1
+                return default
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def set(self, clave: Hashable, valor: Any) -> None:
+        vence = time.monotonic() + self.ttl_seg
+        with self._lock:
+            self._datos[clave] = (vence, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def invalidate(self, clave: Hashable) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._datos),
+                "maxsize": self.maxsize,
+                "ttl_seg": self.ttl_seg,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
@@ -0,0 +1,105 @@
+# GET condicional (ETag / If-None-Match) para los catálogos y los listados de la agenda, que el frontend vuelve a
+# pedir una y otra vez aunque casi nunca cambian.
+#
+# El ETag es un hash del cuerpo ya serializado, calculado una sola vez y guardado junto a él (en CatalogoJSON, en
+# el registro de estados o en cache_agenda). Si el cliente manda el ETag vigente se contesta 304 sin volver a
+# consultar ni serializar. Como sale del contenido, todos los workers dan el mismo ETag para los mismos datos.
+#
+# Que el ETag sea el vigente depende de que el cuerpo guardado lo sea: cache_agenda y los catálogos con escrituras
+# (clave_gen) se validan contra los contadores de app/core/generaciones.py, así que un cambio commiteado en otro
+# proceso se ve en el siguiente request. Los catálogos sin clave_gen (sin endpoints que los modifiquen) pueden
+# servir el cuerpo y el ETag viejos hasta CATALOGO_CACHE_TTL_SEG después de un cambio hecho a mano.
+from functools import lru_cache
+import hashlib
+import os
+from typing import Callable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core import generaciones
+from app.core.cache import TTLCache
+
+CATALOGO_CACHE_TTL_SEG = float(os.getenv("CATALOGO_CACHE_TTL_SEG", "60"))  # tope para los catálogos sin clave_gen
+
+# El navegador guarda la respuesta pero revalida siempre (con If-None-Match); nada compartido la guarda
+HEADERS_CONDICIONAL = {"Cache-Control": "private, no-cache"}
+
+
+def calcular_etag(*partes: bytes) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        h.update(parte)
+        h.update(b"\0")
+    return f'"{h.hexdigest()}"'
+
+
+def coincide_etag(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparación débil (RFC 9110): W/"x" es el mismo "x" (los proxies que comprimen le agregan el W/)
+    return any(v.strip().removeprefix("W/") == etag for v in if_none_match.split(","))
+
+
+def respuesta_condicional(request: Request, cuerpo: bytes, etag: str, headers: dict | None = None) -> Response:
+    headers = {**HEADERS_CONDICIONAL, **(headers or {}), "ETag": etag}
+    if coincide_etag(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cuerpo, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _adaptador_lista(schema) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def serializar_lista(schema, objetos) -> bytes:
+    # El mismo JSON que armaría FastAPI con response_model=list[schema]
+    adaptador = _adaptador_lista(schema)
+    return adaptador.dump_json(adaptador.validate_python(list(objetos), from_attributes=True))
+
+
+# ---- Catálogos chicos: el JSON entero + su ETag, por proceso ----
+
+CATALOGOS: dict[str, "CatalogoJSON"] = {}
+
+
+class CatalogoJSON:
+    """
+    JSON completo de un catálogo y su ETag. Se recarga (con `cargar(db) -> bytes`) cuando vence el TTL o, si tiene
+    `clave_gen`, cuando una escritura commiteada en cualquier proceso llamó a invalidar_catalogo().
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        cargar: Callable[[Session], bytes],
+        *,
+        clave_gen: str | None = None,
+        ttl_seg: float = CATALOGO_CACHE_TTL_SEG,
+    ):
+        self.nombre = nombre
+        self.clave_gen = clave_gen
+        self._cargar = cargar
+        # Clave = generación: lo que se cargó antes de una invalidación queda guardado con una generación vieja
+        # y nadie lo vuelve a pedir
+        self._cache = TTLCache(f"catalogo_{nombre}", maxsize=1, ttl_seg=ttl_seg)
+        CATALOGOS[nombre] = self
+
+    def obtener(self, db: Session) -> tuple[bytes, str]:
+        # Leída antes de cargar: si algo se commitea mientras tanto, lo cargado queda con la generación vieja
+        generacion = generaciones.leer(db, (self.clave_gen,)) if self.clave_gen else None
+        pagina = self._cache.get(generacion)
+        if pagina is None:
+            cuerpo = self._cargar(db)
+            pagina = (cuerpo, calcular_etag(cuerpo))
+            self._cache.set(generacion, pagina)
+        return pagina
+
+
+def invalidar_catalogo(db: Session, nombre: str) -> None:
+    # En la transacción de la escritura: si hay rollback no pasó nada
+    generaciones.incrementar(db, [CATALOGOS[nombre].clave_gen])
@@ -4,29 +4,35 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.core.security import decode_token
-from app.services.rbac_service import get_user_with_roles_and_permissions, build_permissions_map, has_permission
+from app.services.rbac_service import (
+    get_user_snapshot, has_permission, perms_version_conocida, scope_efectivo, scopes_desde_claims, tiene_claims_permisos,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-):
+def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    # Se decodifica una sola vez por request (FastAPI cachea la dependencia)
     try:
         payload = decode_token(token)
         sub = payload.get("sub")
         if not sub:
             raise ValueError("missing sub")
-        user_id = int(sub)
+        int(sub)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido o expirado")
+    return payload
 
-    user = get_user_with_roles_and_permissions(db, user_id)
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    payload: dict = Depends(get_token_payload),
+):
+    user_id = int(payload["sub"])
+
+    # Snapshot inmutable (usuario + roles + mapa de permisos), cacheado por user_id
+    user = get_user_snapshot(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado o inactivo")
-
-    # Adjuntamos el mapa de permisos al objeto (sin ensuciar el modelo permanentemente)
-    user._perms_map = build_permissions_map(user)  # type: ignore[attr-defined]
     return user
 
 
@@ -36,15 +42,31 @@ def require_permission(code: str):
       - "ANY" si lo tiene
       - "OWN" si solo tiene OWN
     Si no lo tiene -> 403
+
+    Si el token trae claims de permisos (ver AUTH_PERMS_CLAIMS) y su versión es la que el proceso conoce de
+    usuarios.perms_version, se autoriza sin consultar la DB (ver perms_version_conocida).
     """
-    def _dep(user=Depends(get_current_user)):
-        perms_map = getattr(user, "_perms_map", {})
-        scopes = has_permission(perms_map, code)
-
-        if "ANY" in scopes:
-            return "ANY"
-        if "OWN" in scopes:
-            return "OWN"
+    def _dep(
+        db: Session = Depends(get_db),
+        payload: dict = Depends(get_token_payload),
+    ):
+        scopes = None
+        version = None
+        if tiene_claims_permisos(payload):
+            version = perms_version_conocida(db, int(payload["sub"]), payload["pv"])
+            if version is None:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado o inactivo")
+            scopes = scopes_desde_claims(payload, code, version)
+        if scopes is None:
+            # Sin claims o con versión vieja: se resuelve con el usuario real (cache/DB, de la versión vigente)
+            user = get_user_snapshot(db, int(payload["sub"]), perms_version=version)
+            if not user:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado o inactivo")
+            scopes = has_permission(user.perms_map, code)
+
+        scope = scope_efectivo(scopes)
+        if scope:
+            return scope
 
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f"Falta permiso: {code}")
 
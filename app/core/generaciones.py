@@ -0,0 +1,53 @@
+# Contadores de generación en la base (tabla generaciones), compartidos por todos los procesos: API con varios
+# workers, app.worker, scripts. Una cache en memoria guarda con cada entrada la generación que leyó ANTES de
+# consultar, y la entrada sirve mientras esa generación siga siendo la actual.
+#
+# - incrementar() va en la transacción de la escritura: el cambio y la nueva generación se ven juntos al commitear.
+# - leer() es una lectura por PK; suma_prefijo() un rango chico sobre la PK (la suma de contadores que solo crecen
+#   cambia con cualquier incremento).
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.generacion_model import Generacion
+
+_ULTIMO_CARACTER = "\x7f"  # la clave es ascii
+
+
+def incrementar(db: Session, claves) -> None:
+    # Siempre en el mismo orden: dos escrituras que tocan varias claves no se bloquean cruzadas
+    claves = sorted(set(claves))
+    if not claves:
+        return
+    filas = [{"clave": c, "gen": 1} for c in claves]
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "mysql":
+        stmt = mysql_insert(Generacion).values(filas)
+        db.execute(stmt.on_duplicate_key_update(gen=Generacion.gen + 1))
+    elif dialecto == "sqlite":
+        stmt = sqlite_insert(Generacion).values(filas)
+        db.execute(stmt.on_conflict_do_update(index_elements=["clave"], set_={"gen": Generacion.gen + 1}))
+    else:
+        # Otros motores: UPDATE y alta de las que faltan (puede chocar con un alta concurrente)
+        db.execute(
+            update(Generacion).where(Generacion.clave.in_(claves)).values(gen=Generacion.gen + 1),
+            execution_options={"synchronize_session": False},
+        )
+        existentes = set(db.execute(select(Generacion.clave).where(Generacion.clave.in_(claves))).scalars())
+        nuevas = [f for f in filas if f["clave"] not in existentes]
+        if nuevas:
+            db.execute(insert(Generacion), nuevas)
+
+
+def leer(db: Session, claves: tuple[str, ...]) -> tuple[int, ...]:
+    # Las que no tienen fila todavía valen 0
+    actuales = dict(db.execute(select(Generacion.clave, Generacion.gen).where(Generacion.clave.in_(claves))).all())
+    return tuple(actuales.get(c, 0) for c in claves)
+
+
+def suma_prefijo(db: Session, prefijo: str) -> int:
+    return db.execute(
+        select(func.coalesce(func.sum(Generacion.gen), 0))
+        .where(Generacion.clave >= prefijo, Generacion.clave < prefijo + _ULTIMO_CARACTER)
+    ).scalar_one()
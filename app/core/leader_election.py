@@ -0,0 +1,84 @@
+# Elección de líder entre procesos con GET_LOCK de MySQL: el lock vive mientras viva la conexión que lo tomó,
+# así que si el proceso líder muere (o se cae su conexión) MySQL lo libera solo y otro worker lo toma
+# en su próximo intento (failover dentro de un intervalo del job).
+import logging
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app import database
+
+logger = logging.getLogger(__name__)
+
+
+class LiderGetLock:
+    """
+    Liderazgo sobre un nombre (ej: "turnero:job:procesar_notificaciones").
+    Mantiene una conexión dedicada fuera del pool de requests mientras es líder.
+    En motores sin GET_LOCK (ej: SQLite en desarrollo) siempre es líder: se asume un solo proceso.
+    """
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+
+    def es_lider(self) -> bool:
+        # Se llama antes de cada corrida: confirma que el lock sigue siendo nuestro o intenta tomarlo (sin esperar)
+        with self._lock:
+            if database.engine.dialect.name != "mysql":
+                return True
+            if self._conn is not None:
+                if self._sigue_siendo_lider():
+                    return True
+                self._descartar_conexion()
+                logger.warning("Se perdió el liderazgo de %s", self.nombre)
+            return self._intentar_tomar()
+
+    def liberar(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(text("SELECT RELEASE_LOCK(:n)"), {"n": self.nombre})
+            except Exception:
+                pass
+            self._descartar_conexion()
+
+    def _intentar_tomar(self) -> bool:
+        conn = None
+        try:
+            conn = database.engine.connect()
+            obtenido = conn.execute(text("SELECT GET_LOCK(:n, 0)"), {"n": self.nombre}).scalar()
+            conn.commit()  # no dejar la transacción implícita abierta (el lock es por sesión, no por transacción)
+        except Exception:
+            logger.exception("No se pudo intentar tomar el liderazgo de %s", self.nombre)
+            if conn is not None:
+                conn.close()
+            return False
+        if obtenido == 1:
+            self._conn = conn
+            logger.info("Liderazgo tomado: %s", self.nombre)
+            return True
+        conn.close()
+        return False
+
+    def _sigue_siendo_lider(self) -> bool:
+        try:
+            duenio, propia = self._conn.execute(
+                text("SELECT IS_USED_LOCK(:n), CONNECTION_ID()"), {"n": self.nombre}
+            ).one()
+            self._conn.commit()
+            return duenio is not None and duenio == propia
+        except Exception:
+            return False
+
+    def _descartar_conexion(self) -> None:
+        conn, self._conn = self._conn, None
+        try:
+            # invalidate: la conexión no vuelve al pool (si tenía el lock, MySQL lo suelta al cerrarse)
+            conn.invalidate()
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,40 @@
+# Cursores opacos para paginación keyset: el cliente solo los reenvía, no tiene que interpretarlos.
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+HEADER_NEXT_CURSOR = "X-Next-Cursor"
+
+
+def _a_json(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    return valor
+
+
+def _desde_json(valor: Any) -> Any:
+    if isinstance(valor, dict) and "dt" in valor:
+        return datetime.fromisoformat(valor["dt"])
+    return valor
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """
+    codificar_cursor(turno.fecha_hora_inicio, turno.id) -> "WyJ7..."  (base64url, sin padding)
+    """
+    crudo = json.dumps([_a_json(v) for v in valores], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, cantidad: int) -> list[Any]:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = [_desde_json(v) for v in json.loads(crudo)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    return valores
@@ -10,6 +10,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# Opt-in: el token incluye el mapa de permisos compacto ("perms") y su versión ("pv")
+AUTH_PERMS_CLAIMS = os.getenv("AUTH_PERMS_CLAIMS", "0") == "1"
 
 
 def hash_password(password: str) -> str:
@@ -0,0 +1,80 @@
+# Jobs periódicos del sistema. Con varios workers (gunicorn -w N) cada proceso puede tener su scheduler,
+# pero los jobs que requieren líder corren solo en el proceso que tiene su lock (ver core/leader_election.py).
+import functools
+import logging
+import os
+
+from app.archivado import archivar_historico
+from app.canales.registro import cerrar_adaptadores
+from app.core.leader_election import LiderGetLock
+from app.scheduler import _procesar_turnos_sistema
+from app.notificaciones_scheduler import procesar_notificaciones
+from app.notificaciones_timer import TemporizadorNotificaciones
+
+logger = logging.getLogger(__name__)
+
+# "0" en los procesos de la API cuando los jobs corren en un worker aparte (python -m app.worker)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+PREFIJO_LOCK = os.getenv("JOBS_LOCK_PREFIJO", "turnero:job:")
+# Con el temporizador (default) las notificaciones se despachan cuando vencen y el job periódico solo reconcilia;
+# con NOTIF_TIMER=0 se vuelve al polling cada 30s. La reconciliación es lo que levanta lo encolado desde otros
+# procesos (ej: la API con SCHEDULER_ENABLED=0 y los jobs en app.worker), así que acota esa demora.
+NOTIF_TIMER = os.getenv("NOTIF_TIMER", "1") == "1"
+NOTIF_RECONCILIAR_SEG = int(os.getenv("NOTIF_RECONCILIAR_SEG", "60"))
+ARCHIVO_INTERVALO_SEG = int(os.getenv("ARCHIVO_INTERVALO_SEG", "3600"))
+
+temporizador = TemporizadorNotificaciones() if NOTIF_TIMER else None
+
+# (nombre, función, intervalo en segundos, requiere líder)
+# El despacho de notificaciones no necesita líder: cada corrida reclama su lote con un lease,
+# así que correrlo en todos los procesos reparte la carga en vez de duplicar envíos.
+JOBS = [
+    ("procesar_turnos_sistema", _procesar_turnos_sistema, 60, True),
+    ("archivar_historico", archivar_historico, ARCHIVO_INTERVALO_SEG, True),
+    ("reconciliar_notificaciones", temporizador.reconciliar, NOTIF_RECONCILIAR_SEG, False)
+    if temporizador is not None
+    else ("procesar_notificaciones", procesar_notificaciones, 30, False),
+]
+
+_lideres: dict[str, LiderGetLock] = {}
+
+
+def solo_lider(nombre: str, fn):
+    lider = _lideres.setdefault(nombre, LiderGetLock(PREFIJO_LOCK + nombre))
+
+    @functools.wraps(fn)
+    def _job():
+        if not lider.es_lider():
+            return None  # otro proceso tiene el lock: este intervalo no hace nada
+        return fn()
+
+    return _job
+
+
+def registrar_jobs(scheduler) -> None:
+    # coalesce + max_instances=1: si una corrida se atrasa no se apilan ni se solapan
+    for nombre, fn, segundos, requiere_lider in JOBS:
+        scheduler.add_job(
+            solo_lider(nombre, fn) if requiere_lider else fn,
+            "interval",
+            seconds=segundos,
+            id=nombre,
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+        )
+    if temporizador is not None:
+        temporizador.iniciar()
+
+
+def liberar_liderazgos() -> None:
+    for lider in _lideres.values():
+        lider.liberar()
+
+
+def detener_jobs() -> None:
+    # Llamar después de apagar el scheduler
+    if temporizador is not None:
+        temporizador.detener()
+    cerrar_adaptadores()
+    liberar_liderazgos()
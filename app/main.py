@@ -6,15 +6,15 @@ from app.api.bloqueos_agenda_router import bloqueos_agenda_router
 from app.api.estados_turno_router import estados_turno_router
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from app.scheduler import _procesar_turnos_sistema
+from app.jobs import registrar_jobs, detener_jobs, SCHEDULER_ENABLED
 scheduler = BackgroundScheduler()
 
-from app.notificaciones_scheduler import procesar_notificaciones
-
 from app.api.auth_router import router as auth_router
 from app.api.usuarios_router import router as usuarios_router
 from app.api.roles_router import router as roles_router
 from app.api.permisos_router import router as permisos_router
+from app.core.cache import CACHES
+from app.services.estados_turno_service import instalar_senal_refresco
 
 app = FastAPI(title="Sistema de Gestión de Turnos")
 app.include_router(turnos_router, prefix="/api")
@@ -31,14 +31,26 @@ app.include_router(permisos_router, prefix="/api")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/health/cache")
+def cache_stats():
+    return {nombre: c.stats() for nombre, c in CACHES.items()}
+
+@app.on_event("startup")
+def instalar_senales():
+    # kill -HUP recarga el catálogo de estados_turno en memoria
+    instalar_senal_refresco()
+
 @app.on_event("startup")
 def start_scheduler():
-    if not scheduler.running:
-        scheduler.add_job(_procesar_turnos_sistema, "interval", seconds=60)
-        scheduler.add_job(procesar_notificaciones, "interval", seconds=30)
+    # Con SCHEDULER_ENABLED=0 los jobs corren en otro proceso (python -m app.worker).
+    # Si está habilitado en varios workers, cada job corre solo en el que tenga su lock (app/jobs.py).
+    if SCHEDULER_ENABLED and not scheduler.running:
+        registrar_jobs(scheduler)
         scheduler.start()
 
 
 @app.on_event("shutdown")
 def shutdown_scheduler():
-    scheduler.shutdown()
\ No newline at end of file
+    if scheduler.running:
+        scheduler.shutdown()
+    detener_jobs()
\ No newline at end of file
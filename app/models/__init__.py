@@ -4,6 +4,12 @@ from app.models.profesional_model import Profesional
 from app.models.estado_turno_model import EstadoTurno
 from app.models.bloqueo_agenda_model import BloqueoAgenda
 from app.models.notificacion_model import Notificacion
+from app.models.recordatorio_model import Recordatorio
+from app.models.horario_laboral_model import HorarioLaboral
+from app.models.turno_archivo_model import TurnoArchivo
+from app.models.notificacion_archivo_model import NotificacionArchivo
+from app.models.token_busqueda_model import TokenBusqueda
+from app.models.generacion_model import Generacion
 
 from app.models.usuario_model import Usuario
 from app.models.rol_model import Rol
@@ -19,12 +19,13 @@ class BloqueoAgenda(Base):
     eliminado_por_usuario_id = Column(Integer, ForeignKey("usuarios.id", ondelete="SET NULL"), nullable=True)
     activo = Column(Boolean, nullable=False, server_default=text("1"))
 
-    profesional = relationship("Profesional", lazy="joined")
-    creado_por = relationship("Usuario", foreign_keys=[creado_por_usuario_id], lazy="joined")
-    actualizado_por = relationship("Usuario", foreign_keys=[actualizado_por_usuario_id], lazy="joined")
-    eliminado_por = relationship("Usuario", foreign_keys=[eliminado_por_usuario_id], lazy="joined")
+    # Sin lazy="joined": cada consulta elige qué cargar (ver services/perfiles_carga.py)
+    profesional = relationship("Profesional")
+    creado_por = relationship("Usuario", foreign_keys=[creado_por_usuario_id])
+    actualizado_por = relationship("Usuario", foreign_keys=[actualizado_por_usuario_id])
+    eliminado_por = relationship("Usuario", foreign_keys=[eliminado_por_usuario_id])
 
     __table_args__ = (
         CheckConstraint('fecha_hora_inicio < fecha_hora_fin', name='chk_bloqueo_fechas'),
-        Index("idx_bloq_prof_activo", "profesional_id", "activo"),
+        Index("idx_bloq_prof_activo_rango", "profesional_id", "activo", "fecha_hora_inicio", "fecha_hora_fin"),
     )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, BigInteger
+from app.database import Base
+
+# Contadores compartidos por todos los procesos para invalidar caches en memoria (ver app/core/generaciones.py).
+# Una fila por clave ("agenda:12", "catalogo:profesionales", ...); solo crecen. En MySQL la clave es ascii_bin, así que
+# un prefijo es un rango sobre la PK.
+class Generacion(Base):
+    __tablename__ = "generaciones"
+
+    clave = Column(String(40), primary_key=True)
+    gen = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, SmallInteger, Time, Boolean, ForeignKey, CheckConstraint, Index, text
+from app.database import Base
+
+class HorarioLaboral(Base):
+    __tablename__ = "horarios_laborales"
+
+    id = Column(Integer, primary_key=True)
+    profesional_id = Column(Integer, ForeignKey("profesionales.id"), nullable=False)
+    dia_semana = Column(SmallInteger, nullable=False)  # 1 = lunes ... 7 = domingo (ISO)
+    hora_inicio = Column(Time, nullable=False)
+    hora_fin = Column(Time, nullable=False)
+    activo = Column(Boolean, nullable=False, server_default=text("1"))
+
+    __table_args__ = (
+        CheckConstraint("dia_semana between 1 and 7", name="chk_dia_semana"),
+        CheckConstraint("hora_inicio < hora_fin", name="chk_horas_validas"),
+        Index("fk_horario_profesional", "profesional_id"),
+    )
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, Enum, Index, JSON
+from app.database import Base
+
+# Notificaciones cerradas (ENVIADA/CANCELADA/FALLIDA) más viejas que el horizonte de retención,
+# movidas desde `notificaciones` con el mismo id (ver app/archivado.py).
+# Sin FK a turnos: el turno puede seguir vivo o estar en turnos_archivo.
+class NotificacionArchivo(Base):
+    __tablename__ = "notificaciones_archivo"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+
+    turno_id = Column(Integer, nullable=True)
+    paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
+
+    canal = Column(Enum("whatsapp", "telegram", "sms", name="canal_notif"), nullable=False)
+    tipo = Column(String(30), nullable=False)
+
+    parametros = Column(JSON)
+    mensaje = Column(Text)
+    programada_para = Column(DateTime, nullable=False)
+    proxima_ejecucion = Column(DateTime, nullable=False)
+
+    estado = Column(Enum("PENDIENTE", "ENVIADA", "FALLIDA", "CANCELADA", name="estado_notif"), nullable=False)
+    intentos = Column(Integer, nullable=False)
+    ultimo_error = Column(Text)
+
+    proveedor_msg_id = Column(String(100))
+
+    creado_en = Column(DateTime)
+    enviada_en = Column(DateTime)
+    cancelada_en = Column(DateTime)
+
+    dedupe_key = Column(String(120), nullable=False)
+
+    archivado_en = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_notif_arch_turno", "turno_id"),
+        Index("idx_notif_arch_programada", "programada_para"),
+    )
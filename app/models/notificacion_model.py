@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, Enum
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Text, Enum, Index, JSON
 from app.database import Base
 
+def _proxima_por_defecto(context):
+    # El primer intento es cuando está programada; los reintentos la corren (ver calcular_proxima_ejecucion)
+    return context.get_current_parameters()["programada_para"]
+
 class Notificacion(Base):
     __tablename__ = "notificaciones"
 
@@ -12,8 +16,12 @@ class Notificacion(Base):
     canal = Column(Enum("whatsapp", "telegram", "sms", name="canal_notif"), nullable=False)
     tipo = Column(String(30), nullable=False)
 
-    mensaje = Column(Text, nullable=False)
+    # El texto se arma al enviar con la plantilla del tipo y estos parámetros (ver plantillas_notificaciones);
+    # `mensaje` solo para texto libre y las filas de antes de las plantillas
+    parametros = Column(JSON)
+    mensaje = Column(Text)
     programada_para = Column(DateTime, nullable=False)
+    proxima_ejecucion = Column(DateTime, nullable=False, default=_proxima_por_defecto)
 
     estado = Column(Enum("PENDIENTE", "ENVIADA", "FALLIDA", "CANCELADA", name="estado_notif"),
                     nullable=False, default="PENDIENTE")
@@ -27,3 +35,12 @@ class Notificacion(Base):
     cancelada_en = Column(DateTime)
 
     dedupe_key = Column(String(120), nullable=False, unique=True)
+
+    # Reclamo (lease) del despachador que la está enviando: mientras reclamada_hasta no venza, nadie más la toma
+    reclamada_por = Column(String(100))
+    reclamada_hasta = Column(DateTime)
+
+    __table_args__ = (
+        # Pendientes listas para (re)intentar, en orden (ver notificaciones_service.reclamar_notificaciones)
+        Index("idx_notif_estado_proxima", "estado", "proxima_ejecucion"),
+    )
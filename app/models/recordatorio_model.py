@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Boolean, Index, text
+from app.database import Base
+
+# Tabla heredada del esquema original (la app ya no escribe acá: los recordatorios van por notificaciones).
+# Se mapea por su FK a turnos, que el archivado tiene que respetar.
+class Recordatorio(Base):
+    __tablename__ = "recordatorios"
+
+    id = Column(Integer, primary_key=True)
+    turno_id = Column(Integer, ForeignKey("turnos.id", name="fk_recordatorio_turno"), nullable=False)
+    fecha_envio = Column(DateTime, nullable=False)
+    enviado = Column(Boolean, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        Index("fk_recordatorio_turno", "turno_id"),
+    )
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Index
+from app.database import Base
+
+# Índice invertido para búsquedas por prefijo (autocompletar, filtros por nombre): una fila por palabra normalizada de cada entidad
+# (minúsculas y sin acentos salvo la ñ, como utf8mb4_spanish_ci; ver app/services/busqueda_service.py).
+# La PK (entidad, token, entidad_id) hace que `token LIKE 'abc%'` sea un rango sobre el índice.
+# En MySQL la columna token es utf8mb4_bin: el plegado ya se hizo al indexar.
+class TokenBusqueda(Base):
+    __tablename__ = "tokens_busqueda"
+
+    entidad = Column(String(20), primary_key=True)  # "paciente" / "profesional"
+    token = Column(String(64), primary_key=True)
+    entidad_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    __table_args__ = (
+        # Para reemplazar los tokens de una entidad cuando se edita y para verificar las demás palabras
+        # de una búsqueda sobre cada candidato (entidad_id fijo + rango de token)
+        Index("idx_token_busq_entidad_id", "entidad", "entidad_id", "token"),
+    )
@@ -0,0 +1,40 @@
+from sqlalchemy import (Column, Integer, DateTime, ForeignKey, Index)
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+# Turnos cerrados (COMPLETADO/CANCELADO/NO_ASISTIO) más viejos que el horizonte de retención,
+# movidos desde `turnos` con el mismo id (ver app/archivado.py). Los listados los leen junto con los vivos.
+class TurnoArchivo(Base):
+    __tablename__ = "turnos_archivo"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
+    profesional_id = Column(Integer, ForeignKey("profesionales.id"), nullable=False)
+    estado_id = Column(Integer, ForeignKey("estados_turno.id"), nullable=False)
+
+    fecha_hora_inicio = Column(DateTime, nullable=False)
+    fecha_hora_fin = Column(DateTime, nullable=False)
+
+    creado_en = Column(DateTime, nullable=False)
+    confirmado_en = Column(DateTime, nullable=True)
+    cancelado_en = Column(DateTime, nullable=True)
+
+    creado_por_usuario_id = Column(Integer, nullable=True)
+    actualizado_por_usuario_id = Column(Integer, nullable=True)
+    actualizado_en = Column(DateTime, nullable=True)
+
+    archivado_en = Column(DateTime, nullable=False)
+
+    # Mismos nombres que en Turno, para responder con TurnoOut
+    estado = relationship("EstadoTurno")
+    paciente = relationship("Paciente")
+    profesional = relationship("Profesional")
+
+    __table_args__ = (
+        # Listados ordenados por (fecha_hora_inicio, id), con o sin filtro de entidad
+        Index("idx_turno_arch_inicio", "fecha_hora_inicio"),
+        Index("idx_turno_arch_prof_inicio", "profesional_id", "fecha_hora_inicio"),
+        Index("idx_turno_arch_pac_inicio", "paciente_id", "fecha_hora_inicio"),
+        # Hasta dónde llega el archivo (ver turnos_lectura_service: se saltea si el rango pedido es posterior)
+        Index("idx_turno_arch_fin", "fecha_hora_fin"),
+    )
@@ -23,19 +23,18 @@ class Turno(Base):
     actualizado_en = Column(DateTime, nullable=True)
 
     #relationships para devolver estado.codigo, etc al frontend
-    estado = relationship("EstadoTurno", lazy="joined")
-    paciente = relationship("Paciente", lazy="joined")
-    profesional = relationship("Profesional", lazy="joined")
+    # Sin lazy="joined": cada consulta elige qué cargar (ver services/perfiles_carga.py)
+    estado = relationship("EstadoTurno")
+    paciente = relationship("Paciente")
+    profesional = relationship("Profesional")
 
     creado_por = relationship(
         "Usuario",
         foreign_keys=[creado_por_usuario_id],
-        lazy="joined"
     )
     actualizado_por = relationship(
         "Usuario",
         foreign_keys=[actualizado_por_usuario_id],
-        lazy="joined"
     )
 
     __table_args__ = (
@@ -43,4 +42,12 @@ class Turno(Base):
         UniqueConstraint("paciente_id", "fecha_hora_inicio", name="uq_turno_pac_inicio"),
         Index("idx_turno_creado_por", "creado_por_usuario_id"),
         Index("idx_turno_actualizado_por", "actualizado_por_usuario_id"),
+        # Listados ordenados por (fecha_hora_inicio, id) sin filtro de entidad (InnoDB agrega el PK al índice)
+        Index("idx_turno_inicio", "fecha_hora_inicio"),
+        # Detección de solapamientos (ver turnos_service.detectar_conflicto_turno)
+        Index("idx_turno_prof_estado_rango", "profesional_id", "estado_id", "fecha_hora_inicio", "fecha_hora_fin"),
+        Index("idx_turno_pac_estado_rango", "paciente_id", "estado_id", "fecha_hora_inicio", "fecha_hora_fin"),
+        # Sweeper de app/scheduler.py: reservas vencidas (RESERVADO por creado_en) y no asistidos (CONFIRMADO por fin)
+        Index("idx_turno_estado_creado", "estado_id", "creado_en"),
+        Index("idx_turno_estado_fin", "estado_id", "fecha_hora_fin"),
     )
\ No newline at end of file
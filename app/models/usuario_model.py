@@ -12,13 +12,16 @@ class Usuario(Base):
     email = Column(String(120), unique=True)
     password_hash = Column(String(255), nullable=False)
     activo = Column(Boolean, nullable=False, server_default="1")
+    # Se incrementa con cada cambio de roles o de activo: invalida los permisos firmados en tokens (AUTH_PERMS_CLAIMS)
+    perms_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     profesional_id = Column(Integer, ForeignKey("profesionales.id", ondelete="SET NULL"))
 
     creado_en = Column(DateTime, nullable=False, server_default=func.current_timestamp())
     ultimo_login_en = Column(DateTime)
 
-    profesional = relationship("Profesional", lazy="joined")
+    # Sin lazy="joined": cada consulta elige qué cargar (ver services/perfiles_carga.py)
+    profesional = relationship("Profesional")
 
     roles = relationship(
         "Rol",
@@ -1,36 +1,254 @@
-from datetime import datetime
+# Despacho de notificaciones pendientes: se trae un lote, los envíos se reparten en un pool de hilos por canal
+# (cada canal con su propia concurrencia y, si se configura, tasa máxima) y los resultados se graban en bloque
+# cada tanto.
+# Un proveedor lento solo frena a su canal, no a los demás. El envío en sí lo hace el adaptador de cada canal
+# (app/canales): conexiones keep-alive, envío en lote si el proveedor lo tiene y circuit breaker.
+#
+# Cada corrida reclama su lote con un lease (ver notificaciones_service.reclamar_notificaciones), así que se pueden
+# correr varios despachadores en paralelo sin envíos duplicados. El lease se renueva mientras quedan envíos en
+# curso; lo que se cancela o se pierde en el medio ya no se manda.
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+import logging
+import os
+import socket
+import threading
+import time
+
+from sqlalchemy import update, bindparam, select
 from sqlalchemy.orm import Session
 
+from app.canales.base import Adaptador, CanalError, CircuitoAbierto
+from app.canales.registro import obtener_adaptador
 from app.database import SessionLocal
-from app.services.notificaciones_service import obtener_notificaciones_pendientes
+from app.models.notificacion_model import Notificacion
+from app.models.paciente_model import Paciente
+from app.services.notificaciones_service import reclamar_notificaciones, renovar_lease, resultado_fallo
+from app.services.plantillas_notificaciones import renderizar_lote
+
+logger = logging.getLogger(__name__)
+
+NOTIF_LOTE = int(os.getenv("NOTIF_LOTE", "500"))  # notificaciones por corrida
+NOTIF_COMMIT_CADA = int(os.getenv("NOTIF_COMMIT_CADA", "50"))  # resultados por commit
+# Se renueva cada NOTIF_LEASE_SEG/3 mientras la corrida sigue: solo vence si el despachador murió o no llega a la DB
+NOTIF_LEASE_SEG = int(os.getenv("NOTIF_LEASE_SEG", "300"))
+WORKER_ID = os.getenv("NOTIF_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _parsear_limites(valor: str) -> dict[str, tuple[int, float | None]]:
+    # "whatsapp:8:20,sms:4" -> {"whatsapp": (8 envíos simultáneos, 20 por segundo), "sms": (4, sin tope de tasa)}
+    limites = {}
+    for item in filter(None, (x.strip() for x in valor.split(","))):
+        canal, concurrencia, *por_seg = item.split(":")
+        limites[canal] = (int(concurrencia), float(por_seg[0]) if por_seg else None)
+    return limites
+
+
+# La tasa por segundo es opcional: se pone solo si el proveedor tiene un límite (un tope de más frena el despacho
+# por debajo del loop de a uno); sin ella el canal va tan rápido como su concurrencia y la latencia del proveedor.
+LIMITES_CANAL = _parsear_limites(os.getenv("NOTIF_LIMITES", "whatsapp:8,telegram:8,sms:4"))
+LIMITE_DEFAULT = (2, None)
+
+
+class TokenBucket:
+    """
+    Limita a `tasa` operaciones por segundo (con ráfagas de hasta `capacidad`). Compartido entre hilos.
+    """
+
+    def __init__(self, tasa: float, capacidad: float | None = None):
+        self.tasa = tasa
+        self.capacidad = capacidad if capacidad is not None else max(1.0, tasa)
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
 
-def _enviar_stub(canal: str, mensaje: str) -> str:
-    # Acá mañana lo reemplazamos por Twilio/Meta/lo que sea.
-    print(f"[SEND:{canal}] {mensaje}")
-    return "stub-id"
+    def tomar(self) -> None:
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.tasa
+            time.sleep(espera)
 
-def procesar_notificaciones():
+
+def _resultado_envio(notif_id: int, intentos: int, respuesta: str | CanalError, ahora: datetime) -> dict:
+    if isinstance(respuesta, CircuitoAbierto):
+        # No se llegó a intentar: se corre para cuando el circuito vuelva a probar, sin gastar un intento
+        return {
+            "id": notif_id,
+            "ultimo_error": str(respuesta),
+            "proxima_ejecucion": ahora + timedelta(seconds=respuesta.reintentar_en_seg),
+        }
+    if isinstance(respuesta, CanalError):
+        if not respuesta.reintentable:
+            return {"id": notif_id, "intentos": intentos + 1, "estado": "FALLIDA", "ultimo_error": str(respuesta)[:2000]}
+        # Reintento con backoff, o FALLIDA si ya agotó MAX_INTENTOS
+        return {"id": notif_id, **resultado_fallo(intentos + 1, str(respuesta)[:2000], ahora)}
+    return {
+        "id": notif_id,
+        "intentos": intentos + 1,
+        "estado": "ENVIADA",
+        "proveedor_msg_id": respuesta,
+        "enviada_en": ahora,
+        "ultimo_error": None,
+    }
+
+
+def _enviar_lote(
+    adaptador: Adaptador, bucket: TokenBucket | None, trabajos: list[tuple], descartadas: set[int]
+) -> list[dict]:
+    # Corre en un hilo del pool del canal: no toca la sesión de DB, solo devuelve los resultados a grabar.
+    # trabajos: (notif_id, intentos, destino, mensaje); el límite de tasa (si el canal tiene) es por mensaje,
+    # vayan en lote o no.
+    # descartadas: ids que se cancelaron o cuyo lease se perdió mientras esperaban turno (no se mandan)
+    trabajos = [t for t in trabajos if t[0] not in descartadas]
+    if bucket is not None:
+        for _ in trabajos:
+            bucket.tomar()
+        trabajos = [t for t in trabajos if t[0] not in descartadas]
+    if not trabajos:
+        return []
+    respuestas = adaptador.enviar_lote([(destino, mensaje) for _, _, destino, mensaje in trabajos])
+    ahora = datetime.utcnow()
+    return [_resultado_envio(notif_id, intentos, r, ahora) for (notif_id, intentos, _, _), r in zip(trabajos, respuestas)]
+
+
+def _grabar_resultados(db: Session, resultados: list[dict], worker_id: str) -> None:
+    """
+    UPDATE en bloque (executemany), agrupado por columnas para que cada grupo vaya en un solo batch.
+    Solo se graban las filas que este worker sigue teniendo reclamadas y siguen PENDIENTE (una cancelada en el
+    medio queda CANCELADA), y se libera el lease.
+    """
+    grupos: dict[tuple, list[dict]] = {}
+    for r in resultados:
+        grupos.setdefault(tuple(sorted(r)), []).append(r)
+    tabla = Notificacion.__table__
+    for columnas, filas in grupos.items():
+        stmt = (
+            update(tabla)
+            .where(
+                tabla.c.id == bindparam("b_id"),
+                tabla.c.reclamada_por == bindparam("b_worker"),
+                tabla.c.estado == "PENDIENTE",
+            )
+            .values({
+                **{c: bindparam(f"v_{c}") for c in columnas if c != "id"},
+                "reclamada_por": None,
+                "reclamada_hasta": None,
+            })
+        )
+        db.execute(stmt, [
+            {**{f"v_{c}": f[c] for c in columnas if c != "id"}, "b_id": f["id"], "b_worker": worker_id}
+            for f in filas
+        ])
+    db.commit()
+
+
+def procesar_notificaciones(
+    adaptadores: dict[str, Adaptador] | None = None, limit: int | None = None, worker_id: str | None = None
+) -> dict:
+    # adaptadores: canal -> adaptador, para pisar los configurados (ver canales/registro.py)
+    adaptadores = adaptadores or {}
+    worker_id = worker_id or WORKER_ID
     db: Session = SessionLocal()
+    t0 = time.perf_counter()
+    conteo = {"enviadas": 0, "reintentos": 0, "diferidas": 0, "fallidas": 0}
     try:
         ahora = datetime.utcnow()
-        pendientes = obtener_notificaciones_pendientes(db, ahora, limit=50)
-
+        pendientes = reclamar_notificaciones(db, worker_id, ahora, limit=limit or NOTIF_LOTE, lease_seg=NOTIF_LEASE_SEG)
+        pacientes = {
+            p.id: p for p in db.execute(
+                select(Paciente.id, Paciente.nombre, Paciente.telefono)
+                .where(Paciente.id.in_({n.paciente_id for n in pendientes}))
+            )
+        } if pendientes else {}
+        mensajes = renderizar_lote(db, pendientes, {i: p.nombre for i, p in pacientes.items()})
+        # Los hilos trabajan con tuplas, nunca con objetos ORM de esta sesión
+        por_canal: dict[str, list[tuple]] = {}
+        no_armadas = []
         for n in pendientes:
-            try:
-                n.intentos += 1
-                proveedor_id = _enviar_stub(n.canal, n.mensaje)
-                n.proveedor_msg_id = proveedor_id
-                n.estado = "ENVIADA"
-                n.enviada_en = datetime.utcnow()
-                n.ultimo_error = None
-                db.add(n)
-                db.commit()
-            except Exception as e:
-                # n.estado = "FALLIDA"
-                # n.ultimo_error = str(e)
-                # db.add(n)
-                # db.commit()
-                db.rollback()
+            mensaje, paciente = mensajes[n.id], pacientes.get(n.paciente_id)
+            if isinstance(mensaje, Exception) or paciente is None:
+                # Sin plantilla o sin datos para armarla: reintentar no lo arregla
+                error = f"No se pudo armar el mensaje: {mensaje!r}" if paciente else "No existe el paciente"
+                no_armadas.append({"id": n.id, "intentos": n.intentos + 1, "estado": "FALLIDA", "ultimo_error": error})
+                continue
+            por_canal.setdefault(n.canal, []).append((n.id, n.intentos, paciente.telefono, mensaje))
+        if no_armadas:
+            conteo["fallidas"] += len(no_armadas)
+            _grabar_resultados(db, no_armadas, worker_id)
 
+        pools = {
+            canal: ThreadPoolExecutor(
+                max_workers=LIMITES_CANAL.get(canal, LIMITE_DEFAULT)[0], thread_name_prefix=f"notif-{canal}"
+            )
+            for canal in por_canal
+        }
+        try:
+            en_curso: dict = {}  # futuro -> ids de su lote
+            descartadas: set[int] = set()
+            for canal, trabajos in por_canal.items():
+                tasa = LIMITES_CANAL.get(canal, LIMITE_DEFAULT)[1]
+                bucket = TokenBucket(tasa) if tasa else None
+                adaptador = adaptadores.get(canal) or obtener_adaptador(canal)
+                paso = adaptador.max_lote
+                for i in range(0, len(trabajos), paso):
+                    lote = trabajos[i:i + paso]
+                    futuro = pools[canal].submit(_enviar_lote, adaptador, bucket, lote, descartadas)
+                    en_curso[futuro] = [t[0] for t in lote]
+
+            resultados = []
+            renovar_cada = NOTIF_LEASE_SEG / 3
+            proxima_renovacion = time.monotonic() + renovar_cada
+            while en_curso:
+                listos, _ = wait(
+                    en_curso, timeout=max(0.0, proxima_renovacion - time.monotonic()), return_when=FIRST_COMPLETED
+                )
+                for futuro in listos:
+                    del en_curso[futuro]
+                    for r in futuro.result():
+                        if "estado" in r:
+                            conteo["enviadas" if r["estado"] == "ENVIADA" else "fallidas"] += 1
+                        else:
+                            conteo["reintentos" if "intentos" in r else "diferidas"] += 1
+                        resultados.append(r)
+                if len(resultados) >= NOTIF_COMMIT_CADA:
+                    _grabar_resultados(db, resultados, worker_id)
+                    resultados = []
+                if en_curso and time.monotonic() >= proxima_renovacion:
+                    # Proveedor lento o lote grande: que el lease no venza con envíos todavía en curso
+                    if resultados:
+                        _grabar_resultados(db, resultados, worker_id)
+                        resultados = []
+                    pendientes_ids = {i for ids in en_curso.values() for i in ids}
+                    perdidas = renovar_lease(
+                        db, worker_id, pendientes_ids, datetime.utcnow(), lease_seg=NOTIF_LEASE_SEG
+                    )
+                    if perdidas:
+                        logger.info("Notificaciones canceladas o reclamadas por otro durante el envío: %d", len(perdidas))
+                        descartadas.update(perdidas)
+                    proxima_renovacion = time.monotonic() + renovar_cada
+            if resultados:
+                _grabar_resultados(db, resultados, worker_id)
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+    except Exception:
+        db.rollback()
+        logger.exception("Despacho de notificaciones falló: %s", conteo)
+        raise
     finally:
         db.close()
+
+    conteo["duracion_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    if conteo["enviadas"] or conteo["reintentos"] or conteo["diferidas"] or conteo["fallidas"]:
+        logger.info(
+            "Notificaciones: %(enviadas)d enviadas, %(reintentos)d a reintentar, %(diferidas)d diferidas "
+            "(circuito abierto), %(fallidas)d fallidas en %(duracion_ms)sms",
+            conteo,
+        )
+    return conteo
@@ -0,0 +1,192 @@
+# Temporizador de notificaciones: en vez de consultar la tabla cada 30s, se mantiene en memoria un heap con
+# las pendientes de la próxima ventana (ordenadas por proxima_ejecucion) y un hilo que duerme exactamente
+# hasta que vence la primera. Las altas/cancelaciones de este proceso llegan por los avisos post-commit de
+# notificaciones_service; las de otros procesos (u otras vías) las levanta la reconciliación periódica.
+#
+# El despacho en sí sigue siendo procesar_notificaciones (reclamo con lease): el heap solo decide cuándo
+# despertar, así que una entrada vieja o de más cuesta, como mucho, una corrida vacía.
+from datetime import datetime, timedelta
+import heapq
+import logging
+import os
+import threading
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.notificacion_model import Notificacion
+from app.notificaciones_scheduler import procesar_notificaciones
+from app.services.notificaciones_service import registrar_oyente_notificaciones
+
+logger = logging.getLogger(__name__)
+
+NOTIF_VENTANA_SEG = int(os.getenv("NOTIF_VENTANA_SEG", "900"))  # cuánto hacia adelante se carga en memoria
+NOTIF_VENTANA_MAX = int(os.getenv("NOTIF_VENTANA_MAX", "5000"))  # tope de filas por carga
+NOTIF_MIN_ESPERA_SEG = float(os.getenv("NOTIF_MIN_ESPERA_SEG", "0.5"))  # entre dos despachos seguidos
+NOTIF_ESPERA_ERROR_SEG = float(os.getenv("NOTIF_ESPERA_ERROR_SEG", "30"))  # si el despacho o la carga fallan
+
+
+class TemporizadorNotificaciones:
+    """
+    Heap de (cuando, dedupe_key) con borrado perezoso: cancelar o reprogramar solo toca el dict `_pendientes`,
+    y las entradas que ya no coinciden se descartan al llegar al tope del heap. Las notificaciones se
+    identifican por dedupe_key porque las altas en bloque no devuelven ids.
+    """
+
+    def __init__(self, despachar=procesar_notificaciones):
+        self._despachar = despachar
+        self._heap: list[tuple[datetime, str]] = []
+        self._pendientes: dict[str, tuple[datetime, int | None]] = {}  # dedupe_key -> (cuando, turno_id)
+        self._por_turno: dict[int, set[str]] = {}
+        self._horizonte: datetime | None = None  # hasta dónde cubre la última carga (None = nunca se cargó)
+        self._cond = threading.Condition()
+        self._hilo: threading.Thread | None = None
+        self._detenido = False
+        # Avisos que llegan mientras se está cargando: se vuelven a aplicar sobre el resultado de la carga
+        self._durante_carga: list[tuple] | None = None
+
+    # ---- Avisos (desde notificaciones_service, después de cada commit) ----
+
+    def programar(self, clave: str, turno_id: int | None, cuando: datetime) -> None:
+        with self._cond:
+            if self._durante_carga is not None:
+                self._durante_carga.append(("programar", clave, turno_id, cuando))
+            if self._horizonte is not None and cuando >= self._horizonte:
+                return  # fuera de la ventana: la levanta la próxima carga
+            anterior = self._heap[0][0] if self._heap else None
+            self._agregar(clave, turno_id, cuando)
+            if anterior is None or cuando < anterior:
+                self._cond.notify()  # es la nueva primera: el hilo tiene que despertarse antes
+
+    def cancelar_turnos(self, turno_ids) -> None:
+        with self._cond:
+            if self._durante_carga is not None:
+                self._durante_carga.append(("cancelar", turno_ids))
+            for turno_id in turno_ids:
+                for clave in self._por_turno.pop(turno_id, ()):
+                    self._pendientes.pop(clave, None)
+            # sin notify: despertarse tarde nunca es peor que despertarse por una cancelada
+
+    def _agregar(self, clave: str, turno_id: int | None, cuando: datetime) -> None:
+        self._pendientes[clave] = (cuando, turno_id)
+        if turno_id is not None:
+            self._por_turno.setdefault(turno_id, set()).add(clave)
+        heapq.heappush(self._heap, (cuando, clave))
+
+    # ---- Carga desde la base ----
+
+    def recargar(self) -> None:
+        """
+        Reemplaza el contenido del heap por las PENDIENTE con proxima_ejecucion dentro de la ventana
+        (rango sobre idx_notif_estado_proxima). Una fila reclamada por otro despachador cuenta desde
+        que vence su lease, para no despertar en falso mientras se está enviando.
+        """
+        with self._cond:
+            self._durante_carga = []
+        try:
+            ahora = datetime.utcnow()
+            horizonte = ahora + timedelta(seconds=NOTIF_VENTANA_SEG)
+            db = SessionLocal()
+            try:
+                filas = db.execute(
+                    select(
+                        Notificacion.dedupe_key,
+                        Notificacion.turno_id,
+                        Notificacion.proxima_ejecucion,
+                        Notificacion.reclamada_hasta,
+                    )
+                    .where(Notificacion.estado == "PENDIENTE", Notificacion.proxima_ejecucion < horizonte)
+                    .order_by(Notificacion.proxima_ejecucion.asc())
+                    .limit(NOTIF_VENTANA_MAX)
+                ).all()
+            finally:
+                db.close()
+            if len(filas) >= NOTIF_VENTANA_MAX:
+                # Ventana llena: lo que esté después de la última fila cargada se ve en la próxima carga
+                horizonte = filas[-1].proxima_ejecucion
+        except Exception:
+            with self._cond:
+                self._durante_carga = None
+            raise
+
+        with self._cond:
+            avisos, self._durante_carga = self._durante_carga, None
+            self._heap, self._pendientes, self._por_turno = [], {}, {}
+            self._horizonte = horizonte
+            for f in filas:
+                cuando = f.proxima_ejecucion
+                if f.reclamada_hasta is not None and f.reclamada_hasta > cuando:
+                    cuando = f.reclamada_hasta
+                self._agregar(f.dedupe_key, f.turno_id, cuando)
+            for aviso in avisos:
+                if aviso[0] == "programar":
+                    if aviso[3] < horizonte:
+                        self._agregar(*aviso[1:])
+                else:
+                    for turno_id in aviso[1]:
+                        for clave in self._por_turno.pop(turno_id, ()):
+                            self._pendientes.pop(clave, None)
+            self._cond.notify()
+
+    def reconciliar(self) -> None:
+        # Job periódico (red de seguridad): vuelve a cargar la ventana y despierta al hilo si cambió la primera
+        self.recargar()
+
+    # ---- Hilo ----
+
+    def _segundos_hasta_proximo(self) -> float:
+        # Descarta las entradas viejas del tope (canceladas o reprogramadas) antes de mirar la primera
+        while self._heap:
+            cuando, clave = self._heap[0]
+            actual = self._pendientes.get(clave)
+            if actual is not None and actual[0] == cuando:
+                break
+            heapq.heappop(self._heap)
+        proximo = self._heap[0][0] if self._heap else self._horizonte
+        return (proximo - datetime.utcnow()).total_seconds()
+
+    def _bucle(self) -> None:
+        espera = 0.0
+        while True:
+            with self._cond:
+                if espera > 0:
+                    self._cond.wait(espera)  # pausa mínima entre despachos (o tras un error)
+                while not self._detenido:
+                    if self._horizonte is None:
+                        break  # nunca se cargó (falló la carga): se reintenta abajo
+                    faltan = self._segundos_hasta_proximo()
+                    if faltan <= 0:
+                        break
+                    self._cond.wait(faltan)
+                if self._detenido:
+                    return
+                vencido = self._horizonte is not None
+            try:
+                if vencido:
+                    self._despachar()
+                self.recargar()
+                espera = NOTIF_MIN_ESPERA_SEG
+            except Exception:
+                logger.exception("Temporizador de notificaciones: falló el despacho o la carga")
+                espera = NOTIF_ESPERA_ERROR_SEG
+
+    def iniciar(self) -> None:
+        if self._hilo is not None:
+            return
+        self._detenido = False
+        registrar_oyente_notificaciones(self)
+        try:
+            self.recargar()
+        except Exception:
+            logger.exception("Temporizador de notificaciones: falló la carga inicial")
+        self._hilo = threading.Thread(target=self._bucle, name="notif-timer", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 30.0) -> None:
+        registrar_oyente_notificaciones(None)
+        with self._cond:
+            self._detenido = True
+            self._cond.notify()
+        if self._hilo is not None:
+            self._hilo.join(timeout)  # si hay un despacho en curso, se espera a que grabe sus resultados
+            self._hilo = None
@@ -0,0 +1,64 @@
+# Reconstruye tokens_busqueda desde las tablas (después de la migración 008, de una carga masiva por SQL
+# o si se cambian las reglas de normalización):
+#
+#     python -m app.reindexar_busqueda
+#
+# Recorre de a --lote filas por id; cada lote reemplaza sus tokens en su propia transacción, así que la
+# búsqueda sigue andando mientras corre.
+import argparse
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models.paciente_model import Paciente
+from app.models.profesional_model import Profesional
+from app.services.busqueda_service import indexar_pacientes, indexar_profesionales
+
+logger = logging.getLogger("app.reindexar_busqueda")
+
+
+def _reindexar(columnas, indexar, lote: int) -> int:
+    id_col = columnas[0]
+    db = SessionLocal()
+    total = 0
+    ultimo_id = 0
+    try:
+        while True:
+            filas = db.execute(
+                select(*columnas).where(id_col > ultimo_id).order_by(id_col.asc()).limit(lote)
+            ).all()
+            if not filas:
+                return total
+            indexar(db, filas)
+            db.commit()
+            total += len(filas)
+            ultimo_id = filas[-1].id
+    finally:
+        db.close()
+
+
+def reindexar_pacientes(lote: int = 1000) -> int:
+    columnas = (Paciente.id, Paciente.nombre, Paciente.dni, Paciente.cuil, Paciente.telefono)
+    return _reindexar(columnas, indexar_pacientes, lote)
+
+
+def reindexar_profesionales(lote: int = 1000) -> int:
+    return _reindexar((Profesional.id, Profesional.nombre), indexar_profesionales, lote)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    ap = argparse.ArgumentParser(description="Reconstruye el índice de búsqueda (tokens_busqueda)")
+    ap.add_argument("--lote", type=int, default=1000)
+    args = ap.parse_args()
+
+    for nombre, reindexar in (("Pacientes", reindexar_pacientes), ("Profesionales", reindexar_profesionales)):
+        t0 = time.perf_counter()
+        n = reindexar(args.lote)
+        logger.info("%s reindexados: %d en %.1fs", nombre, n, time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
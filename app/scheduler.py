@@ -1,50 +1,123 @@
 from datetime import datetime, timedelta
-from sqlalchemy import select
+import logging
+import os
+import time
+
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
 from app.models.turno_model import Turno
-from app.services.turnos_service import (
-    aplicar_evento_turno,
-    EVENTO_VENCER,
-    EVENTO_NO_ASISTIO,
-    _estado_id_por_codigo,
+from app.services.turnos_service import _estado_id_por_codigo
+from app.services.notificaciones_service import (
+    cancelar_notificaciones_pendientes_de_turnos,
+    programar_notifs_lote,
 )
+from app.services.cache_agenda import invalidar_agenda
+
+logger = logging.getLogger(__name__)
 
 TTL_RESERVA_MIN = 2880  # Tiempo en minutos que una reserva puede estar sin confirmar
+SWEEPER_LOTE = int(os.getenv("SWEEPER_LOTE", "500"))  # turnos por transacción
+
+
+def _barrer(
+    db: Session,
+    *,
+    estado_origen: int,
+    estado_destino: int,
+    condicion,
+    orden,
+    valores: dict,
+    notificar_cancelacion: bool,
+    conteo: dict,
+) -> int:
+    """
+    Pasa de estado_origen a estado_destino todos los turnos que cumplen `condicion`, de a SWEEPER_LOTE por transacción:
+    - toma el lote con FOR UPDATE SKIP LOCKED (si un usuario lo está tocando, queda para la próxima corrida)
+    - un UPDATE en bloque protegido por el estado actual
+    - cancela las notificaciones pendientes (y encola la de cancelación si corresponde) en bloque
+    - invalida el cache de listados de los profesionales afectados
+    Devuelve cuántos turnos cambió.
+    """
+    total = 0
+    while True:
+        lote = db.execute(
+            select(Turno.id, Turno.paciente_id, Turno.profesional_id, Turno.fecha_hora_inicio)
+            .where(Turno.estado_id == estado_origen, condicion)
+            .order_by(orden)
+            .limit(SWEEPER_LOTE)
+            .with_for_update(of=Turno, skip_locked=True)
+        ).all()
+        if not lote:
+            db.rollback()
+            return total
+
+        ids = [t.id for t in lote]
+        db.execute(
+            update(Turno)
+            .where(Turno.id.in_(ids), Turno.estado_id == estado_origen)
+            .values(estado_id=estado_destino, actualizado_en=datetime.utcnow(), **valores)
+            .execution_options(synchronize_session=False)
+        )
+        conteo["notifs_canceladas"] += cancelar_notificaciones_pendientes_de_turnos(db, ids)
+        if notificar_cancelacion:
+            conteo["notifs_encoladas"] += programar_notifs_lote(db, cancelados=lote)
+        invalidar_agenda(db, {t.profesional_id for t in lote})
+        db.commit()
+
+        total += len(ids)
+        if len(lote) < SWEEPER_LOTE:
+            return total
 
-def _procesar_turnos_sistema():
+
+def _procesar_turnos_sistema() -> dict:
     db: Session = SessionLocal()
+    t0 = time.perf_counter()
+    conteo = {"vencidas": 0, "no_asistio": 0, "notifs_canceladas": 0, "notifs_encoladas": 0}
     try:
         ahora = datetime.utcnow()
 
         estado_reservado = _estado_id_por_codigo(db, "RESERVADO")
         estado_confirmado = _estado_id_por_codigo(db, "CONFIRMADO")
+        estado_cancelado = _estado_id_por_codigo(db, "CANCELADO")
+        estado_no_asistio = _estado_id_por_codigo(db, "NO_ASISTIO")
 
-        # 1) Vencer reservas: RESERVADO y creado_en viejo
+        # 1) Vencer reservas: RESERVADO y creado_en viejo -> CANCELADO (equivale al evento vencer_reserva)
         limite = ahora - timedelta(minutes=TTL_RESERVA_MIN)
-
-        reservas_vencidas = db.execute(
-            select(Turno.id).where(
-                Turno.estado_id == estado_reservado,
-                Turno.creado_en != None,
-                Turno.creado_en < limite
-            )
-        ).scalars().all()
-
-        for turno_id in reservas_vencidas:
-            aplicar_evento_turno(db, turno_id, EVENTO_VENCER, actor="sistema")
+        conteo["vencidas"] = _barrer(
+            db,
+            estado_origen=estado_reservado,
+            estado_destino=estado_cancelado,
+            condicion=Turno.creado_en < limite,  # índice idx_turno_estado_creado
+            orden=Turno.creado_en,
+            valores={"cancelado_en": ahora},
+            notificar_cancelacion=True,
+            conteo=conteo,
+        )
 
         # 2) No asistió automático: CONFIRMADO y ya terminó
-        no_asistio = db.execute(
-            select(Turno.id).where(
-                Turno.estado_id == estado_confirmado,
-                Turno.fecha_hora_fin < ahora
-            )
-        ).scalars().all()
-
-        for turno_id in no_asistio:
-            aplicar_evento_turno(db, turno_id, EVENTO_NO_ASISTIO, actor="sistema")
-
+        conteo["no_asistio"] = _barrer(
+            db,
+            estado_origen=estado_confirmado,
+            estado_destino=estado_no_asistio,
+            condicion=Turno.fecha_hora_fin < ahora,  # índice idx_turno_estado_fin
+            orden=Turno.fecha_hora_fin,
+            valores={},
+            notificar_cancelacion=False,
+            conteo=conteo,
+        )
+    except Exception:
+        db.rollback()
+        logger.exception("Sweeper de turnos falló (lo ya commiteado queda aplicado): %s", conteo)
+        raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+    conteo["duracion_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    logger.info(
+        "Sweeper de turnos: %(vencidas)d vencidas, %(no_asistio)d no asistió, "
+        "%(notifs_canceladas)d notificaciones canceladas, %(notifs_encoladas)d encoladas en %(duracion_ms)sms",
+        conteo,
+    )
+    return conteo
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+class SlotOut(BaseModel): #un hueco reservable, del largo de duracion_turno_min del profesional
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+
+class DisponibilidadOut(BaseModel):
+    profesional_id: int
+    duracion_turno_min: int
+    desde: datetime
+    hasta: datetime
+    slots: list[SlotOut]
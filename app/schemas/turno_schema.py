@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import datetime, date, time
 from app.schemas.estado_turno_schema import EstadoTurnoOut
 from app.schemas.paciente_schema import PacienteOut
 from app.schemas.profesional_schema import ProfesionalOut
@@ -24,4 +24,38 @@ class TurnoOut(BaseModel): #representa los campos de la tabla turnos que se pret
 
     model_config = {
         "from_attributes": True
-    }
\ No newline at end of file
+    }
+
+class TurnoSerieCreate(BaseModel): #regla de recurrencia para crear varias sesiones de una vez (ej: 10 sesiones lun/mié/vie 15:00)
+    paciente_id: int
+    profesional_id: int
+    fecha_desde: date
+    dias_semana: list[int] = Field(min_length=1) # 1 = lunes ... 7 = domingo
+    hora_inicio: time
+    sesiones: int = Field(ge=1)
+    duracion_min: int | None = None # si no viene, se usa duracion_turno_min del profesional
+    todo_o_nada: bool = False # si alguna sesión choca, no se crea ninguna
+
+class ConflictoSerieOut(BaseModel):
+    fecha_hora_inicio: datetime
+    fecha_hora_fin: datetime
+    motivo: str
+
+class TurnoSerieOut(BaseModel):
+    creados: list[TurnoOut]
+    conflictos: list[ConflictoSerieOut]
+
+class TurnoEventoIn(BaseModel):
+    turno_id: int
+    evento: str # confirmar_turno / cancelar_turno / marcar_completado / marcar_no_asistio
+
+class TurnosEventosIn(BaseModel): #lote de transiciones (ej: cierre del día)
+    items: list[TurnoEventoIn] = Field(min_length=1)
+
+class TurnoEventoResultadoOut(BaseModel):
+    turno_id: int
+    evento: str
+    ok: bool
+    status: int # mismo código que devolvería el endpoint individual
+    detail: str | None = None
+    estado: str | None = None # código del estado nuevo si ok
@@ -0,0 +1,147 @@
+# Búsqueda por prefijo de palabras sobre la tabla tokens_busqueda: autocompletar de pacientes y filtros por
+# nombre de paciente/profesional en los listados de turnos (en vez de ILIKE '%x%', que no usa índices).
+# Cada entidad se indexa en la misma transacción en que se escribe (ver pacientes_router y profesionales_router);
+# para reconstruir todo el índice: python -m app.reindexar_busqueda
+import re
+import unicodedata
+
+from sqlalchemy import select, insert, delete, exists, and_
+from sqlalchemy.orm import Session, aliased
+
+from app.models.paciente_model import Paciente
+from app.models.token_busqueda_model import TokenBusqueda
+
+ENTIDAD_PACIENTE = "paciente"
+ENTIDAD_PROFESIONAL = "profesional"
+
+LARGO_TOKEN = 64  # largo de la columna
+MAX_TOKENS_CONSULTA = 5  # palabras de la consulta que se usan (el resto se ignora)
+
+_PALABRA = re.compile(r"[^\W_]+")
+_TILDE = "\u0303"  # la virgulilla combinante (ñ = n + U+0303 en NFD)
+_ULTIMO_CARACTER = "\U0010ffff"
+
+
+def normalizar(texto: str) -> str:
+    """
+    Minúsculas y sin acentos ni diéresis, pero con la ñ distinta de la n: lo mismo que considera igual
+    utf8mb4_spanish_ci. "MUÑOZ Pérez" -> "muñoz perez"
+    """
+    descompuesto = unicodedata.normalize("NFD", texto.casefold())
+    return unicodedata.normalize("NFC", "".join(
+        c for i, c in enumerate(descompuesto)
+        if not unicodedata.combining(c) or (c == _TILDE and i > 0 and descompuesto[i - 1] == "n")
+    ))
+
+
+def tokenizar(texto: str | None) -> list[str]:
+    if not texto:
+        return []
+    return [t[:LARGO_TOKEN] for t in _PALABRA.findall(normalizar(texto))]
+
+
+def tokens_paciente(paciente) -> set[str]:
+    tokens = set(tokenizar(paciente.nombre))
+    for valor in (paciente.dni, paciente.cuil, paciente.telefono):
+        partes = tokenizar(valor)
+        tokens.update(partes)
+        if len(partes) > 1:
+            # "20-12345678-9" se encuentra por cada grupo y también escrito de corrido
+            tokens.add("".join(partes)[:LARGO_TOKEN])
+    return tokens
+
+
+def tokens_profesional(profesional) -> set[str]:
+    return set(tokenizar(profesional.nombre))
+
+
+def _indexar(db: Session, entidad: str, filas, tokens_de) -> None:
+    # Reemplaza los tokens de estas filas (sin commit: va en la transacción de quien las escribe)
+    ids = [f.id for f in filas]
+    if not ids:
+        return
+    db.execute(
+        delete(TokenBusqueda)
+        .where(TokenBusqueda.entidad == entidad, TokenBusqueda.entidad_id.in_(ids))
+    )
+    tokens = [
+        {"entidad": entidad, "token": t, "entidad_id": f.id}
+        for f in filas
+        for t in tokens_de(f)
+    ]
+    if tokens:
+        db.execute(insert(TokenBusqueda), tokens)
+
+
+def indexar_pacientes(db: Session, pacientes) -> None:
+    _indexar(db, ENTIDAD_PACIENTE, pacientes, tokens_paciente)
+
+
+def indexar_profesionales(db: Session, profesionales) -> None:
+    _indexar(db, ENTIDAD_PROFESIONAL, profesionales, tokens_profesional)
+
+
+def _empieza_con(columna, prefijo: str):
+    # Rango en vez de LIKE 'x%': es un rango sobre el índice en cualquier motor (token es binaria en MySQL)
+    return and_(columna >= prefijo, columna < prefijo + _ULTIMO_CARACTER)
+
+
+def _tokens_consulta(texto: str | None) -> list[str]:
+    # La más larga primero: es la más selectiva y la que recorre el índice
+    return sorted(set(tokenizar(texto)), key=len, reverse=True)[:MAX_TOKENS_CONSULTA]
+
+
+def _select_coincidencias(entidad: str, tokens: list[str]):
+    stmt = select(TokenBusqueda.entidad_id).where(
+        TokenBusqueda.entidad == entidad,
+        _empieza_con(TokenBusqueda.token, tokens[0]),
+    )
+    for token in tokens[1:]:
+        otro = aliased(TokenBusqueda)
+        stmt = stmt.where(exists().where(
+            otro.entidad == entidad,
+            otro.entidad_id == TokenBusqueda.entidad_id,
+            _empieza_con(otro.token, token),
+        ))
+    return stmt
+
+
+def ids_que_coinciden(entidad: str, texto: str | None):
+    """
+    SELECT de los ids de `entidad` que tienen, para cada palabra de `texto`, alguna palabra que empieza con ella
+    (para usar en un IN). None si `texto` no tiene ninguna palabra.
+    """
+    tokens = _tokens_consulta(texto)
+    if not tokens:
+        return None
+    return _select_coincidencias(entidad, tokens)
+
+
+def buscar_pacientes(db: Session, q: str, *, limit: int = 10, solo_activos: bool = False) -> list[Paciente]:
+    """
+    Pacientes que tienen, para cada palabra de `q`, alguna palabra (de nombre, dni, cuil o teléfono) que empieza
+    con ella. "jose mu" encuentra a "José Muñoz"; "2012" a quien tenga CUIL 20-12345678-9.
+
+    La palabra más larga recorre el índice (entidad, token) en orden y las otras se verifican por paciente, así
+    que la consulta corta apenas junta `limit` resultados, aunque el prefijo sea de una letra.
+    Orden: primero las coincidencias exactas de esa palabra, después alfabético por la palabra encontrada.
+    """
+    tokens = _tokens_consulta(q)
+    if not tokens:
+        return []
+
+    stmt = _select_coincidencias(ENTIDAD_PACIENTE, tokens)
+    if solo_activos:
+        stmt = stmt.join(Paciente, Paciente.id == TokenBusqueda.entidad_id).where(Paciente.activo.is_(True))
+
+    # Un paciente puede aparecer con más de una palabra ("María Martínez" para "mar"): se piden de más y se
+    # deduplica acá, conservando el orden del índice
+    ids = db.execute(
+        stmt.order_by(TokenBusqueda.token.asc(), TokenBusqueda.entidad_id.asc()).limit(limit * 4)
+    ).scalars().all()
+    ids = list(dict.fromkeys(ids))[:limit]
+    if not ids:
+        return []
+
+    por_id = {p.id: p for p in db.query(Paciente).filter(Paciente.id.in_(ids))}
+    return [por_id[i] for i in ids if i in por_id]
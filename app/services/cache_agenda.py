@@ -0,0 +1,121 @@
+# Cache de respuestas de GET /api/turnos (la agenda que el frontend consulta una y otra vez con los mismos filtros).
+#
+# Invalidación por contadores de generación en la base (app/core/generaciones.py): cada escritura que cambia la
+# agenda de un profesional incrementa su contador en la misma transacción. Una entrada guarda la generación que
+# había ANTES de consultar y solo sirve mientras siga siendo la actual, así que un cambio se ve en el siguiente
+# request en cualquier proceso (otro worker de la API, app.worker con el sweeper), sin buscar qué entradas tocaba.
+# Un acierto cuesta una lectura por PK de generaciones en vez del listado.
+from collections import OrderedDict
+import os
+import threading
+import time
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from app.core import generaciones
+from app.models.turno_model import Turno
+from app.models.turno_archivo_model import TurnoArchivo
+from app.services.busqueda_service import tokenizar
+
+AGENDA_CACHE_TTL_SEG = float(os.getenv("AGENDA_CACHE_TTL_SEG", "15"))  # 0 = sin cache
+AGENDA_CACHE_MAX = int(os.getenv("AGENDA_CACHE_MAX", "2000"))  # entradas (se descartan las menos usadas)
+
+PREFIJO_GEN = "agenda:"
+
+
+def _clave_gen(profesional_id: int) -> str:
+    return f"{PREFIJO_GEN}{profesional_id}"
+
+
+class CacheAgenda:
+    def __init__(self, ttl_seg: float = AGENDA_CACHE_TTL_SEG, max_entradas: int = AGENDA_CACHE_MAX):
+        self.ttl_seg = ttl_seg
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas: OrderedDict = OrderedDict()  # clave -> (vence, generacion, valor)
+
+    def generacion(self, db: Session, profesional_id: int | None) -> tuple:
+        if profesional_id is None:
+            # Consultas que no son de un solo profesional: cambian con cualquier escritura
+            return (generaciones.suma_prefijo(db, PREFIJO_GEN),)
+        return generaciones.leer(db, (_clave_gen(profesional_id),))
+
+    def obtener(self, db: Session, clave, profesional_id: int | None):
+        """
+        Devuelve (valor, generacion): valor None si no hay entrada vigente. La generación es la que hay que pasarle
+        a guardar() con el resultado de la consulta (tomada antes de consultar: si algo se commitea mientras tanto,
+        la entrada nace vieja).
+        """
+        if self.ttl_seg <= 0:
+            return None, None
+        generacion = self.generacion(db, profesional_id)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None, generacion
+            vence, gen_entrada, valor = entrada
+            if gen_entrada != generacion or vence <= time.monotonic():
+                del self._entradas[clave]
+                return None, generacion
+            self._entradas.move_to_end(clave)
+            return valor, generacion
+
+    def guardar(self, clave, generacion: tuple | None, valor) -> None:
+        if self.ttl_seg <= 0 or generacion is None:
+            return
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl_seg, generacion, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_agenda = CacheAgenda()
+
+
+def clave_listado(*, scope: str, user, filtros: dict) -> tuple:
+    # Filtros normalizados + alcance RBAC efectivo (un OWN ve solo lo de su profesional)
+    alcance = ("OWN", getattr(user, "profesional_id", None)) if scope == "OWN" else (scope,)
+    normalizados = []
+    for nombre, valor in sorted(filtros.items()):
+        if valor is None or valor is False:
+            continue
+        if nombre in ("paciente_nombre", "profesional_nombre"):
+            # Mismo criterio que el filtro: "Gómez josé" y "jose gomez" son la misma búsqueda
+            valor = " ".join(sorted(set(tokenizar(valor))))
+        elif hasattr(valor, "isoformat"):
+            valor = valor.isoformat()
+        normalizados.append((nombre, valor))
+    return alcance, tuple(normalizados)
+
+
+def profesional_de_listado(*, scope: str, user, profesional_id: int | None) -> int | None:
+    # De qué contador depende la entrada: None = de cualquier cambio
+    if profesional_id is not None:
+        return profesional_id
+    if scope == "OWN":
+        return getattr(user, "profesional_id", None)
+    return None
+
+
+# ---- Invalidación desde las escrituras: en la misma transacción (con rollback no pasó nada) ----
+
+def invalidar_agenda(db: Session, profesional_ids) -> None:
+    generaciones.incrementar(db, (_clave_gen(p) for p in profesional_ids if p is not None))
+
+
+def invalidar_agenda_paciente(db: Session, paciente_id: int) -> None:
+    # Los datos del paciente van en cada uno de sus turnos (también los archivados, que el listado incluye):
+    # solo cambian las agendas de los profesionales que lo atendieron
+    profesional_ids = db.execute(
+        union(
+            select(Turno.profesional_id).where(Turno.paciente_id == paciente_id),
+            select(TurnoArchivo.profesional_id).where(TurnoArchivo.paciente_id == paciente_id),
+        )
+    ).scalars().all()
+    invalidar_agenda(db, profesional_ids)
@@ -0,0 +1,193 @@
+# Motor de disponibilidad: horarios laborales - (bloqueos + turnos activos) = huecos reservables.
+# Siempre hace la misma cantidad de consultas (por rango), sin importar el largo de la ventana.
+from datetime import datetime, timedelta, timezone, date
+from sqlalchemy import select, union_all, literal
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+
+from app.models.turno_model import Turno
+from app.models.profesional_model import Profesional
+from app.models.bloqueo_agenda_model import BloqueoAgenda
+from app.models.horario_laboral_model import HorarioLaboral
+from app.services.estados_turno_service import estado_id_por_codigo
+
+MAX_VENTANA_DIAS = 62
+# Ningún turno dura más que esto: permite acotar por abajo fecha_hora_inicio en las consultas de solapamiento
+# (rango sobre el índice en vez de recorrer toda la historia del profesional/paciente)
+DURACION_MAXIMA_TURNO = timedelta(hours=24)
+
+Intervalo = tuple[datetime, datetime]
+Franja = tuple[datetime, datetime, datetime]  # (inicio, fin, inicio de la grilla de slots)
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    # En la DB las fechas se guardan naive (UTC); si llegan con zona horaria se normalizan
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _dias(desde: datetime, hasta: datetime):
+    d: date = desde.date()
+    while d <= hasta.date():
+        yield d
+        d += timedelta(days=1)
+
+
+def intervalos_laborales(db: Session, profesional_id: int, desde: datetime, hasta: datetime) -> list[Franja]:
+    """
+    Expande el horario semanal del profesional a intervalos concretos dentro de [desde, hasta), ordenados.
+    """
+    horarios = db.execute(
+        select(HorarioLaboral.dia_semana, HorarioLaboral.hora_inicio, HorarioLaboral.hora_fin).where(
+            HorarioLaboral.profesional_id == profesional_id,
+            HorarioLaboral.activo == True,
+        )
+    ).all()
+
+    por_dia: dict[int, list] = {}
+    for dia_semana, hora_inicio, hora_fin in horarios:
+        por_dia.setdefault(dia_semana, []).append((hora_inicio, hora_fin))
+
+    intervalos: list[Franja] = []
+    for d in _dias(desde, hasta):
+        for hora_inicio, hora_fin in sorted(por_dia.get(d.isoweekday(), [])):
+            inicio = max(datetime.combine(d, hora_inicio), desde)
+            fin = min(datetime.combine(d, hora_fin), hasta)
+            if inicio < fin:
+                # Se guarda el inicio "teórico" de la franja para alinear los slots a esa grilla
+                intervalos.append((inicio, fin, datetime.combine(d, hora_inicio)))
+    return intervalos
+
+
+def intervalos_ocupados(
+    db: Session,
+    desde: datetime,
+    hasta: datetime,
+    *,
+    profesional_id: int | None = None,
+    paciente_id: int | None = None,
+) -> list[tuple[datetime, datetime, str]]:
+    """
+    Bloqueos activos del profesional + turnos activos (RESERVADO/CONFIRMADO) del profesional o del paciente
+    que se solapan con [desde, hasta). Una sola consulta (UNION ALL), ordenado por inicio.
+    Cada item es (inicio, fin, origen) con origen en BLOQUEO / PROFESIONAL / PACIENTE.
+    """
+    estados_activos = [estado_id_por_codigo(db, "RESERVADO"), estado_id_por_codigo(db, "CONFIRMADO")]
+    partes = []
+
+    if profesional_id is not None:
+        partes.append(
+            select(BloqueoAgenda.fecha_hora_inicio.label("inicio"), BloqueoAgenda.fecha_hora_fin.label("fin"), literal("BLOQUEO").label("origen"))
+            .where(
+                BloqueoAgenda.profesional_id == profesional_id,
+                BloqueoAgenda.activo == True,
+                BloqueoAgenda.fecha_hora_inicio < hasta,
+                BloqueoAgenda.fecha_hora_fin > desde,
+            )
+        )
+        partes.append(
+            select(Turno.fecha_hora_inicio.label("inicio"), Turno.fecha_hora_fin.label("fin"), literal("PROFESIONAL").label("origen"))
+            .where(
+                Turno.profesional_id == profesional_id,
+                Turno.estado_id.in_(estados_activos),
+                Turno.fecha_hora_inicio > desde - DURACION_MAXIMA_TURNO,
+                Turno.fecha_hora_inicio < hasta,
+                Turno.fecha_hora_fin > desde,
+            )
+        )
+
+    if paciente_id is not None:
+        partes.append(
+            select(Turno.fecha_hora_inicio.label("inicio"), Turno.fecha_hora_fin.label("fin"), literal("PACIENTE").label("origen"))
+            .where(
+                Turno.paciente_id == paciente_id,
+                Turno.estado_id.in_(estados_activos),
+                Turno.fecha_hora_inicio > desde - DURACION_MAXIMA_TURNO,
+                Turno.fecha_hora_inicio < hasta,
+                Turno.fecha_hora_fin > desde,
+            )
+        )
+
+    if not partes:
+        return []
+
+    stmt = partes[0] if len(partes) == 1 else union_all(*partes)
+    filas = db.execute(stmt).all()
+    return sorted(((f[0], f[1], f[2]) for f in filas), key=lambda f: (f[0], f[1]))
+
+
+def fusionar_intervalos(intervalos) -> list[Intervalo]:
+    # Espera intervalos ordenados por inicio; devuelve la unión como lista disjunta
+    fusionados: list[list[datetime]] = []
+    for inicio, fin, *_ in intervalos:
+        if fusionados and inicio <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1][1] = fin
+        else:
+            fusionados.append([inicio, fin])
+    return [(i, f) for i, f in fusionados]
+
+
+def restar_intervalos(base: list[Franja], ocupados: list[Intervalo]) -> list[Franja]:
+    """
+    Barrido sobre dos listas ordenadas: base - ocupados (ocupados ya fusionados).
+    Conserva el tercer elemento de cada intervalo base (origen de la grilla).
+    """
+    libres = []
+    j = 0
+    for inicio, fin, origen in base:
+        # Avanzar los ocupados que terminan antes de este intervalo (no sirven para los siguientes)
+        while j < len(ocupados) and ocupados[j][1] <= inicio:
+            j += 1
+        cursor = inicio
+        k = j
+        while k < len(ocupados) and ocupados[k][0] < fin:
+            o_inicio, o_fin = ocupados[k]
+            if o_inicio > cursor:
+                libres.append((cursor, o_inicio, origen))
+            cursor = max(cursor, o_fin)
+            k += 1
+        if cursor < fin:
+            libres.append((cursor, fin, origen))
+    return libres
+
+
+def cortar_en_slots(libres: list[Franja], duracion: timedelta) -> list[Intervalo]:
+    # Slots alineados a la grilla de la franja laboral (ej: 14:00, 15:00, ...) que entran completos en un hueco
+    slots: list[Intervalo] = []
+    for inicio, fin, origen in libres:
+        pasos = -((origen - inicio) // duracion)  # ceil((inicio - origen) / duracion)
+        s = origen + pasos * duracion
+        while s + duracion <= fin:
+            slots.append((s, s + duracion))
+            s += duracion
+    return slots
+
+
+def calcular_disponibilidad(
+    db: Session,
+    profesional_id: int,
+    desde: datetime,
+    hasta: datetime,
+) -> tuple[Profesional, list[Intervalo]]:
+    desde = _naive_utc(desde)
+    hasta = _naive_utc(hasta)
+    if hasta <= desde:
+        raise HTTPException(status_code=400, detail="hasta debe ser mayor que desde")
+    if hasta - desde > timedelta(days=MAX_VENTANA_DIAS):
+        raise HTTPException(status_code=400, detail=f"La ventana no puede superar {MAX_VENTANA_DIAS} días.")
+
+    profesional = db.get(Profesional, profesional_id)
+    if not profesional:
+        raise HTTPException(status_code=404, detail="Profesional no encontrado.")
+    if not profesional.activo:
+        return profesional, []
+
+    laborales = intervalos_laborales(db, profesional_id, desde, hasta)
+    if not laborales:
+        return profesional, []
+
+    ocupados = fusionar_intervalos(intervalos_ocupados(db, desde, hasta, profesional_id=profesional_id))
+    libres = restar_intervalos(laborales, ocupados)
+    return profesional, cortar_en_slots(libres, timedelta(minutes=profesional.duracion_turno_min))
@@ -0,0 +1,146 @@
+# Catálogo de estados_turno precargado en memoria: es una tabla chica que casi nunca cambia,
+# así que no tiene sentido ir a la DB cada vez que hay que traducir "RESERVADO" <-> id.
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+import signal
+import threading
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.condicional import calcular_etag, serializar_lista
+from app.models.estado_turno_model import EstadoTurno
+from app.schemas.estado_turno_schema import EstadoTurnoOut
+
+
+@dataclass(frozen=True)
+class EstadoTurnoInfo:
+    id: int
+    codigo: str
+    descripcion: str
+
+
+@dataclass(frozen=True, eq=False)
+class RegistroEstados:
+    estados: tuple[EstadoTurnoInfo, ...]
+    id_por_codigo: Mapping[str, int]
+    codigo_por_id: Mapping[int, str]
+
+
+_registro: RegistroEstados | None = None
+_refresco_pendiente = False
+_lock = threading.Lock()
+_fsm_compilada: tuple[RegistroEstados, Mapping, Mapping[tuple[int, str], int]] | None = None
+_json_estados: tuple[RegistroEstados, bytes, str] | None = None
+
+
+def _cargar(db: Session) -> RegistroEstados:
+    filas = db.execute(select(EstadoTurno).order_by(EstadoTurno.id)).scalars().all()
+    estados = tuple(EstadoTurnoInfo(id=e.id, codigo=e.codigo, descripcion=e.descripcion) for e in filas)
+    return RegistroEstados(
+        estados=estados,
+        id_por_codigo=MappingProxyType({e.codigo: e.id for e in estados}),
+        codigo_por_id=MappingProxyType({e.id: e.codigo for e in estados}),
+    )
+
+
+def get_registro_estados(db: Session) -> RegistroEstados:
+    """
+    Devuelve el registro inmutable de estados. Solo consulta la DB la primera vez
+    o cuando se pidió un refresco (refrescar_registro_estados / señal).
+    """
+    global _registro, _refresco_pendiente
+    registro = _registro
+    if registro is not None and not _refresco_pendiente:
+        return registro
+
+    with _lock:
+        if _registro is None or _refresco_pendiente:
+            _refresco_pendiente = False
+            _registro = _cargar(db)
+        return _registro
+
+
+def refrescar_registro_estados(db: Session) -> RegistroEstados:
+    global _registro
+    with _lock:
+        _registro = _cargar(db)
+        return _registro
+
+
+def solicitar_refresco_estados() -> None:
+    # No toca la DB: el próximo acceso recarga con la sesión de quien lo use
+    global _refresco_pendiente
+    _refresco_pendiente = True
+
+
+def instalar_senal_refresco(signum: int = signal.SIGHUP) -> None:
+    """
+    `kill -HUP <pid>` marca el catálogo para recargarse (ej: después de editar estados_turno a mano).
+    Solo se puede instalar desde el hilo principal.
+    """
+    try:
+        signal.signal(signum, lambda *_: solicitar_refresco_estados())
+    except (ValueError, AttributeError):
+        pass
+
+
+def estados_json(db: Session) -> tuple[bytes, str]:
+    """
+    JSON de GET /api/estados_turno y su ETag. Se serializa solo si cambió el registro.
+    """
+    global _json_estados
+    registro = get_registro_estados(db)
+    cache = _json_estados
+    if cache is not None and cache[0] is registro:
+        return cache[1], cache[2]
+
+    cuerpo = serializar_lista(EstadoTurnoOut, registro.estados)
+    _json_estados = (registro, cuerpo, calcular_etag(cuerpo))
+    return cuerpo, _json_estados[2]
+
+
+def estado_id_por_codigo(db: Session, codigo: str) -> int:
+    registro = get_registro_estados(db)
+    estado_id = registro.id_por_codigo.get(codigo)
+    if estado_id is None:
+        # Puede ser un estado agregado después de la carga: se reintenta una vez con datos frescos
+        estado_id = refrescar_registro_estados(db).id_por_codigo.get(codigo)
+    if estado_id is None:
+        raise HTTPException(status_code=500, detail=f"Estado '{codigo}' no existe en estados_turno.")
+    return estado_id
+
+
+def codigo_por_estado_id(db: Session, estado_id: int) -> str:
+    registro = get_registro_estados(db)
+    codigo = registro.codigo_por_id.get(estado_id)
+    if codigo is None:
+        codigo = refrescar_registro_estados(db).codigo_por_id.get(estado_id)
+    if codigo is None:
+        raise HTTPException(status_code=500, detail=f"Estado con id '{estado_id}' no existe en estados_turno.")
+    return codigo
+
+
+def compilar_transiciones(
+    db: Session, transiciones: Mapping[tuple[str, str], str]
+) -> Mapping[tuple[int, str], int]:
+    """
+    Traduce la FSM por códigos {(codigo, evento): codigo} a {(estado_id, evento): estado_id}.
+    Se recompila solo si cambió el registro.
+    """
+    global _fsm_compilada
+    registro = get_registro_estados(db)
+    cache = _fsm_compilada
+    if cache is not None and cache[0] is registro and cache[1] is transiciones:
+        return cache[2]
+
+    compilada = MappingProxyType({
+        (estado_id_por_codigo(db, origen), evento): estado_id_por_codigo(db, destino)
+        for (origen, evento), destino in transiciones.items()
+    })
+    # Se guarda junto al registro usado (no por id(), que se puede reciclar)
+    _fsm_compilada = (get_registro_estados(db), transiciones, compilada)
+    return compilada
+
@@ -1,41 +1,113 @@
 from datetime import datetime, timedelta
+import os
+import random
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, update, insert, or_, event
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from fastapi import HTTPException
 
 from app.models.notificacion_model import Notificacion
 from app.models.turno_model import Turno
 from app.models.paciente_model import Paciente
-from app.models.profesional_model import Profesional
+from app.services.plantillas_notificaciones import parametros_turno
 
-MAX_INTENTOS = 3
+MAX_INTENTOS = int(os.getenv("NOTIF_MAX_INTENTOS", "3"))  # al llegar acá sin éxito queda FALLIDA
+NOTIF_BACKOFF_BASE_SEG = int(os.getenv("NOTIF_BACKOFF_BASE_SEG", "30"))
+NOTIF_BACKOFF_MAX_SEG = int(os.getenv("NOTIF_BACKOFF_MAX_SEG", "3600"))
 
 def _now_utc() -> datetime:
     return datetime.utcnow()
 
-def _mensaje_solicitud_confirmacion(turno: Turno, paciente: Paciente, profesional: Profesional) -> str:
-    return (
-        f"Hola {paciente.nombre}. Tenés una reserva para kinesiología con {profesional.nombre} "
-        f"el {turno.fecha_hora_inicio}. Por favor, respondé para confirmar o cancelar."
-    )
+def calcular_proxima_ejecucion(intentos: int, ahora: datetime) -> datetime:
+    """
+    Backoff exponencial con jitter para el reintento número `intentos` (1 = después del primer fallo):
+    base * 2^(intentos-1), tope NOTIF_BACKOFF_MAX_SEG, y se sortea entre la mitad y el total de esa espera
+    para que los fallos simultáneos (ej: proveedor caído) no se reintenten todos juntos.
+    """
+    espera = min(NOTIF_BACKOFF_MAX_SEG, NOTIF_BACKOFF_BASE_SEG * 2 ** max(0, intentos - 1))
+    return ahora + timedelta(seconds=random.uniform(espera / 2, espera))
 
-def _mensaje_confirmacion(turno: Turno, paciente: Paciente, profesional: Profesional) -> str:
-    return (
-        f"Confirmado ✅ {paciente.nombre}: tu turno con {profesional.nombre} "
-        f"es el {turno.fecha_hora_inicio}."
-    )
+def resultado_fallo(intentos: int, error: str, ahora: datetime) -> dict:
+    # Columnas a grabar cuando falla el intento número `intentos`
+    if intentos >= MAX_INTENTOS:
+        return {"intentos": intentos, "estado": "FALLIDA", "ultimo_error": error}
+    return {"intentos": intentos, "ultimo_error": error, "proxima_ejecucion": calcular_proxima_ejecucion(intentos, ahora)}
 
-def _mensaje_recordatorio(turno: Turno, paciente: Paciente, profesional: Profesional, etiqueta: str) -> str:
-    return (
-        f"Recordatorio ({etiqueta}) ⏰ {paciente.nombre}: tu turno con {profesional.nombre} "
-        f"es el {turno.fecha_hora_inicio}."
-    )
+# ---- Avisos al temporizador en memoria (ver app/notificaciones_timer.py) ----
+# Las altas/cancelaciones se informan recién después del commit (si hay rollback no pasó nada).
+_oyente = None
 
-def _mensaje_cancelacion(turno: Turno, paciente: Paciente, profesional: Profesional) -> str:
-    return (
-        f"Cancelado ❌ {paciente.nombre}: tu turno con {profesional.nombre} "
-        f"del {turno.fecha_hora_inicio} fue cancelado."
-    )
+def registrar_oyente_notificaciones(oyente) -> None:
+    # oyente.programar(dedupe_key, turno_id, cuando) / oyente.cancelar_turnos(turno_ids); None para desregistrar
+    global _oyente
+    _oyente = oyente
+
+def _avisar_altas(db: Session, filas: list[dict]) -> None:
+    if _oyente is not None and filas:
+        db.info.setdefault("notif_altas", []).extend(
+            (f["dedupe_key"], f["turno_id"], f["programada_para"]) for f in filas
+        )
+
+def _avisar_cancelaciones(db: Session, turno_ids) -> None:
+    if _oyente is not None and turno_ids:
+        db.info.setdefault("notif_cancelaciones", set()).update(turno_ids)
+
+@event.listens_for(Session, "after_commit")
+def _avisar_despues_del_commit(session: Session):
+    altas = session.info.pop("notif_altas", [])
+    cancelaciones = session.info.pop("notif_cancelaciones", set())
+    oyente = _oyente
+    if oyente is None:
+        return
+    if cancelaciones:
+        oyente.cancelar_turnos(cancelaciones)
+    for dedupe_key, turno_id, cuando in altas:
+        oyente.programar(dedupe_key, turno_id, cuando)
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_avisos(session: Session):
+    session.info.pop("notif_altas", None)
+    session.info.pop("notif_cancelaciones", None)
+
+# ---- Alta y cancelación en bloque ----
+
+def _insert_ignorando_duplicados(db: Session):
+    # INSERT multi-fila donde un dedupe_key que ya existe se saltea en la base, sin abortar la transacción
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "mysql":
+        stmt = mysql_insert(Notificacion)
+        # No-op sobre la fila existente (más seguro que INSERT IGNORE, que también silencia errores de FK)
+        return stmt.on_duplicate_key_update(id=stmt.table.c.id)
+    if dialecto == "sqlite":
+        return sqlite_insert(Notificacion).on_conflict_do_nothing(index_elements=["dedupe_key"])
+    return None
+
+def encolar_notificaciones(db: Session, notifs: list[dict]) -> int:
+    """
+    Encola en un solo INSERT (las que ya existen, mismo dedupe_key, quedan como están).
+    Cada dict trae turno_id, paciente_id, canal, tipo, programada_para, dedupe_key y parametros o mensaje.
+    Devuelve cuántas se mandaron a encolar: con ON DUPLICATE KEY, MySQL no distingue nuevas de existentes.
+    """
+    if not notifs:
+        return 0
+    ahora = _now_utc()
+    filas = [
+        {"parametros": None, "mensaje": None, **n, "estado": "PENDIENTE", "intentos": 0, "creado_en": ahora}
+        for n in notifs
+    ]
+    stmt = _insert_ignorando_duplicados(db)
+    if stmt is None:
+        # Otros motores: se filtran las existentes antes (puede chocar con un alta concurrente)
+        existentes = set(db.execute(
+            select(Notificacion.dedupe_key).where(Notificacion.dedupe_key.in_([f["dedupe_key"] for f in filas]))
+        ).scalars())
+        filas = [f for f in filas if f["dedupe_key"] not in existentes]
+        stmt = insert(Notificacion)
+    if filas:
+        db.execute(stmt, filas)
+    _avisar_altas(db, filas)
+    return len(filas)
 
 def enqueue_notificacion(
     db: Session,
@@ -44,129 +116,206 @@ def enqueue_notificacion(
     paciente_id: int,
     canal: str,
     tipo: str,
-    mensaje: str,
     programada_para: datetime,
     dedupe_key: str,
+    parametros: dict | None = None,
+    mensaje: str | None = None,
 ):
-    notif = Notificacion(
+    # Con `parametros` el texto sale de la plantilla del tipo al enviar; `mensaje` es para texto libre
+    encolar_notificaciones(db, [dict(
         turno_id=turno_id,
         paciente_id=paciente_id,
         canal=canal,
         tipo=tipo,
+        parametros=parametros,
         mensaje=mensaje,
         programada_para=programada_para,
-        estado="PENDIENTE",
-        intentos=0,
-        creado_en=_now_utc(),
         dedupe_key=dedupe_key,
-    )
-    db.add(notif)
-
-def cancelar_notificaciones_pendientes_de_turno(db: Session, turno_id: int):
-    ahora = _now_utc()
-    pendientes = db.execute(
-        select(Notificacion).where(
-            Notificacion.turno_id == turno_id,
-            Notificacion.estado == "PENDIENTE",
-        )
-    ).scalars().all()
-
-    for n in pendientes:
-        n.estado = "CANCELADA"
-        n.cancelada_en = ahora
-        db.add(n)
+    )])
 
+def cancelar_notificaciones_pendientes_de_turnos(db: Session, turno_ids) -> int:
+    # Un solo UPDATE para todos los turnos (devuelve cuántas se cancelaron)
+    if not turno_ids:
+        return 0
+    res = db.execute(
+        update(Notificacion)
+        .where(Notificacion.turno_id.in_(list(turno_ids)), Notificacion.estado == "PENDIENTE")
+        # También se suelta el lease: el despachador que la tenga reclamada ya no la manda ni le graba resultado
+        .values(estado="CANCELADA", cancelada_en=_now_utc(), reclamada_por=None, reclamada_hasta=None)
+        .execution_options(synchronize_session=False)
+    )
+    _avisar_cancelaciones(db, turno_ids)
+    return res.rowcount
 
-def programar_notifs_creacion_turno(db: Session, turno: Turno):
-    paciente = db.get(Paciente, turno.paciente_id)
-    profesional = db.get(Profesional, turno.profesional_id)
-    if not paciente or not profesional:
-        raise HTTPException(status_code=500, detail="Faltan datos para notificar (paciente/profesional).")
+def cancelar_notificaciones_pendientes_de_turno(db: Session, turno_id: int) -> int:
+    return cancelar_notificaciones_pendientes_de_turnos(db, [turno_id])
 
-    canal = paciente.canal_contacto  # whatsapp/telegram/sms
+# ---- Notificaciones por evento del turno ----
 
-    enqueue_notificacion(
-        db,
+def _notifs_creacion(turno: Turno, canal: str) -> list[dict]:
+    return [dict(
         turno_id=turno.id,
-        paciente_id=paciente.id,
+        paciente_id=turno.paciente_id,
         canal=canal,
         tipo="SOLICITUD_CONFIRMACION",
-        mensaje=_mensaje_solicitud_confirmacion(turno, paciente, profesional),
+        parametros=parametros_turno(turno),
         programada_para=_now_utc(),
         dedupe_key=f"turno:{turno.id}:SOLICITUD_CONFIRMACION",
-    )
-
-def programar_notifs_confirmacion(db: Session, turno: Turno):
-    paciente = db.get(Paciente, turno.paciente_id)
-    profesional = db.get(Profesional, turno.profesional_id)
-    if not paciente or not profesional:
-        raise HTTPException(status_code=500, detail="Faltan datos para notificar (paciente/profesional).")
-
-    canal = paciente.canal_contacto
+    )]
+def _notifs_confirmacion(turno: Turno, canal: str) -> list[dict]:
+    ahora = _now_utc()
+    parametros = parametros_turno(turno)
 
     # confirmación inmediata
-    enqueue_notificacion(
-        db,
+    notifs = [dict(
         turno_id=turno.id,
-        paciente_id=paciente.id,
+        paciente_id=turno.paciente_id,
         canal=canal,
         tipo="CONFIRMACION",
-        mensaje=_mensaje_confirmacion(turno, paciente, profesional),
-        programada_para=_now_utc(),
+        parametros=parametros,
+        programada_para=ahora,
         dedupe_key=f"turno:{turno.id}:CONFIRMACION",
-    )
+    )]
 
     # recordatorios 24h y 2h (solo si son futuros)
     t24 = turno.fecha_hora_inicio - timedelta(hours=24)
-    if t24 > _now_utc():
-        enqueue_notificacion(
-            db,
+    if t24 > ahora:
+        notifs.append(dict(
             turno_id=turno.id,
-            paciente_id=paciente.id,
+            paciente_id=turno.paciente_id,
             canal=canal,
             tipo="RECORDATORIO_24H",
-            mensaje=_mensaje_recordatorio(turno, paciente, profesional, "24h"),
+            parametros=parametros,
             programada_para=t24,
             dedupe_key=f"turno:{turno.id}:RECORDATORIO_24H",
-        )
+        ))
 
     t2 = turno.fecha_hora_inicio - timedelta(hours=2)
-    if t2 > _now_utc():
-        enqueue_notificacion(
-            db,
+    if t2 > ahora:
+        notifs.append(dict(
             turno_id=turno.id,
-            paciente_id=paciente.id,
+            paciente_id=turno.paciente_id,
             canal=canal,
             tipo="RECORDATORIO_2H",
-            mensaje=_mensaje_recordatorio(turno, paciente, profesional, "2h"),
+            parametros=parametros,
             programada_para=t2,
             dedupe_key=f"turno:{turno.id}:RECORDATORIO_2H",
-        )
-
-def programar_notifs_cancelacion(db: Session, turno: Turno):
-    paciente = db.get(Paciente, turno.paciente_id)
-    profesional = db.get(Profesional, turno.profesional_id)
-    if not paciente or not profesional:
-        raise HTTPException(status_code=500, detail="Faltan datos para notificar (paciente/profesional).")
+        ))
+    return notifs
 
-    canal = paciente.canal_contacto
-
-    enqueue_notificacion(
-        db,
+def _notifs_cancelacion(turno: Turno, canal: str) -> list[dict]:
+    return [dict(
         turno_id=turno.id,
-        paciente_id=paciente.id,
+        paciente_id=turno.paciente_id,
         canal=canal,
         tipo="CANCELACION",
-        mensaje=_mensaje_cancelacion(turno, paciente, profesional),
+        parametros=parametros_turno(turno),
         programada_para=_now_utc(),
         dedupe_key=f"turno:{turno.id}:CANCELACION",
-    )
+    )]
+
+def programar_notifs_lote(
+    db: Session, *, creados: list[Turno] = (), confirmados: list[Turno] = (), cancelados: list[Turno] = ()
+) -> int:
+    """
+    Encola las notificaciones de alta/confirmación/cancelación de muchos turnos a la vez: el canal de todos
+    los pacientes en una consulta y todas las notificaciones en un INSERT (las que ya existen se saltean).
+    Acepta turnos o filas con id, paciente_id, profesional_id y fecha_hora_inicio.
+    """
+    turnos = [*creados, *confirmados, *cancelados]
+    if not turnos:
+        return 0
+
+    canales = dict(db.execute(
+        select(Paciente.id, Paciente.canal_contacto).where(Paciente.id.in_({t.paciente_id for t in turnos}))
+    ).all())
+
+    notifs = []
+    grupos = ((creados, _notifs_creacion), (confirmados, _notifs_confirmacion), (cancelados, _notifs_cancelacion))
+    for turnos_grupo, armar in grupos:
+        for t in turnos_grupo:
+            canal = canales.get(t.paciente_id)  # whatsapp/telegram/sms
+            if not canal:
+                raise HTTPException(status_code=500, detail="Faltan datos para notificar (paciente/profesional).")
+            notifs.extend(armar(t, canal))
+    return encolar_notificaciones(db, notifs)
+
+def programar_notifs_creacion_turno(db: Session, turno: Turno):
+    programar_notifs_lote(db, creados=[turno])
+
+def programar_notifs_confirmacion(db: Session, turno: Turno):
+    programar_notifs_lote(db, confirmados=[turno])
+
+def programar_notifs_cancelacion(db: Session, turno: Turno):
+    programar_notifs_lote(db, cancelados=[turno])
 
 def obtener_notificaciones_pendientes(db: Session, ahora: datetime, limit: int = 50):
     return db.execute(
         select(Notificacion).where(
             Notificacion.estado == "PENDIENTE",
-            Notificacion.programada_para <= ahora,
-            Notificacion.intentos < MAX_INTENTOS,
-        ).order_by(Notificacion.programada_para.asc()).limit(limit)
+            Notificacion.proxima_ejecucion <= ahora,
+        ).order_by(Notificacion.proxima_ejecucion.asc()).limit(limit)
     ).scalars().all()
+
+def reclamar_notificaciones(db: Session, worker_id: str, ahora: datetime, *, limit: int, lease_seg: int) -> list:
+    """
+    Reclama hasta `limit` pendientes vencidas para `worker_id` y las devuelve (filas con lo necesario para enviar,
+    el reclamo ya commiteado):
+    - SELECT ... FOR UPDATE SKIP LOCKED: dos despachadores reclamando a la vez se reparten filas distintas
+    - un UPDATE estampa reclamada_por / reclamada_hasta (lease); mientras no venza, nadie más la toma
+    - si el despachador muere sin grabar el resultado, al vencer el lease la fila vuelve a ser elegible
+    """
+    filas = db.execute(
+        select(
+            Notificacion.id,
+            Notificacion.turno_id,
+            Notificacion.paciente_id,
+            Notificacion.canal,
+            Notificacion.tipo,
+            Notificacion.mensaje,
+            Notificacion.parametros,
+            Notificacion.intentos,
+        )
+        .where(
+            # Rango sobre idx_notif_estado_proxima: las que fallan se corren al futuro y no tapan a las sanas
+            Notificacion.estado == "PENDIENTE",
+            Notificacion.proxima_ejecucion <= ahora,
+            or_(Notificacion.reclamada_hasta == None, Notificacion.reclamada_hasta < ahora),
+        )
+        .order_by(Notificacion.proxima_ejecucion.asc())
+        .limit(limit)
+        .with_for_update(of=Notificacion, skip_locked=True)
+    ).all()
+
+    if filas:
+        db.execute(
+            update(Notificacion)
+            .where(Notificacion.id.in_([n.id for n in filas]))
+            .values(reclamada_por=worker_id, reclamada_hasta=ahora + timedelta(seconds=lease_seg))
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()  # libera los locks de fila: desde acá protege el lease
+    return filas
+
+def renovar_lease(db: Session, worker_id: str, ids, ahora: datetime, *, lease_seg: int) -> set[int]:
+    """
+    Extiende el lease de las notificaciones `ids` que `worker_id` sigue teniendo reclamadas y PENDIENTE (commitea).
+    Devuelve las que ya no: se cancelaron mientras tanto o, si el lease llegó a vencer, las tomó otro despachador.
+    """
+    ids = list(ids)
+    if not ids:
+        return set()
+    mias = (
+        Notificacion.id.in_(ids),
+        Notificacion.reclamada_por == worker_id,
+        Notificacion.estado == "PENDIENTE",
+    )
+    db.execute(
+        update(Notificacion)
+        .where(*mias)
+        .values(reclamada_hasta=ahora + timedelta(seconds=lease_seg))
+        .execution_options(synchronize_session=False)
+    )
+    vigentes = set(db.execute(select(Notificacion.id).where(*mias)).scalars())
+    db.commit()
+    return set(ids) - vigentes
@@ -0,0 +1,67 @@
+# Perfiles de carga de relaciones: los modelos ya no declaran lazy="joined", cada consulta elige
+# explícitamente qué necesita. Así un SELECT ... FOR UPDATE no arrastra (ni bloquea) tablas que no usa.
+from sqlalchemy.orm import joinedload, selectinload, raiseload
+
+from app.models.turno_model import Turno
+from app.models.turno_archivo_model import TurnoArchivo
+from app.models.bloqueo_agenda_model import BloqueoAgenda
+from app.models.usuario_model import Usuario
+
+PERFIL_MINIMO = "minimal"  # solo columnas propias; tocar una relación es un error (no hay lazy load escondido)
+PERFIL_FOR_UPDATE = "for-update"  # igual que minimal, pensado para SELECT ... FOR UPDATE OF <tabla>
+PERFIL_API_DETALLE = "api-detail"  # lo que serializa el schema *Out de un solo objeto
+PERFIL_API_LISTA = "api-list"  # lo mismo para listados: relaciones repetidas van por selectin (IN) en vez de JOIN
+
+_PERFILES = {
+    Turno: {
+        PERFIL_MINIMO: (raiseload("*"),),
+        PERFIL_FOR_UPDATE: (raiseload("*"),),
+        PERFIL_API_DETALLE: (
+            joinedload(Turno.estado),
+            joinedload(Turno.paciente),
+            joinedload(Turno.profesional),
+            raiseload("*"),
+        ),
+        PERFIL_API_LISTA: (
+            joinedload(Turno.estado),
+            selectinload(Turno.paciente),
+            selectinload(Turno.profesional),
+            raiseload("*"),
+        ),
+    },
+    # Solo lectura: se sirve con TurnoOut igual que un turno vivo
+    TurnoArchivo: {
+        PERFIL_MINIMO: (raiseload("*"),),
+        PERFIL_API_DETALLE: (
+            joinedload(TurnoArchivo.estado),
+            joinedload(TurnoArchivo.paciente),
+            joinedload(TurnoArchivo.profesional),
+            raiseload("*"),
+        ),
+    },
+    BloqueoAgenda: {
+        PERFIL_MINIMO: (raiseload("*"),),
+        PERFIL_FOR_UPDATE: (raiseload("*"),),
+        # BloqueoAgendaOut no expone relaciones
+        PERFIL_API_DETALLE: (raiseload("*"),),
+        PERFIL_API_LISTA: (raiseload("*"),),
+    },
+    Usuario: {
+        PERFIL_MINIMO: (raiseload("*"),),
+        PERFIL_FOR_UPDATE: (raiseload("*"),),
+        # UsuarioOut solo usa los nombres de roles
+        PERFIL_API_DETALLE: (selectinload(Usuario.roles), raiseload("*")),
+        PERFIL_API_LISTA: (selectinload(Usuario.roles), raiseload("*")),
+    },
+}
+
+
+def opciones_carga(modelo, perfil: str) -> tuple:
+    """
+    Opciones de carga (para .options(*...)) del perfil pedido. Ej:
+        select(Turno).options(*opciones_carga(Turno, PERFIL_API_DETALLE))
+    """
+    try:
+        return _PERFILES[modelo][perfil]
+    except KeyError:
+        raise ValueError(f"Perfil de carga desconocido: {modelo.__name__}/{perfil}")
@@ -0,0 +1,84 @@
+# Texto de las notificaciones por tipo. Cada notificación guarda solo sus parámetros (JSON chico con el
+# profesional y la fecha del turno) y el mensaje se arma al enviarla, con los nombres de pacientes y
+# profesionales traídos en bloque para todo el lote (ver notificaciones_scheduler).
+from datetime import datetime
+from string import Formatter
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.profesional_model import Profesional
+
+# Campos disponibles: {paciente}, {profesional}, {fecha}
+PLANTILLAS = {
+    "SOLICITUD_CONFIRMACION": (
+        "Hola {paciente}. Tenés una reserva para kinesiología con {profesional} el {fecha}. "
+        "Por favor, respondé para confirmar o cancelar."
+    ),
+    "CONFIRMACION": "Confirmado ✅ {paciente}: tu turno con {profesional} es el {fecha}.",
+    "RECORDATORIO_24H": "Recordatorio (24h) ⏰ {paciente}: tu turno con {profesional} es el {fecha}.",
+    "RECORDATORIO_2H": "Recordatorio (2h) ⏰ {paciente}: tu turno con {profesional} es el {fecha}.",
+    "CANCELACION": "Cancelado ❌ {paciente}: tu turno con {profesional} del {fecha} fue cancelado.",
+}
+
+_DIAS = ("lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo")
+
+
+class Plantilla:
+    # Se parsea una sola vez: renderizar es concatenar literales y valores, sin volver a leer el formato
+    def __init__(self, texto: str):
+        self.partes = [(literal, campo) for literal, campo, _, _ in Formatter().parse(texto)]
+
+    def renderizar(self, valores: dict[str, str]) -> str:
+        return "".join(literal + valores[campo] if campo else literal for literal, campo in self.partes)
+
+
+_COMPILADAS = {tipo: Plantilla(texto) for tipo, texto in PLANTILLAS.items()}
+
+
+def parametros_turno(turno) -> dict:
+    # Lo que se guarda por notificación: el resto (nombres) se resuelve al enviar
+    return {"prof": turno.profesional_id, "inicio": turno.fecha_hora_inicio.isoformat(timespec="minutes")}
+
+
+def formatear_fecha(fecha: datetime) -> str:
+    # "martes 21/10 a las 15:30"
+    return f"{_DIAS[fecha.weekday()]} {fecha:%d/%m} a las {fecha:%H:%M}"
+
+
+def renderizar(tipo: str, parametros: dict, paciente: str, profesional: str) -> str:
+    plantilla = _COMPILADAS.get(tipo)
+    if plantilla is None:
+        raise ValueError(f"No hay plantilla para el tipo {tipo}")
+    return plantilla.renderizar({
+        "paciente": paciente,
+        "profesional": profesional,
+        "fecha": formatear_fecha(datetime.fromisoformat(parametros["inicio"])),
+    })
+
+
+def renderizar_lote(db: Session, filas, pacientes: dict[int, str]) -> dict[int, str | Exception]:
+    """
+    Mensaje de cada notificación del lote (filas con id, tipo, paciente_id, mensaje, parametros).
+    `pacientes` (id -> nombre) lo trae el despachador junto con los teléfonos; los profesionales se traen
+    acá, en una sola consulta. Las que traen `mensaje` (texto libre o filas anteriores a las plantillas)
+    se envían tal cual; si una no se puede armar, su valor es la excepción.
+    """
+    a_renderizar = [f for f in filas if f.mensaje is None]
+    prof_ids = {f.parametros.get("prof") for f in a_renderizar if f.parametros}
+    profesionales = dict(db.execute(
+        select(Profesional.id, Profesional.nombre).where(Profesional.id.in_(prof_ids))
+    ).all()) if prof_ids else {}
+
+    mensajes: dict[int, str | Exception] = {}
+    for f in filas:
+        if f.mensaje is not None:
+            mensajes[f.id] = f.mensaje
+            continue
+        try:
+            mensajes[f.id] = renderizar(
+                f.tipo, f.parametros, pacientes[f.paciente_id], profesionales[f.parametros["prof"]]
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            mensajes[f.id] = e
+    return mensajes
@@ -1,12 +1,48 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from dataclasses import dataclass
+import os
+
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy import select, update, event, inspect
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import TTLCache
 from app.models.usuario_model import Usuario
 from app.models.rol_model import Rol
 from app.models.rol_permiso_model import RolPermiso
 from app.models.permiso_model import Permiso
 
+USER_CACHE_TTL_SEG = int(os.getenv("USER_CACHE_TTL_SEG", "60"))
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class RolSnapshot:
+    id: int
+    nombre: str
+
+
+@dataclass(frozen=True)
+class UsuarioSnapshot:
+    """
+    Foto inmutable del usuario autenticado (sin sesión de DB atrás), con su mapa de permisos ya resuelto.
+    Se puede compartir entre requests sin riesgo de lazy loads sobre una sesión cerrada.
+    """
+    id: int
+    username: str
+    email: str | None
+    profesional_id: int | None
+    perms_version: int
+    roles: tuple[RolSnapshot, ...]
+    perms_map: dict[str, frozenset[str]]
+
+
+_usuarios_cache = TTLCache("usuarios", maxsize=USER_CACHE_MAXSIZE, ttl_seg=USER_CACHE_TTL_SEG)
+
+# Tabla de versiones del proceso (user_id -> usuarios.perms_version) para autorizar con los claims del token sin ir
+# a la DB. Los cambios hechos en este proceso se ven al commitear; los de otro proceso, vencido el TTL (el mismo
+# margen que ya tiene el snapshot de get_current_user).
+_versiones_cache = TTLCache("perms_version", maxsize=USER_CACHE_MAXSIZE, ttl_seg=USER_CACHE_TTL_SEG)
+
 
 def get_user_with_roles_and_permissions(db: Session, user_id: int) -> Usuario | None:
     stmt = (
@@ -34,4 +70,149 @@ def build_permissions_map(user: Usuario) -> dict[str, set[str]]:
 
 
 def has_permission(perms_map: dict[str, set[str]], code: str) -> set[str]:
-    return perms_map.get(code, set())
\ No newline at end of file
+    return perms_map.get(code, set())
+
+
+def scope_efectivo(scopes) -> str | None:
+    # ANY incluye a OWN; None = no tiene el permiso
+    if "ANY" in scopes:
+        return "ANY"
+    if "OWN" in scopes:
+        return "OWN"
+    return None
+
+
+def build_user_snapshot(user: Usuario) -> UsuarioSnapshot:
+    perms_map = build_permissions_map(user)
+    return UsuarioSnapshot(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        profesional_id=user.profesional_id,
+        perms_version=user.perms_version,
+        roles=tuple(RolSnapshot(id=r.id, nombre=r.nombre) for r in (user.roles or [])),
+        perms_map={code: frozenset(scopes) for code, scopes in perms_map.items()},
+    )
+
+
+def get_user_snapshot(db: Session, user_id: int, *, perms_version: int | None = None) -> UsuarioSnapshot | None:
+    """
+    Resuelve usuario + permisos pasando primero por la cache del proceso.
+    Solo se cachean usuarios activos encontrados (los inexistentes/inactivos siempre van a la DB).
+    Con `perms_version` (la vigente en la DB) no se usa un snapshot cacheado de otra versión.
+    """
+    snapshot = _usuarios_cache.get(user_id)
+    if snapshot is not None and perms_version in (None, snapshot.perms_version):
+        return snapshot
+
+    user = get_user_with_roles_and_permissions(db, user_id)
+    if not user:
+        return None
+
+    snapshot = build_user_snapshot(user)
+    _usuarios_cache.set(user_id, snapshot)
+    _versiones_cache.set(user_id, snapshot.perms_version)
+    return snapshot
+
+
+def perms_version_vigente(db: Session, user_id: int) -> int | None:
+    # Lectura por PK de usuarios.perms_version (None si el usuario no existe o está inactivo)
+    return db.execute(
+        select(Usuario.perms_version).where(Usuario.id == user_id, Usuario.activo == True)
+    ).scalar_one_or_none()
+
+
+def perms_version_conocida(db: Session, user_id: int, version_token: int) -> int | None:
+    """
+    usuarios.perms_version según la tabla del proceso. Va a la DB solo si no la tiene o si el token es más nuevo
+    (los roles cambiaron en otro proceso y el token se emitió después); un token más viejo ya no sirve y no hace
+    falta confirmarlo. None si el usuario no existe o está inactivo.
+    """
+    version = _versiones_cache.get(user_id)
+    if version is None or version < version_token:
+        version = perms_version_vigente(db, user_id)
+        if version is None:
+            return None
+        _versiones_cache.set(user_id, version)
+    return version
+
+
+def incrementar_perms_version(db: Session, user_ids=None) -> None:
+    """
+    Invalida los permisos firmados en los tokens de estos usuarios (None = todos, ej: cambian los permisos de un rol).
+    Va en la transacción del cambio: este proceso lo ve al commitear, los demás al vencer su tabla de versiones.
+    """
+    stmt = update(Usuario).values(perms_version=Usuario.perms_version + 1)
+    if user_ids is not None:
+        stmt = stmt.where(Usuario.id.in_(list(user_ids)))
+    db.execute(stmt, execution_options={"synchronize_session": False})
+
+
+def compact_permissions_map(perms_map: dict[str, frozenset[str]]) -> dict[str, str]:
+    """
+    {"turnos.ver": {"OWN","ANY"}} -> {"turnos.ver": "ANY"} (ANY incluye a OWN)
+    """
+    return {code: ("ANY" if "ANY" in scopes else "OWN") for code, scopes in perms_map.items() if scopes}
+
+
+def build_permission_claims(snapshot: UsuarioSnapshot) -> dict:
+    return {
+        "perms": compact_permissions_map(snapshot.perms_map),
+        "pv": snapshot.perms_version,
+    }
+
+
+def tiene_claims_permisos(payload: dict) -> bool:
+    return isinstance(payload.get("perms"), dict) and isinstance(payload.get("pv"), int)
+
+
+def scopes_desde_claims(payload: dict, code: str, version_vigente: int) -> set[str] | None:
+    """
+    Scopes del permiso según los claims del token, o None si el token no sirve para decidir
+    (no trae claims o los roles del usuario cambiaron después de emitirlo).
+    `version_vigente` es usuarios.perms_version (ver perms_version_conocida).
+    """
+    if not tiene_claims_permisos(payload):
+        return None
+    perms = payload["perms"]
+    if payload["pv"] != version_vigente:
+        return None
+
+    scope = perms.get(code)
+    return {scope} if scope else set()
+
+
+def invalidar_cache_usuario(user_id: int) -> None:
+    # Solo la cache de este proceso: los otros se enteran al vencer el TTL
+    _usuarios_cache.invalidate(user_id)
+    _versiones_cache.invalidate(user_id)
+
+
+def invalidar_cache_usuario_al_commitear(db: Session, user_id: int) -> None:
+    # Antes del commit otro request todavía lee los roles viejos y los volvería a cachear por todo el TTL
+    db.info.setdefault("usuarios_invalidar", set()).add(user_id)
+
+
+@event.listens_for(Usuario, "before_update")
+def _versionar_si_cambia_activo(mapper, connection, target: Usuario):
+    # Desactivar un usuario (por cualquier camino) invalida sus tokens con permisos en todos los procesos
+    if inspect(target).attrs.activo.history.has_changes():
+        target.perms_version = Usuario.perms_version + 1
+
+
+@event.listens_for(Usuario, "after_update")
+def _invalidar_si_cambia_activo(mapper, connection, target: Usuario):
+    # Desactivar un usuario (por cualquier camino) tiene que cortar su acceso sin esperar el TTL
+    if inspect(target).attrs.activo.history.has_changes():
+        invalidar_cache_usuario_al_commitear(object_session(target), target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_despues_del_commit(session: Session):
+    for user_id in session.info.pop("usuarios_invalidar", ()):
+        invalidar_cache_usuario(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_invalidaciones(session: Session):
+    session.info.pop("usuarios_invalidar", None)
@@ -0,0 +1,245 @@
+# Camino de lectura liviano para listados de turnos: filas Core con solo las columnas de TurnoOut,
+# serializadas directo a JSON (sin identity map del ORM ni validación Pydantic por fila).
+# El JSON resultante es byte a byte el mismo que produce response_model=list[TurnoOut].
+# Los turnos archivados (ver app/archivado.py) se leen en la misma consulta con UNION ALL.
+# También la exportación completa (GET /api/turnos/export), que se transmite de a pedazos en memoria constante.
+import csv
+import heapq
+import io
+import json
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, select, union_all, func
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import visitors
+
+from app.database import SessionLocal
+from app.models.turno_model import Turno
+from app.models.turno_archivo_model import TurnoArchivo
+from app.models.estado_turno_model import EstadoTurno
+from app.models.paciente_model import Paciente
+from app.models.profesional_model import Profesional
+from app.core.paginacion import codificar_cursor
+from app.services.turnos_service import condiciones_cursor
+
+
+def columnas_turno_out(modelo=Turno) -> tuple:
+    # Mismo orden de campos que TurnoOut / EstadoTurnoOut / PacienteOut / ProfesionalOut
+    # (modelo: Turno o TurnoArchivo, que tienen las mismas columnas)
+    return (
+        modelo.id,
+        modelo.paciente_id,
+        modelo.profesional_id,
+        modelo.estado_id,
+        EstadoTurno.codigo.label("estado_codigo"),
+        EstadoTurno.descripcion.label("estado_descripcion"),
+        Paciente.id.label("pac_id"),
+        Paciente.nombre.label("pac_nombre"),
+        Paciente.dni.label("pac_dni"),
+        Paciente.cuil.label("pac_cuil"),
+        Paciente.telefono.label("pac_telefono"),
+        Paciente.canal_contacto.label("pac_canal_contacto"),
+        Paciente.activo.label("pac_activo"),
+        Paciente.fecha_alta.label("pac_fecha_alta"),
+        Profesional.id.label("prof_id"),
+        Profesional.nombre.label("prof_nombre"),
+        Profesional.especialidad.label("prof_especialidad"),
+        Profesional.duracion_turno_min.label("prof_duracion_turno_min"),
+        Profesional.activo.label("prof_activo"),
+        modelo.fecha_hora_inicio,
+        modelo.fecha_hora_fin,
+        modelo.creado_en,
+    )
+
+
+COLUMNAS_TURNO_OUT = columnas_turno_out(Turno)
+
+
+def select_turnos_out(condiciones: list, modelo=Turno):
+    """
+    SELECT de las columnas de TurnoOut (estado, paciente y profesional en la misma fila).
+    Sirve con las condiciones de condiciones_turnos_filtrados, incluidos los filtros por nombre.
+    Con modelo=TurnoArchivo las condiciones tienen que pasar antes por en_archivo.
+    """
+    return (
+        select(*columnas_turno_out(modelo))
+        .select_from(modelo)
+        .join(EstadoTurno, EstadoTurno.id == modelo.estado_id)
+        .outerjoin(Paciente, Paciente.id == modelo.paciente_id)
+        .outerjoin(Profesional, Profesional.id == modelo.profesional_id)
+        .where(*condiciones)
+    )
+
+
+def en_archivo(condicion):
+    """
+    La misma condición sobre turnos_archivo: cada columna de `turnos` se reemplaza por la homónima del archivo,
+    así los filtros (RBAC, rango, cursor) se escriben una sola vez contra Turno.
+    """
+    turnos, archivo = Turno.__table__, TurnoArchivo.__table__
+
+    def reemplazar(elem):
+        if isinstance(elem, Column) and elem.table is turnos:
+            return archivo.c[elem.key]
+        return None
+
+    return visitors.replacement_traverse(condicion, {}, reemplazar)
+
+
+def incluir_archivo(db: Session, *, desde: datetime | None = None, solo_activos: bool = False) -> bool:
+    # El archivo solo tiene turnos cerrados y viejos: si el rango pedido empieza después, no se consulta
+    if solo_activos:
+        return False
+    ultimo_fin = db.execute(select(func.max(TurnoArchivo.fecha_hora_fin))).scalar()  # idx_turno_arch_fin
+    return ultimo_fin is not None and (desde is None or ultimo_fin > desde)
+
+
+def _fecha(dt: datetime | None) -> str | None:
+    # Pydantic (modo json) serializa datetime naive como isoformat con "T"
+    return dt.isoformat() if dt is not None else None
+
+
+def fila_a_dict(f) -> dict:
+    return {
+        "id": f.id,
+        "paciente_id": f.paciente_id,
+        "profesional_id": f.profesional_id,
+        "estado_id": f.estado_id,
+        "estado": {"id": f.estado_id, "codigo": f.estado_codigo, "descripcion": f.estado_descripcion},
+        "paciente": None if f.pac_id is None else {
+            "id": f.pac_id,
+            "nombre": f.pac_nombre,
+            "dni": f.pac_dni,
+            "cuil": f.pac_cuil,
+            "telefono": f.pac_telefono,
+            "canal_contacto": f.pac_canal_contacto,
+            "activo": bool(f.pac_activo),
+            "fecha_alta": _fecha(f.pac_fecha_alta),
+        },
+        "profesional": None if f.prof_id is None else {
+            "id": f.prof_id,
+            "nombre": f.prof_nombre,
+            "especialidad": f.prof_especialidad,
+            "duracion_turno_min": f.prof_duracion_turno_min,
+            "activo": bool(f.prof_activo),
+        },
+        "fecha_hora_inicio": _fecha(f.fecha_hora_inicio),
+        "fecha_hora_fin": _fecha(f.fecha_hora_fin),
+        "creado_en": _fecha(f.creado_en),
+    }
+
+
+def serializar_turnos(filas) -> bytes:
+    # Mismos parámetros que JSONResponse de Starlette (compacto, UTF-8 sin escapar)
+    return json.dumps(
+        [fila_a_dict(f) for f in filas],
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def listar_turnos_json(
+    db: Session, condiciones: list, *, limit: int, cursor: str | None = None, con_archivo: bool = False
+) -> tuple[bytes, str | None]:
+    """
+    Página keyset de turnos ya serializada a JSON. Devuelve (cuerpo, next_cursor).
+    Con `con_archivo` suma los archivados: cada rama trae su página por índice y se mezclan ordenadas.
+    """
+    condiciones = [*condiciones, *condiciones_cursor(cursor)]
+    stmt = (
+        select_turnos_out(condiciones)
+        .order_by(Turno.fecha_hora_inicio.asc(), Turno.id.asc())
+        .limit(limit + 1)
+    )
+    if con_archivo:
+        archivados = (
+            select_turnos_out([en_archivo(c) for c in condiciones], TurnoArchivo)
+            .order_by(TurnoArchivo.fecha_hora_inicio.asc(), TurnoArchivo.id.asc())
+            .limit(limit + 1)
+        )
+        ramas = union_all(select(stmt.subquery()), select(archivados.subquery())).subquery()
+        stmt = select(ramas).order_by(ramas.c.fecha_hora_inicio.asc(), ramas.c.id.asc()).limit(limit + 1)
+    filas = db.execute(stmt).all()
+
+    next_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        next_cursor = codificar_cursor(ultima.fecha_hora_inicio, ultima.id)
+    return serializar_turnos(filas), next_cursor
+
+
+# ---- Exportación ----
+
+EXPORT_FILAS_POR_LECTURA = int(os.getenv("EXPORT_FILAS_POR_LECTURA", "1000"))  # filas que trae cada fetch del cursor
+EXPORT_BYTES_POR_ENVIO = int(os.getenv("EXPORT_BYTES_POR_ENVIO", "65536"))  # tamaño aproximado de cada chunk HTTP
+
+FORMATOS_EXPORT = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+COLUMNAS_CSV = (
+    "id", "fecha_hora_inicio", "fecha_hora_fin", "estado", "creado_en",
+    "paciente_id", "paciente_nombre", "paciente_dni", "paciente_cuil", "paciente_telefono", "paciente_canal_contacto",
+    "profesional_id", "profesional_nombre", "profesional_especialidad",
+)
+
+
+def _fila_csv(f) -> tuple:
+    return (
+        f.id, _fecha(f.fecha_hora_inicio), _fecha(f.fecha_hora_fin), f.estado_codigo, _fecha(f.creado_en),
+        f.paciente_id, f.pac_nombre, f.pac_dni, f.pac_cuil, f.pac_telefono, f.pac_canal_contacto,
+        f.profesional_id, f.prof_nombre, f.prof_especialidad,
+    )
+
+
+def _leer_en_orden(db: Session, stmt, modelo):
+    # Cursor del lado del servidor (SSCursor en MySQL): se traen EXPORT_FILAS_POR_LECTURA filas por vez
+    stmt = stmt.order_by(modelo.fecha_hora_inicio.asc(), modelo.id.asc())
+    return db.execute(stmt.execution_options(yield_per=EXPORT_FILAS_POR_LECTURA))
+
+
+def exportar_turnos(condiciones: list, *, formato: str = "ndjson", con_archivo: bool = False):
+    """
+    Generador con el contenido de la exportación (bytes), en chunks de ~EXPORT_BYTES_POR_ENVIO, ordenado por
+    (fecha_hora_inicio, id). Una línea por turno: en ndjson cada una es el mismo JSON que un elemento de
+    GET /api/turnos; en csv, las COLUMNAS_CSV con encabezado.
+
+    Usa sus propias sesiones (la del request se cierra antes de que termine de transmitirse). Con `con_archivo`
+    lee turnos y turnos_archivo con un cursor cada uno, en orden por índice, y los intercala al vuelo: ninguna
+    de las dos consultas necesita ordenar el resultado completo.
+    """
+    sesiones = [SessionLocal()]
+    try:
+        fuentes = [_leer_en_orden(sesiones[0], select_turnos_out(condiciones), Turno)]
+        if con_archivo:
+            sesiones.append(SessionLocal())
+            archivados = select_turnos_out([en_archivo(c) for c in condiciones], TurnoArchivo)
+            fuentes.append(_leer_en_orden(sesiones[1], archivados, TurnoArchivo))
+        filas = fuentes[0] if len(fuentes) == 1 else heapq.merge(
+            *fuentes, key=lambda f: (f.fecha_hora_inicio, f.id)
+        )
+
+        buffer = io.StringIO()
+        if formato == "csv":
+            escritor = csv.writer(buffer, lineterminator="\n")
+            escritor.writerow(COLUMNAS_CSV)
+            escribir = lambda f: escritor.writerow(_fila_csv(f))
+        else:
+            escribir = lambda f: buffer.write(
+                json.dumps(fila_a_dict(f), ensure_ascii=False, separators=(",", ":")) + "\n"
+            )
+
+        for f in filas:
+            escribir(f)
+            if buffer.tell() >= EXPORT_BYTES_POR_ENVIO:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        # También si el cliente corta la descarga (el generador se cierra con GeneratorExit)
+        for db in sesiones:
+            db.close()
@@ -1,22 +1,42 @@
 #acá va la lógica del proyecto y no en los endpoints que está en app/api/turnos.py
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy import select, or_, exists, false
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, date, time, timedelta
+from bisect import bisect_left
 
 from app.models.turno_model import Turno
+from app.models.turno_archivo_model import TurnoArchivo
 from app.models.paciente_model import Paciente
 from app.models.profesional_model import Profesional
-from app.models.estado_turno_model import EstadoTurno
 from app.models.bloqueo_agenda_model import BloqueoAgenda
+from app.services.estados_turno_service import (
+    estado_id_por_codigo,
+    codigo_por_estado_id,
+    compilar_transiciones,
+)
+from app.core.paginacion import codificar_cursor, decodificar_cursor
+from app.services.perfiles_carga import (
+    opciones_carga,
+    PERFIL_MINIMO,
+    PERFIL_FOR_UPDATE,
+    PERFIL_API_DETALLE,
+    PERFIL_API_LISTA,
+)
+from app.services.disponibilidad_service import intervalos_ocupados, DURACION_MAXIMA_TURNO
 
 from app.services.notificaciones_service import (
     programar_notifs_confirmacion,
     programar_notifs_cancelacion,
     cancelar_notificaciones_pendientes_de_turno,
     programar_notifs_creacion_turno,
+    cancelar_notificaciones_pendientes_de_turnos,
+    programar_notifs_lote,
 )
+from app.services.rbac_service import has_permission, scope_efectivo
+from app.services.busqueda_service import ids_que_coinciden, ENTIDAD_PACIENTE, ENTIDAD_PROFESIONAL
+from app.services.cache_agenda import invalidar_agenda
 
 # Eventos permitidos
 EVENTO_CONFIRMAR = "confirmar_turno"
@@ -36,17 +56,42 @@ TRANSICIONES = {
     ("CONFIRMADO", EVENTO_COMPLETAR): "COMPLETADO",
 }
 
+# Ambos resuelven contra el catálogo precargado (ver estados_turno_service), sin SELECT por llamada
 def _estado_id_por_codigo(db: Session, codigo: str) -> int:
-    estado = db.execute(select(EstadoTurno).where(EstadoTurno.codigo == codigo)).scalar_one_or_none()
-    if not estado:
-        raise HTTPException(status_code=500, detail=f"Estado '{codigo}' no existe en estados_turno.")
-    return estado.id
+    return estado_id_por_codigo(db, codigo)
 
 def _codigo_por_estado_id(db: Session, estado_id: int) -> str:
-    estado = db.get(EstadoTurno, estado_id)
-    if not estado:
-        raise HTTPException(status_code=500, detail=f"Estado con id '{estado_id}' no existe en estados_turno.")
-    return estado.codigo
+    return codigo_por_estado_id(db, estado_id)
+
+def _estados_activos_ids(db: Session) -> list[int]:
+    return [_estado_id_por_codigo(db, "RESERVADO"), _estado_id_por_codigo(db, "CONFIRMADO")]
+
+def obtener_turno(db: Session, turno_id: int, perfil: str = PERFIL_API_DETALLE) -> Turno | None:
+    # populate_existing: si el turno ya está en la sesión (ej: recién commiteado) se recarga con el perfil pedido
+    return db.execute(
+        select(Turno)
+        .where(Turno.id == turno_id)
+        .options(*opciones_carga(Turno, perfil))
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+def obtener_turno_o_archivado(db: Session, turno_id: int, perfil: str = PERFIL_API_DETALLE) -> Turno | TurnoArchivo | None:
+    # Para lecturas de historial: si ya no está en turnos puede estar archivado (ver app/archivado.py)
+    turno = obtener_turno(db, turno_id, perfil)
+    if turno is None:
+        turno = db.execute(
+            select(TurnoArchivo).where(TurnoArchivo.id == turno_id).options(*opciones_carga(TurnoArchivo, perfil))
+        ).scalar_one_or_none()
+    return turno
+
+def obtener_turno_para_update(db: Session, turno_id: int) -> Turno | None:
+    # FOR UPDATE OF turnos: solo se bloquea la fila del turno, no las de estado/paciente/profesional
+    return db.execute(
+        select(Turno)
+        .where(Turno.id == turno_id)
+        .options(*opciones_carga(Turno, PERFIL_FOR_UPDATE))
+        .with_for_update(of=Turno)
+    ).scalar_one_or_none()
 
 def aplicar_evento_turno(
     db: Session,
@@ -57,9 +102,7 @@ def aplicar_evento_turno(
     user=None,
     scope: str = "ANY",  # "OWN" o "ANY"
 ):
-    turno = db.execute(
-        select(Turno).where(Turno.id == turno_id).with_for_update() # SELECT ... FOR UPDATE (bloquea)
-    ).scalar_one_or_none()
+    turno = obtener_turno_para_update(db, turno_id) # SELECT ... FOR UPDATE OF turnos (bloquea)
 
     if not turno:
         raise HTTPException(status_code=404, detail="Turno no encontrado.")
@@ -76,17 +119,18 @@ def aplicar_evento_turno(
 
     #######################################
     
-    estado_actual_codigo = _codigo_por_estado_id(db, turno.estado_id)
-
-    clave = (estado_actual_codigo, evento)
-    if clave not in TRANSICIONES:
+    # FSM compilada por ids: (estado_id, evento) -> estado_id (ver diccionario TRANSICIONES)
+    fsm = compilar_transiciones(db, TRANSICIONES)
+    nuevo_estado_id = fsm.get((turno.estado_id, evento))
+    if nuevo_estado_id is None:
+        estado_actual_codigo = _codigo_por_estado_id(db, turno.estado_id)
         raise HTTPException(
             status_code=409, 
             detail = f'Transición prohibida: {estado_actual_codigo} + {evento} no es una transición válida.'
         )
     
-    nuevo_estado_codigo = TRANSICIONES[clave] # devuelve el código (string) del nuevo estado, ver diccionario TRANSICIONES
-    turno.estado_id = _estado_id_por_codigo(db, nuevo_estado_codigo) # actualiza estado_id del turno
+    nuevo_estado_codigo = _codigo_por_estado_id(db, nuevo_estado_id)
+    turno.estado_id = nuevo_estado_id # actualiza estado_id del turno
 
     ahora = datetime.utcnow()
     # También se deben updetear los campos confirmado_en, cancelado_en, etc según corresponda
@@ -105,7 +149,7 @@ def aplicar_evento_turno(
     ########################################
 
     # Gestión de notificaciones asociadas al turno
-    # Importante: NO envían nada acá, solo encolan en DB.
+    # Importante: NO envían nada acá, solo encolan en DB (las que ya existen, mismo dedupe_key, se saltean).
     if nuevo_estado_codigo == "CONFIRMADO":
         programar_notifs_confirmacion(db, turno)
     elif nuevo_estado_codigo == "CANCELADO":
@@ -116,17 +160,129 @@ def aplicar_evento_turno(
 
     db.add(turno)
     try:
+        invalidar_agenda(db, [turno.profesional_id])
         db.commit()
-    except IntegrityError as e:
-        db.rollback()
-        raise HTTPException(status_code=409, detail="Conflicto: notificación duplicada o restricción UNIQUE.\n" + str(e))    
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Error al actualizar el estado del turno.\n" + str(e))
-    db.refresh(turno)
-    db.refresh(turno, attribute_names=["estado"])
 
-    return turno
+    return obtener_turno(db, turno_id, PERFIL_API_DETALLE)
+
+# Permiso requerido por cada evento que se puede aplicar desde la API (vencer_reserva es solo del sistema)
+PERMISO_POR_EVENTO = {
+    EVENTO_CONFIRMAR: "turnos.confirmar",
+    EVENTO_CANCELAR: "turnos.cancelar",
+    EVENTO_COMPLETAR: "turnos.completar",
+    EVENTO_NO_ASISTIO: "turnos.no_asistio",
+}
+
+MAX_EVENTOS_LOTE = 200
+
+def aplicar_eventos_turnos(db: Session, items: list[tuple[int, str]], *, user) -> list[dict]:
+    """
+    Aplica muchos (turno_id, evento) en una sola transacción:
+    - bloquea todos los turnos con un SELECT ... FOR UPDATE SKIP LOCKED (los que otro tiene tomados se informan, no se espera)
+    - valida permiso/ownership/FSM por item en memoria
+    - cancela y encola notificaciones en lote, y hace un único commit
+    Devuelve un resultado por item (en el mismo orden); un item que falla no aborta el resto.
+    """
+    if len(items) > MAX_EVENTOS_LOTE:
+        raise HTTPException(status_code=400, detail=f"No se pueden aplicar más de {MAX_EVENTOS_LOTE} eventos por lote.")
+
+    ids = sorted({turno_id for turno_id, _ in items})
+    turnos = {
+        t.id: t for t in db.execute(
+            select(Turno)
+            .where(Turno.id.in_(ids))
+            .order_by(Turno.id)
+            .options(*opciones_carga(Turno, PERFIL_FOR_UPDATE))
+            .with_for_update(of=Turno, skip_locked=True)
+        ).scalars()
+    }
+    # Los que no vinieron o no existen o los tiene bloqueados otra transacción
+    faltantes = [i for i in ids if i not in turnos]
+    existentes_bloqueados = set(
+        db.execute(select(Turno.id).where(Turno.id.in_(faltantes))).scalars()
+    ) if faltantes else set()
+
+    fsm = compilar_transiciones(db, TRANSICIONES)
+    ahora = datetime.utcnow()
+    resultados = []
+    confirmados: dict[int, Turno] = {}
+    cancelados: dict[int, Turno] = {}
+    a_cancelar_notifs: set[int] = set()
+    profesionales: set[int] = set()  # agendas que cambian (cache de listados)
+
+    def error(turno_id, evento, status, detail):
+        resultados.append({"turno_id": turno_id, "evento": evento, "ok": False, "status": status, "detail": detail, "estado": None})
+
+    for turno_id, evento in items:
+        permiso = PERMISO_POR_EVENTO.get(evento)
+        if permiso is None:
+            error(turno_id, evento, 400, f"Evento '{evento}' no permitido.")
+            continue
+        scope = scope_efectivo(has_permission(user.perms_map, permiso))
+        if scope is None:
+            error(turno_id, evento, 403, f"Falta permiso: {permiso}")
+            continue
+
+        turno = turnos.get(turno_id)
+        if turno is None:
+            if turno_id in existentes_bloqueados:
+                error(turno_id, evento, 409, "El turno está siendo modificado por otra operación. Reintentá.")
+            else:
+                error(turno_id, evento, 404, "Turno no encontrado.")
+            continue
+
+        if scope == "OWN":
+            if not getattr(user, "profesional_id", None):
+                error(turno_id, evento, 403, "Usuario sin profesional asociado.")
+                continue
+            if turno.profesional_id != user.profesional_id:
+                error(turno_id, evento, 403, "No tenés acceso a este turno.")
+                continue
+
+        # El estado se actualiza en memoria: dos eventos sobre el mismo turno se aplican en orden
+        nuevo_estado_id = fsm.get((turno.estado_id, evento))
+        if nuevo_estado_id is None:
+            error(turno_id, evento, 409,
+                  f"Transición prohibida: {_codigo_por_estado_id(db, turno.estado_id)} + {evento} no es una transición válida.")
+            continue
+
+        nuevo_estado_codigo = _codigo_por_estado_id(db, nuevo_estado_id)
+        turno.estado_id = nuevo_estado_id
+        if nuevo_estado_codigo == "CONFIRMADO":
+            turno.confirmado_en = ahora
+            confirmados[turno.id] = turno
+        elif nuevo_estado_codigo == "CANCELADO":
+            turno.cancelado_en = ahora
+            confirmados.pop(turno.id, None)
+            cancelados[turno.id] = turno
+            a_cancelar_notifs.add(turno.id)
+        elif nuevo_estado_codigo in ["NO_ASISTIO", "COMPLETADO"]:
+            confirmados.pop(turno.id, None)
+            a_cancelar_notifs.add(turno.id)
+        turno.actualizado_en = ahora
+        turno.actualizado_por_usuario_id = user.id
+        profesionales.add(turno.profesional_id)
+
+        resultados.append({"turno_id": turno_id, "evento": evento, "ok": True, "status": 200, "detail": None, "estado": nuevo_estado_codigo})
+
+    if not any(r["ok"] for r in resultados):
+        db.rollback()  # libera los locks
+        return resultados
+
+    # Primero se cancelan las pendientes y después se encolan las nuevas (mismo orden que aplicar_evento_turno)
+    cancelar_notificaciones_pendientes_de_turnos(db, a_cancelar_notifs)
+    programar_notifs_lote(db, confirmados=list(confirmados.values()), cancelados=list(cancelados.values()))
+    try:
+        invalidar_agenda(db, profesionales)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Error al actualizar el estado de los turnos.\n" + str(e))
+
+    return resultados
 
 ESTADO_RESERVADO = 1
 ESTADO_CONFIRMADO = 2
@@ -137,13 +293,14 @@ def validar_solapamiento_paciente(
     inicio: datetime,
     fin: datetime
 ):
-    estados_activos = [_estado_id_por_codigo(db, "RESERVADO"), _estado_id_por_codigo(db, "CONFIRMADO")]
+    estados_activos = _estados_activos_ids(db)
     return (
-        db.query(Turno).filter(
+        db.query(Turno).options(*opciones_carga(Turno, PERFIL_MINIMO)).filter(
             Turno.paciente_id == paciente_id,
-            inicio < Turno.fecha_hora_fin,
-            fin > Turno.fecha_hora_inicio,
             Turno.estado_id.in_(estados_activos),
+            Turno.fecha_hora_inicio > inicio - DURACION_MAXIMA_TURNO, # cota inferior: rango acotado sobre el índice
+            fin > Turno.fecha_hora_inicio,
+            inicio < Turno.fecha_hora_fin,
         ).first()
     )
 
@@ -153,19 +310,20 @@ def validar_solapamiento_profesional(
     inicio: datetime, 
     fin: datetime
 ):
-    estados_activos = [_estado_id_por_codigo(db, "RESERVADO"), _estado_id_por_codigo(db, "CONFIRMADO")]
+    estados_activos = _estados_activos_ids(db)
     return (
-        db.query(Turno).filter(
+        db.query(Turno).options(*opciones_carga(Turno, PERFIL_MINIMO)).filter(
             Turno.profesional_id == profesional_id,
-            inicio < Turno.fecha_hora_fin,
-            fin > Turno.fecha_hora_inicio,
             Turno.estado_id.in_(estados_activos),
+            Turno.fecha_hora_inicio > inicio - DURACION_MAXIMA_TURNO, # cota inferior: rango acotado sobre el índice
+            fin > Turno.fecha_hora_inicio,
+            inicio < Turno.fecha_hora_fin,
         ).first()
     )
 
 def hay_bloqueo_agenda(db: Session, profesional_id: int, inicio: datetime, fin: datetime):
     return (
-        db.query(BloqueoAgenda).filter(
+        db.query(BloqueoAgenda).options(*opciones_carga(BloqueoAgenda, PERFIL_MINIMO)).filter(
             BloqueoAgenda.profesional_id == profesional_id,
             BloqueoAgenda.activo == True,
             inicio < BloqueoAgenda.fecha_hora_fin,
@@ -174,6 +332,92 @@ def hay_bloqueo_agenda(db: Session, profesional_id: int, inicio: datetime, fin:
     )
 
 
+# Reglas que puede disparar detectar_conflicto_turno, en el orden en que se informan
+ERRORES_CONFLICTO = {
+    "PACIENTE_NO_ENCONTRADO": (404, "Paciente no encontrado. Debe existir en la tabla pacientes"),
+    "PROFESIONAL_NO_ENCONTRADO": (404, "Profesional no existe en la base de datos (tabla 'profesionales')."),
+    "PACIENTE_INACTIVO": (400, "Paciente inactivo."),
+    "PROFESIONAL_INACTIVO": (400, "Profesional inactivo."),
+    "BLOQUEO": (409, "Horario bloqueado en agenda para ese profesional."),
+    "SOLAPAMIENTO_PACIENTE": (409, "El paciente ya tiene un turno en ese horario"),
+    "SOLAPAMIENTO_PROFESIONAL": (409, "El profesional ya tiene un turno en ese horario"),
+}
+
+def detectar_conflicto_turno(
+    db: Session,
+    paciente_id: int,
+    profesional_id: int,
+    inicio: datetime,
+    fin: datetime,
+) -> str | None:
+    """
+    Resuelve en un solo round trip todas las validaciones previas a reservar y devuelve
+    la primera regla que se dispara (clave de ERRORES_CONFLICTO) o None si se puede reservar.
+    Cada EXISTS es un rango sobre idx_turno_{prof,pac}_estado_rango / idx_bloq_prof_activo_rango.
+    """
+    estados_activos = _estados_activos_ids(db)
+
+    def _solapa_turno(columna, valor):
+        return exists().where(
+            columna == valor,
+            Turno.estado_id.in_(estados_activos),
+            Turno.fecha_hora_inicio > inicio - DURACION_MAXIMA_TURNO,
+            Turno.fecha_hora_inicio < fin,
+            Turno.fecha_hora_fin > inicio,
+        )
+
+    fila = db.execute(
+        select(
+            select(Paciente.activo).where(Paciente.id == paciente_id).scalar_subquery().label("paciente_activo"),
+            select(Profesional.activo).where(Profesional.id == profesional_id).scalar_subquery().label("profesional_activo"),
+            exists().where(
+                BloqueoAgenda.profesional_id == profesional_id,
+                BloqueoAgenda.activo == True,
+                BloqueoAgenda.fecha_hora_inicio < fin,
+                BloqueoAgenda.fecha_hora_fin > inicio,
+            ).label("bloqueo"),
+            _solapa_turno(Turno.paciente_id, paciente_id).label("solapa_paciente"),
+            _solapa_turno(Turno.profesional_id, profesional_id).label("solapa_profesional"),
+        )
+    ).one()
+
+    if fila.paciente_activo is None:
+        return "PACIENTE_NO_ENCONTRADO"
+    if fila.profesional_activo is None:
+        return "PROFESIONAL_NO_ENCONTRADO"
+    if not fila.paciente_activo:
+        return "PACIENTE_INACTIVO"
+    if not fila.profesional_activo:
+        return "PROFESIONAL_INACTIVO"
+    if fila.bloqueo:
+        return "BLOQUEO"
+    if fila.solapa_paciente:
+        return "SOLAPAMIENTO_PACIENTE"
+    if fila.solapa_profesional:
+        return "SOLAPAMIENTO_PROFESIONAL"
+    return None
+
+
+def _validar_paciente_y_profesional(db: Session, paciente_id: int, profesional_id: int) -> tuple[Paciente, Profesional]:
+    # Verificar que el paciente y la profesional ingresados ya existan en la base de datos antes de crear el turno
+    paciente = db.get(Paciente, paciente_id) #SELECT * FROM pacientes WHERE id = payload.paciente_id
+    if not paciente:
+        # TODO (próximo paso): permitir crear el paciente automáticamente o que salte un popup en el frontend para que el usuario lo cree (haciendo un POST a la ruta /pacientes)
+        raise HTTPException(status_code=404, detail="Paciente no encontrado. Debe existir en la tabla pacientes")
+    
+    profesional = db.get(Profesional, profesional_id)
+    if not profesional:
+        raise HTTPException(status_code=404, detail="Profesional no existe en la base de datos (tabla 'profesionales').")
+
+    #  Verificar que el paciente y la profesional tengan el atributo 'activo' en True (si no no pueden tener turnos asignados)
+    if not paciente.activo:
+        raise HTTPException(status_code=400, detail="Paciente inactivo.")
+    if not profesional.activo:
+        raise HTTPException(status_code=400, detail="Profesional inactivo.")
+
+    return paciente, profesional
+
+
 def crear_turno(
     db: Session,
     *,
@@ -187,6 +431,8 @@ def crear_turno(
     # Validaciones
     if fin <= inicio:
         raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin.")
+    if fin - inicio > DURACION_MAXIMA_TURNO:
+        raise HTTPException(status_code=400, detail="El turno supera la duración máxima permitida.")
 
     ###########################################
 
@@ -198,33 +444,11 @@ def crear_turno(
 
     ###########################################
 
-    # Verificar que el paciente y la profesional ingresados ya existan en la base de datos antes de crear el turno
-    paciente = db.get(Paciente, paciente_id) #SELECT * FROM pacientes WHERE id = payload.paciente_id
-    if not paciente:
-        # TODO (próximo paso): permitir crear el paciente automáticamente o que salte un popup en el frontend para que el usuario lo cree (haciendo un POST a la ruta /pacientes)
-        raise HTTPException(status_code=404, detail="Paciente no encontrado. Debe existir en la tabla pacientes")
-    
-    profesional = db.get(Profesional, profesional_id)
-    if not profesional:
-        raise HTTPException(status_code=404, detail="Profesional no existe en la base de datos (tabla 'profesionales').")
-
-    #  Verificar que el paciente y la profesional tengan el atributo 'activo' en True (si no no pueden tener turnos asignados)
-    if not paciente.activo:
-        raise HTTPException(status_code=400, detail="Paciente inactivo.")
-    if not profesional.activo:
-        raise HTTPException(status_code=400, detail="Profesional inactivo.")
-    
-    bloqueo = hay_bloqueo_agenda(db, profesional_id, inicio, fin)
-    if bloqueo:
-        raise HTTPException(status_code=409, detail="Horario bloqueado en agenda para ese profesional.")
-
-    conflicto_paciente = validar_solapamiento_paciente(db, paciente_id, inicio, fin)
-    if conflicto_paciente:
-        raise HTTPException(status_code=409, detail="El paciente ya tiene un turno en ese horario")
-
-    conflicto_profesional = validar_solapamiento_profesional(db, profesional_id, inicio, fin)
-    if conflicto_profesional:
-        raise HTTPException(status_code=409, detail="El profesional ya tiene un turno en ese horario")
+    # Existencia/estado de paciente y profesional + bloqueos + solapamientos: una sola consulta
+    regla = detectar_conflicto_turno(db, paciente_id, profesional_id, inicio, fin)
+    if regla:
+        status_code, detail = ERRORES_CONFLICTO[regla]
+        raise HTTPException(status_code=status_code, detail=detail)
 
     # Ahora sí se puede crear el turno
     ahora = datetime.utcnow()
@@ -250,6 +474,8 @@ def crear_turno(
     db.add(turno) #INSERT INTO turnos (...) VALUES (...)
     db.flush()  # para obtener turno.id antes del commit
     programar_notifs_creacion_turno(db, turno)
+    invalidar_agenda(db, [profesional_id])
+    turno_id = turno.id
 
     try:
         db.commit()
@@ -260,14 +486,163 @@ def crear_turno(
         # Esto captura, por ejemplo, el UNIQUE de profesional o paciente con misma fecha_hora de inicio
         db.rollback()
         raise HTTPException(status_code=400, detail= "Error al crear el turno\n" + str(e))  
-    
-    db.refresh(turno)
-    db.refresh(turno, attribute_names=["estado"])
 
-    return turno
+    return obtener_turno(db, turno_id, PERFIL_API_DETALLE)
+
+
+MAX_SESIONES_SERIE = 60
+
+def expandir_serie(
+    fecha_desde: date,
+    dias_semana: list[int],
+    hora_inicio: time,
+    duracion: timedelta,
+    sesiones: int,
+) -> list[tuple[datetime, datetime]]:
+    """
+    Expande la regla "N sesiones, tales días de la semana, a tal hora" desde fecha_desde (inclusive).
+    dias_semana usa la convención ISO (1 = lunes ... 7 = domingo), igual que horarios_laborales.
+    """
+    dias = set(dias_semana)
+    ocurrencias: list[tuple[datetime, datetime]] = []
+    d = fecha_desde
+    while len(ocurrencias) < sesiones:
+        if d.isoweekday() in dias:
+            inicio = datetime.combine(d, hora_inicio)
+            ocurrencias.append((inicio, inicio + duracion))
+        d += timedelta(days=1)
+    return ocurrencias
+
+
+def _primer_solapamiento(ocupados, inicios: list[datetime], max_fin: list[int], inicio: datetime, fin: datetime):
+    # ocupados ordenado por inicio; max_fin[i] = índice del ocupado con mayor fin entre ocupados[0..i]
+    idx = bisect_left(inicios, fin)  # candidatos: los que empiezan antes de que termine la ocurrencia
+    if idx == 0:
+        return None
+    candidato = ocupados[max_fin[idx - 1]]
+    return candidato if candidato[1] > inicio else None
+
+
+def crear_serie_turnos(
+    db: Session,
+    *,
+    paciente_id: int,
+    profesional_id: int,
+    fecha_desde: date,
+    dias_semana: list[int],
+    hora_inicio: time,
+    sesiones: int,
+    duracion_min: int | None = None,
+    todo_o_nada: bool = False,
+    user=None,
+    scope: str = "ANY",
+):
+    """
+    Crea una serie de turnos (ej: 10 sesiones lun/mié/vie 15:00) en una sola transacción.
+    Valida todas las ocurrencias contra bloqueos y turnos activos con una consulta por rango,
+    inserta las válidas y devuelve (turnos_creados, conflictos).
+    Con todo_o_nada=True, si alguna ocurrencia choca no se crea ninguna.
+    """
+    if sesiones < 1 or sesiones > MAX_SESIONES_SERIE:
+        raise HTTPException(status_code=400, detail=f"La serie debe tener entre 1 y {MAX_SESIONES_SERIE} sesiones.")
+    if not dias_semana or any(d < 1 or d > 7 for d in dias_semana):
+        raise HTTPException(status_code=400, detail="dias_semana debe tener valores entre 1 (lunes) y 7 (domingo).")
 
+    # RBAC: si es OWN, el profesional_id lo decide el token, no el payload
+    if scope == "OWN":
+        if not user or not getattr(user, "profesional_id", None):
+            raise HTTPException(status_code=403, detail="Usuario sin profesional asociado.")
+        profesional_id = user.profesional_id
 
-def query_turnos_filtrados(
+    paciente, profesional = _validar_paciente_y_profesional(db, paciente_id, profesional_id)
+
+    duracion = timedelta(minutes=duracion_min or profesional.duracion_turno_min)
+    if duracion <= timedelta(0) or duracion > DURACION_MAXIMA_TURNO:
+        raise HTTPException(status_code=400, detail="Duración de sesión inválida.")
+
+    ocurrencias = expandir_serie(fecha_desde, dias_semana, hora_inicio, duracion, sesiones)
+    rango_desde, rango_hasta = ocurrencias[0][0], ocurrencias[-1][1]
+
+    # Una sola consulta por rango para bloqueos + turnos activos del profesional y del paciente
+    ocupados = intervalos_ocupados(db, rango_desde, rango_hasta, profesional_id=profesional_id, paciente_id=paciente_id)
+    inicios = [o[0] for o in ocupados]
+    max_fin: list[int] = []
+    for i, o in enumerate(ocupados):
+        max_fin.append(i if not max_fin or o[1] > ocupados[max_fin[-1]][1] else max_fin[-1])
+
+    # Turnos no activos (cancelados, etc.) también ocupan los UNIQUE (profesional|paciente, fecha_hora_inicio)
+    inicios_serie = [i for i, _ in ocurrencias]
+    tomados = db.execute(
+        select(Turno.profesional_id, Turno.fecha_hora_inicio).where(
+            or_(Turno.profesional_id == profesional_id, Turno.paciente_id == paciente_id),
+            Turno.fecha_hora_inicio.in_(inicios_serie),
+        )
+    ).all()
+    inicios_tomados = {f[1] for f in tomados}
+
+    motivos = {
+        "BLOQUEO": "Horario bloqueado en agenda para ese profesional.",
+        "PACIENTE": "El paciente ya tiene un turno en ese horario",
+        "PROFESIONAL": "El profesional ya tiene un turno en ese horario",
+    }
+    validas: list[tuple[datetime, datetime]] = []
+    conflictos: list[dict] = []
+    for inicio, fin in ocurrencias:
+        choque = _primer_solapamiento(ocupados, inicios, max_fin, inicio, fin)
+        if choque:
+            conflictos.append({"fecha_hora_inicio": inicio, "fecha_hora_fin": fin, "motivo": motivos[choque[2]]})
+        elif inicio in inicios_tomados:
+            conflictos.append({"fecha_hora_inicio": inicio, "fecha_hora_fin": fin, "motivo": "Ya existe un turno (no activo) con ese inicio."})
+        else:
+            validas.append((inicio, fin))
+
+    if not validas or (todo_o_nada and conflictos):
+        return [], conflictos
+
+    ahora = datetime.utcnow()
+    estado_reservado = _estado_id_por_codigo(db, "RESERVADO")
+    turnos = [
+        Turno(
+            paciente_id=paciente_id,
+            profesional_id=profesional_id,
+            estado_id=estado_reservado,
+            fecha_hora_inicio=inicio,
+            fecha_hora_fin=fin,
+            creado_en=ahora,
+            # trazabilidad (RBAC)
+            creado_por_usuario_id=user.id if user else None,
+            actualizado_por_usuario_id=user.id if user else None,
+            actualizado_en=ahora if user else None,
+        )
+        for inicio, fin in validas
+    ]
+
+    db.add_all(turnos)
+    db.flush()  # ids para las notificaciones
+    programar_notifs_lote(db, creados=turnos)
+    invalidar_agenda(db, [profesional_id])
+
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Conflicto de integridad al crear la serie de turnos.\n" + str(e))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Error al crear la serie de turnos\n" + str(e))
+
+    # Recarga de todos los creados (con estado/paciente/profesional) en una sola consulta
+    ids = [t.id for t in turnos]
+    creados = db.execute(
+        select(Turno)
+        .options(*opciones_carga(Turno, PERFIL_API_LISTA))
+        .where(Turno.id.in_(ids))
+        .order_by(Turno.fecha_hora_inicio)
+    ).unique().scalars().all()
+    return creados, conflictos
+
+
+def condiciones_turnos_filtrados(
     db: Session,
     *,
     user=None,
@@ -280,48 +655,115 @@ def query_turnos_filtrados(
     profesional_nombre: str | None = None,
     estado: str | None = None,
     solo_activos: bool = False,
-):
-    q = db.query(Turno).options(joinedload(Turno.estado), joinedload(Turno.paciente), joinedload(Turno.profesional))
+) -> list:
+    """
+    Condiciones WHERE de los listados de turnos (RBAC + filtros de negocio).
+    Todas son sobre columnas de Turno: los filtros por nombre se resuelven con el índice de búsqueda
+    (Turno.paciente_id IN ids que coinciden), sin join con pacientes/profesionales.
+    """
+    conds = []
 
     # RBAC OWN: si es OWN, el profesional_id real lo impone el token
     if scope == "OWN":
         if not user or not getattr(user, "profesional_id", None):
             raise HTTPException(status_code=403, detail="Usuario sin profesional asociado.")
-        q = q.filter(Turno.profesional_id == user.profesional_id)
+        conds.append(Turno.profesional_id == user.profesional_id)
 
     # Filtros “de negocio” (solo se aplican encima de RBAC)
     if profesional_id is not None:
-        q = q.filter(Turno.profesional_id == profesional_id)
+        conds.append(Turno.profesional_id == profesional_id)
 
     if paciente_id is not None:
-        q = q.filter(Turno.paciente_id == paciente_id)
+        conds.append(Turno.paciente_id == paciente_id)
 
-    # Filtrar por nombre parcial del paciente (case-insensitive)
+    # Filtrar por nombre del paciente: cada palabra tiene que ser el comienzo de alguna palabra de su nombre
+    # (sin distinguir mayúsculas ni acentos, ver busqueda_service). La base cruza esos ids con el rango y el
+    # estado sobre idx_turno_pac_estado_rango.
     if paciente_nombre:
-        # Aseguramos hacer un join con tabla pacientes y filtrar por nombre
-        q = q.join(Paciente, Turno.paciente).filter(Paciente.nombre.ilike(f"%{paciente_nombre}%"))
+        ids = ids_que_coinciden(ENTIDAD_PACIENTE, paciente_nombre)
+        # Sin ninguna palabra ("-", "."): no coincide con nadie (no es lo mismo que no filtrar)
+        conds.append(Turno.paciente_id.in_(ids) if ids is not None else false())
 
     if desde is not None and hasta is not None:
         if hasta <= desde:
             raise HTTPException(status_code=400, detail="hasta debe ser mayor que desde")
-        q = q.filter(desde < Turno.fecha_hora_fin, hasta > Turno.fecha_hora_inicio)
+        conds.extend([desde < Turno.fecha_hora_fin, hasta > Turno.fecha_hora_inicio])
     elif desde is not None:
-        q = q.filter(Turno.fecha_hora_fin > desde)
+        conds.append(Turno.fecha_hora_fin > desde)
     elif hasta is not None:
-        q = q.filter(Turno.fecha_hora_inicio < hasta)
+        conds.append(Turno.fecha_hora_inicio < hasta)
 
     if solo_activos:
-        estado_reservado = _estado_id_por_codigo(db, "RESERVADO")
-        estado_confirmado = _estado_id_por_codigo(db, "CONFIRMADO")
-        q = q.filter(Turno.estado_id.in_([estado_reservado, estado_confirmado]))
+        conds.append(Turno.estado_id.in_(_estados_activos_ids(db)))
 
-    # Filtrar por nombre parcial del profesional (case-insensitive)
+    # Filtrar por nombre del profesional (ídem paciente, sobre idx_turno_prof_estado_rango)
     if profesional_nombre:
-        q = q.join(Profesional, Turno.profesional).filter(Profesional.nombre.ilike(f"%{profesional_nombre}%"))
+        ids = ids_que_coinciden(ENTIDAD_PROFESIONAL, profesional_nombre)
+        conds.append(Turno.profesional_id.in_(ids) if ids is not None else false())
 
     # Filtrar por estado usando su código (ej: RESERVADO, CONFIRMADO, CANCELADO)
     if estado:
         estado_id = _estado_id_por_codigo(db, estado)
-        q = q.filter(Turno.estado_id == estado_id)
+        conds.append(Turno.estado_id == estado_id)
+
+    return conds
 
-    return q
\ No newline at end of file
+
+def query_turnos_filtrados(
+    db: Session,
+    *,
+    user=None,
+    scope: str = "ANY",
+    profesional_id: int | None = None,
+    paciente_id: int | None = None,
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    paciente_nombre: str | None = None,
+    profesional_nombre: str | None = None,
+    estado: str | None = None,
+    solo_activos: bool = False,
+):
+    q = db.query(Turno).options(*opciones_carga(Turno, PERFIL_API_LISTA))
+
+    return q.filter(*condiciones_turnos_filtrados(
+        db,
+        user=user,
+        scope=scope,
+        profesional_id=profesional_id,
+        paciente_id=paciente_id,
+        desde=desde,
+        hasta=hasta,
+        paciente_nombre=paciente_nombre,
+        profesional_nombre=profesional_nombre,
+        estado=estado,
+        solo_activos=solo_activos,
+    ))
+
+
+def condiciones_cursor(cursor: str | None) -> list:
+    if not cursor:
+        return []
+    c_inicio, c_id = decodificar_cursor(cursor, 2)
+    if not isinstance(c_inicio, datetime) or not isinstance(c_id, int):
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+    # El >= explícito deja el rango sobre el índice; el OR desempata por id dentro del mismo inicio
+    return [
+        Turno.fecha_hora_inicio >= c_inicio,
+        or_(Turno.fecha_hora_inicio > c_inicio, Turno.id > c_id),
+    ]
+
+
+def paginar_turnos(q, *, limit: int, cursor: str | None = None):
+    """
+    Paginación keyset sobre (fecha_hora_inicio, id): cada página es un rango sobre el índice,
+    sin OFFSET, así que cuesta lo mismo la página 1 que la 500.
+    Devuelve (turnos, next_cursor); next_cursor es None en la última página.
+    """
+    turnos = q.filter(*condiciones_cursor(cursor)).order_by(Turno.fecha_hora_inicio.asc(), Turno.id.asc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(turnos) > limit:
+        turnos = turnos[:limit]
+        ultimo = turnos[-1]
+        next_cursor = codificar_cursor(ultimo.fecha_hora_inicio, ultimo.id)
+    return turnos, next_cursor
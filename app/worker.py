@@ -0,0 +1,37 @@
+# Proceso dedicado a los jobs periódicos, para correr la API con SCHEDULER_ENABLED=0:
+#
+#     python -m app.worker
+#
+# Se pueden levantar varios (ej: uno por máquina): solo el líder de cada job lo ejecuta y,
+# si se cae, otro toma el lock en el siguiente intervalo.
+import logging
+import signal
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from app.jobs import registrar_jobs, detener_jobs
+
+logger = logging.getLogger("app.worker")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    scheduler = BlockingScheduler()
+    registrar_jobs(scheduler)
+
+    def _terminar(*_):
+        scheduler.shutdown(wait=True)
+
+    signal.signal(signal.SIGTERM, _terminar)
+    logger.info("Worker de jobs iniciado")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        detener_jobs()
+        logger.info("Worker de jobs detenido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Latencia de GET /api/pacientes/buscar (busqueda_service.buscar_pacientes) con muchos pacientes.
+
+Consultas típicas de autocompletar: prefijos de 1 a 6 letras de nombre o apellido (con y sin acento),
+nombre + inicial de apellido y prefijos de DNI/teléfono. Objetivo: p99 < 20 ms con 100k pacientes.
+
+Con --sqlite corre contra una base en memoria (no necesita MySQL). Sin eso usa la base configurada en .env (DB_*)
+y le inserta datos sintéticos: correrlo SOLO contra una base descartable.
+
+    python -m benchmarks.bench_buscar_pacientes --sqlite --pacientes 100000 --consultas 2000
+    python -m benchmarks.bench_buscar_pacientes --pacientes 100000 --si-es-descartable
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import insert, select, func
+
+import app.database as database
+import app.models  # noqa: F401 (registra todos los modelos)
+from app.models.paciente_model import Paciente
+from app.reindexar_busqueda import reindexar_pacientes
+from app.services.busqueda_service import buscar_pacientes
+from benchmarks.comun import usar_sqlite
+
+NOMBRES = (
+    "José", "María", "Juan", "Lucía", "Martín", "Sofía", "Matías", "Valentina", "Joaquín", "Camila",
+    "Tomás", "Agustina", "Nicolás", "Florencia", "Ramón", "Inés", "Facundo", "Victoria", "Germán", "Belén",
+)
+APELLIDOS = (
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Benítez", "Acosta", "Medina",
+    "Herrera", "Suárez", "Aguirre", "Giménez", "Gutiérrez", "Pereyra", "Rojas", "Molina", "Castro", "Ortiz",
+    "Núñez", "Muñoz", "Ibáñez", "Peña", "Quiñones", "Silva", "Luna", "Juárez", "Cabrera", "Ríos",
+)
+
+
+def poblar(db, n_pacientes: int):
+    database.Base.metadata.create_all(database.engine)
+    base_dni = 20_000_000 + (db.execute(select(func.count(Paciente.id))).scalar_one() * 7)
+    filas = []
+    for i in range(n_pacientes):
+        filas.append({
+            "nombre": f"{random.choice(NOMBRES)} {random.choice(APELLIDOS)} {random.choice(APELLIDOS)}",
+            "dni": str(base_dni + i * 7),
+            "telefono": f"351{random.randrange(10**7):07d}",
+            "canal_contacto": "whatsapp",
+            "fecha_alta": datetime(2024, 1, 1),
+        })
+        if len(filas) == 10_000:
+            db.execute(insert(Paciente), filas)
+            filas = []
+    if filas:
+        db.execute(insert(Paciente), filas)
+    db.commit()
+
+
+def consulta_al_azar() -> str:
+    tipo = random.random()
+    palabra = random.choice(NOMBRES + APELLIDOS)
+    if tipo < 0.6:
+        q = palabra[:random.randint(1, 6)]
+        return q.lower() if random.random() < 0.5 else q  # con o sin mayúsculas/acentos
+    if tipo < 0.85:
+        return f"{random.choice(NOMBRES)} {random.choice(APELLIDOS)[:random.randint(1, 3)]}"
+    return f"{random.choice(('2', '3', '351'))}{random.randrange(1000)}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pacientes", type=int, default=100_000)
+    ap.add_argument("--consultas", type=int, default=2000)
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--sqlite", action="store_true", help="usar una base SQLite en memoria")
+    ap.add_argument("--si-es-descartable", action="store_true", help="confirma que la base se puede ensuciar")
+    args = ap.parse_args()
+    if args.sqlite:
+        usar_sqlite()
+    elif not args.si_es_descartable:
+        raise SystemExit("Este benchmark inserta filas en la base configurada: pasá --si-es-descartable o --sqlite.")
+
+    random.seed(1)
+    db = database.SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        poblar(db, args.pacientes)
+        n = reindexar_pacientes()
+        print(f"{n} pacientes cargados e indexados en {time.perf_counter() - t0:.1f}s")
+
+        tiempos = []
+        resultados = 0
+        for _ in range(args.consultas):
+            q = consulta_al_azar()
+            db.expunge_all()  # cada request arranca con una sesión vacía
+            t0 = time.perf_counter()
+            resultados += len(buscar_pacientes(db, q, limit=args.limit))
+            tiempos.append((time.perf_counter() - t0) * 1000)
+            db.rollback()
+        tiempos.sort()
+        p = lambda q: tiempos[min(len(tiempos) - 1, int(q * len(tiempos)))]
+        print(f"buscar   n={len(tiempos)}  media={statistics.mean(tiempos):.2f}ms  p50={p(0.50):.2f}ms  "
+              f"p95={p(0.95):.2f}ms  p99={p(0.99):.2f}ms  max={tiempos[-1]:.2f}ms  "
+              f"resultados/consulta={resultados / len(tiempos):.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Latencia de validación al reservar contra una tabla turnos con millones de filas históricas.
+
+Compara:
+  - legacy: las 3 consultas separadas de antes (bloqueo + solapamiento paciente + profesional, sin cota inferior)
+  - nuevo:  turnos_service.detectar_conflicto_turno (un solo round trip, índices *_estado_rango)
+
+Con --sqlite corre contra una base en memoria (no necesita MySQL). Sin eso usa la base configurada en .env (DB_*)
+y la puebla con datos sintéticos: correrlo SOLO contra una base descartable.
+
+    python -m benchmarks.bench_crear_turno --sqlite --turnos 1000000
+    python -m benchmarks.bench_crear_turno --turnos 2000000 --reservas 500 --si-es-descartable
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, insert
+
+import app.database as database
+import app.models  # noqa: F401 (registra todos los modelos)
+from app.models.turno_model import Turno
+from app.models.paciente_model import Paciente
+from app.models.profesional_model import Profesional
+from app.models.bloqueo_agenda_model import BloqueoAgenda
+from app.services.turnos_service import detectar_conflicto_turno, _estados_activos_ids, _estado_id_por_codigo
+from benchmarks.comun import usar_sqlite
+
+BASE = datetime(2018, 1, 1, 8, 0)
+
+
+def poblar(db, n_turnos: int, n_pacientes: int, n_profesionales: int, activos: float = 0.0, lote: int = 10_000):
+    database.Base.metadata.create_all(database.engine)
+
+    if db.execute(select(func.count()).select_from(Profesional)).scalar_one() < n_profesionales:
+        db.execute(insert(Profesional), [
+            {"nombre": f"Profesional {i}", "especialidad": "Kinesiología", "duracion_turno_min": 60}
+            for i in range(n_profesionales)
+        ])
+    if db.execute(select(func.count()).select_from(Paciente)).scalar_one() < n_pacientes:
+        for desde in range(0, n_pacientes, lote):
+            db.execute(insert(Paciente), [
+                {"nombre": f"Paciente {i}", "telefono": f"{i:010d}", "canal_contacto": "whatsapp"}
+                for i in range(desde, min(desde + lote, n_pacientes))
+            ])
+    db.commit()
+
+    prof_ids = db.execute(select(Profesional.id)).scalars().all()
+    pac_ids = db.execute(select(Paciente.id)).scalars().all()
+    historicos = [_estado_id_por_codigo(db, c) for c in ("COMPLETADO", "CANCELADO", "NO_ASISTIO")]
+    # Reservas viejas que nunca se cerraron (ej: sin sweeper): son las que recorre el solapamiento sin cota inferior
+    estados_activos = _estados_activos_ids(db)
+
+    existentes = db.execute(select(func.count()).select_from(Turno)).scalar_one()
+    print(f"turnos existentes: {existentes}")
+    i = existentes
+    while i < n_turnos:
+        filas = []
+        for k in range(i, min(i + lote, n_turnos)):
+            prof = prof_ids[k % len(prof_ids)]
+            inicio = BASE + timedelta(hours=k // len(prof_ids))
+            filas.append({
+                "paciente_id": random.choice(pac_ids),
+                "profesional_id": prof,
+                "estado_id": random.choice(estados_activos if random.random() < activos else historicos),
+                "fecha_hora_inicio": inicio,
+                "fecha_hora_fin": inicio + timedelta(minutes=60),
+                "creado_en": inicio - timedelta(days=3),
+            })
+        db.execute(insert(Turno).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite"), filas)
+        db.commit()
+        i += len(filas)
+        print(f"  {i}/{n_turnos}", end="\r")
+    print()
+    return prof_ids, pac_ids
+
+
+def legacy(db, paciente_id, profesional_id, inicio, fin):
+    activos = _estados_activos_ids(db)
+    db.execute(select(BloqueoAgenda.id).where(
+        BloqueoAgenda.profesional_id == profesional_id, BloqueoAgenda.activo == True,
+        inicio < BloqueoAgenda.fecha_hora_fin, fin > BloqueoAgenda.fecha_hora_inicio,
+    ).limit(1)).first()
+    for col, val in ((Turno.paciente_id, paciente_id), (Turno.profesional_id, profesional_id)):
+        db.execute(select(Turno.id).where(
+            col == val, inicio < Turno.fecha_hora_fin, fin > Turno.fecha_hora_inicio, Turno.estado_id.in_(activos),
+        ).limit(1)).first()
+
+
+def medir(nombre, fn, casos):
+    tiempos = []
+    for caso in casos:
+        t0 = time.perf_counter()
+        fn(*caso)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    p = lambda q: tiempos[min(len(tiempos) - 1, int(q * len(tiempos)))]
+    print(f"{nombre:8s} n={len(tiempos)}  media={statistics.mean(tiempos):.2f}ms  "
+          f"p50={p(0.50):.2f}ms  p95={p(0.95):.2f}ms  p99={p(0.99):.2f}ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turnos", type=int, default=2_000_000)
+    ap.add_argument("--pacientes", type=int, default=100_000)
+    ap.add_argument("--profesionales", type=int, default=50)
+    ap.add_argument("--reservas", type=int, default=500)
+    ap.add_argument("--activos", type=float, default=0.0, help="fracción del historial que queda RESERVADO/CONFIRMADO")
+    ap.add_argument("--sqlite", action="store_true", help="usar una base SQLite en memoria")
+    ap.add_argument("--si-es-descartable", action="store_true", help="confirma que la base se puede ensuciar")
+    args = ap.parse_args()
+    if args.sqlite:
+        usar_sqlite()
+    elif not args.si_es_descartable:
+        raise SystemExit("Este benchmark inserta millones de filas: pasá --si-es-descartable o --sqlite.")
+
+    db = database.SessionLocal()
+    try:
+        prof_ids, pac_ids = poblar(db, args.turnos, args.pacientes, args.profesionales, args.activos)
+        ultimo = BASE + timedelta(hours=args.turnos // len(prof_ids))
+        casos = []
+        for _ in range(args.reservas):
+            inicio = ultimo + timedelta(hours=random.randint(1, 24 * 90))
+            casos.append((db, random.choice(pac_ids), random.choice(prof_ids), inicio, inicio + timedelta(minutes=60)))
+
+        medir("legacy", legacy, casos)
+        medir("nuevo", detectar_conflicto_turno, casos)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Throughput del despacho de notificaciones con un proveedor stub que tarda --latencia-ms por envío.
+
+Compara:
+  - legacy:   el loop anterior (de a 50, un envío por vez, commit por notificación)
+  - pipeline: notificaciones_scheduler.procesar_notificaciones (pool por canal, límites por canal, commits en bloque)
+
+Con --fake-provider el pipeline le envía por HTTP al proveedor fake (app/canales/fake_provider.py, levantado
+en este mismo proceso) con los adaptadores reales: pool keep-alive y envío en lote de a --lote (1 = sin lote).
+
+Con --sqlite corre contra una base en memoria. Sin eso usa la base configurada en .env (DB_*) y le inserta
+notificaciones: correrlo SOLO contra una base descartable.
+
+    python -m benchmarks.bench_dispatch --sqlite --notificaciones 600 --latencia-ms 80
+    NOTIF_LIMITES=whatsapp:8:20,telegram:8:25,sms:4:10 python -m benchmarks.bench_dispatch --sqlite  (con tope de tasa)
+    python -m benchmarks.bench_dispatch --sqlite --sin-legacy --fake-provider --tasa-error 0.05
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, func, delete, update
+
+import app.database as database
+import app.models  # noqa: F401 (registra todos los modelos)
+from app.models.notificacion_model import Notificacion
+from app.models.paciente_model import Paciente
+from app.services.notificaciones_service import obtener_notificaciones_pendientes
+from app import notificaciones_scheduler
+from app.canales.base import Adaptador
+from app.canales.fake_provider import ConfigFake, iniciar_servidor
+from app.canales.http_json import AdaptadorHTTP
+from benchmarks.comun import usar_sqlite
+
+CANALES = ("whatsapp", "telegram", "sms")
+
+
+def poblar(db, n: int, corrida: str):
+    database.Base.metadata.create_all(database.engine)
+    paciente_id = db.execute(select(Paciente.id).limit(1)).scalar()
+    if paciente_id is None:
+        paciente_id = db.execute(
+            insert(Paciente).values(nombre="Paciente bench", telefono="0000000000", canal_contacto="whatsapp", fecha_alta=datetime.utcnow())
+        ).inserted_primary_key[0]
+    antes = datetime.utcnow() - timedelta(minutes=1)
+    db.execute(insert(Notificacion), [
+        {
+            "paciente_id": paciente_id,
+            "canal": CANALES[i % len(CANALES)],
+            "tipo": "BENCH",
+            "mensaje": f"mensaje {i}",
+            "programada_para": antes,
+            "estado": "PENDIENTE",
+            "intentos": 0,
+            "dedupe_key": f"bench:{corrida}:{i}",
+        }
+        for i in range(n)
+    ])
+    db.commit()
+
+
+def pendientes_bench(db) -> int:
+    return db.execute(
+        select(func.count()).select_from(Notificacion).where(Notificacion.tipo == "BENCH", Notificacion.estado == "PENDIENTE")
+    ).scalar_one()
+
+
+class AdaptadorDormilon(Adaptador):
+    # Proveedor simulado en proceso: cada pedido tarda lo que diga `enviar`
+    def __init__(self, canal, enviar):
+        super().__init__()
+        self.canal = canal
+        self._enviar = enviar
+
+    def _enviar_lote(self, envios):
+        return [self._enviar(self.canal, mensaje) for _, mensaje in envios]
+
+
+def legacy(adaptadores):
+    enviar = adaptadores[CANALES[0]]._enviar
+    # Copia del loop anterior, repetido hasta vaciar (sin esperar los 30s entre corridas)
+    db = database.SessionLocal()
+    try:
+        while True:
+            pendientes = obtener_notificaciones_pendientes(db, datetime.utcnow(), limit=50)
+            if not pendientes:
+                return
+            for n in pendientes:
+                n.intentos += 1
+                n.proveedor_msg_id = enviar(n.canal, n.mensaje)
+                n.estado = "ENVIADA"
+                n.enviada_en = datetime.utcnow()
+                db.add(n)
+                db.commit()
+    finally:
+        db.close()
+
+
+def pipeline(adaptadores):
+    while True:
+        conteo = notificaciones_scheduler.procesar_notificaciones(adaptadores=adaptadores)
+        if not (conteo["enviadas"] or conteo["reintentos"] or conteo["diferidas"] or conteo["fallidas"]):
+            return
+        if conteo["reintentos"] or conteo["diferidas"]:
+            # Sin esperar el backoff: las que quedaron para reintentar vuelven a estar vencidas ya
+            db = database.SessionLocal()
+            try:
+                db.execute(
+                    update(Notificacion)
+                    .where(Notificacion.tipo == "BENCH", Notificacion.estado == "PENDIENTE")
+                    .values(proxima_ejecucion=datetime.utcnow() - timedelta(seconds=1))
+                )
+                db.commit()
+            finally:
+                db.close()
+
+
+def medir(nombre, fn, adaptadores, n, corrida):
+    db = database.SessionLocal()
+    try:
+        db.execute(delete(Notificacion).where(Notificacion.tipo == "BENCH"))
+        db.commit()
+        poblar(db, n, f"{corrida}-{nombre}")
+        t0 = time.perf_counter()
+        fn(adaptadores)
+        seg = time.perf_counter() - t0
+        quedan = pendientes_bench(db)
+        fallidas = db.execute(
+            select(func.count()).select_from(Notificacion).where(Notificacion.tipo == "BENCH", Notificacion.estado == "FALLIDA")
+        ).scalar_one()
+    finally:
+        db.close()
+    print(
+        f"{nombre:9s} n={n}  {seg:.2f}s  {n / seg:.1f} msg/s  ({n / seg * 60:.0f} msg/min)  "
+        f"pendientes={quedan}  fallidas={fallidas}"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--notificaciones", type=int, default=600)
+    ap.add_argument("--latencia-ms", type=float, default=80.0, help="latencia media del proveedor stub")
+    ap.add_argument("--sqlite", action="store_true", help="usar una base SQLite en memoria")
+    ap.add_argument("--sin-legacy", action="store_true", help="no medir el loop anterior (tarda n * latencia)")
+    ap.add_argument("--si-es-descartable", action="store_true", help="confirma que la base se puede ensuciar")
+    ap.add_argument("--fake-provider", action="store_true", help="enviar por HTTP al proveedor fake")
+    ap.add_argument("--lote", type=int, default=50, help="mensajes por pedido con --fake-provider (1 = sin lote)")
+    ap.add_argument("--tasa-error", type=float, default=0.0, help="fracción de pedidos con 503 en el proveedor fake")
+    args = ap.parse_args()
+    if args.sqlite:
+        usar_sqlite()
+    elif not args.si_es_descartable:
+        raise SystemExit("Este benchmark inserta notificaciones en la base configurada: pasá --si-es-descartable o --sqlite.")
+
+    def enviar(canal, mensaje):
+        time.sleep(max(0.0, random.gauss(args.latencia_ms, args.latencia_ms / 4)) / 1000)
+        return "bench-id"
+
+    print("límites por canal:", notificaciones_scheduler.LIMITES_CANAL)
+    corrida = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    locales = {canal: AdaptadorDormilon(canal, enviar) for canal in CANALES}
+    if not args.sin_legacy:
+        medir("legacy", legacy, locales, args.notificaciones, corrida)
+    if not args.fake_provider:
+        medir("pipeline", pipeline, locales, args.notificaciones, corrida)
+        return
+
+    config = ConfigFake(latencia_ms=args.latencia_ms, tasa_error=args.tasa_error)
+    servidor = iniciar_servidor(config)
+    host, puerto = servidor.server_address
+    adaptadores = {
+        canal: AdaptadorHTTP(
+            canal,
+            f"http://{host}:{puerto}/v1/{canal}",
+            max_lote=args.lote,
+            max_conexiones=notificaciones_scheduler.LIMITES_CANAL.get(canal, notificaciones_scheduler.LIMITE_DEFAULT)[0],
+        )
+        for canal in CANALES
+    }
+    try:
+        medir("pipeline", pipeline, adaptadores, args.notificaciones, corrida)
+    finally:
+        for adaptador in adaptadores.values():
+            adaptador.cerrar()
+        servidor.shutdown()
+    print("proveedor fake:", config.stats)
+
+
+if __name__ == "__main__":
+    main()
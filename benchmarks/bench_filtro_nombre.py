@@ -0,0 +1,162 @@
+"""
+Filtros por nombre en GET /api/turnos: ILIKE '%x%' sobre el join (como era antes) contra el índice de búsqueda
+(Turno.paciente_id IN ids de tokens_busqueda, ver busqueda_service).
+
+Cada consulta es un filtro por nombre de paciente (apellido, o nombre + apellido) y/o de profesional, sobre
+un rango de un mes y a veces un estado, como las búsquedas de la agenda. Se mide la página de turnos ya
+serializada (listar_turnos_json) y se cuenta en cuántas consultas los dos caminos devuelven lo mismo.
+
+Con --sqlite corre contra una base en memoria (no necesita MySQL). Sin eso usa la base configurada en .env (DB_*)
+y le inserta datos sintéticos: correrlo SOLO contra una base descartable.
+
+    python -m benchmarks.bench_filtro_nombre --sqlite --turnos 1000000 --pacientes 100000
+    python -m benchmarks.bench_filtro_nombre --turnos 1000000 --pacientes 100000 --si-es-descartable
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+import app.database as database
+import app.models  # noqa: F401 (registra todos los modelos)
+from app.models.turno_model import Turno
+from app.models.paciente_model import Paciente
+from app.models.profesional_model import Profesional
+from app.models.estado_turno_model import EstadoTurno
+from app.reindexar_busqueda import reindexar_pacientes, reindexar_profesionales
+from app.services.turnos_service import condiciones_turnos_filtrados
+from app.services.turnos_lectura_service import listar_turnos_json
+from benchmarks.bench_buscar_pacientes import NOMBRES, APELLIDOS, poblar as poblar_pacientes
+from benchmarks.comun import usar_sqlite
+
+DESDE = datetime(2030, 1, 1, 8, 0)
+DIAS = 730
+TURNOS_POR_DIA = 20  # por profesional, de a 30 minutos
+PROFESIONALES = ("Leonor Amarilo", "Victoria Nieto", "Germán Ibáñez", "Lucía Sosa", "Ramón Quiñones")
+
+
+def poblar(db, n_turnos: int, n_pacientes: int, n_profesionales: int = 100):
+    if n_turnos > n_profesionales * DIAS * TURNOS_POR_DIA:
+        raise SystemExit("No entran tantos turnos sin superponerse: subí n_profesionales.")
+    poblar_pacientes(db, n_pacientes)
+    db.execute(insert(Profesional), [
+        {"nombre": f"{PROFESIONALES[i % len(PROFESIONALES)]} {i}", "especialidad": "Kinesiología", "duracion_turno_min": 30}
+        for i in range(n_profesionales)
+    ])
+    db.commit()
+
+    prof_ids = db.execute(select(Profesional.id)).scalars().all()
+    pac_ids = db.execute(select(Paciente.id)).scalars().all()
+    estado_ids = db.execute(select(EstadoTurno.id)).scalars().all()
+    filas = []
+    for k in range(n_turnos):
+        # Un turno por (profesional, día, horario): se reparten todos los días antes de repetir horario
+        # y pacientes consecutivos desde uno al azar, para que ninguno tenga dos turnos en el mismo horario
+        slot, i_prof = divmod(k, len(prof_ids))
+        if i_prof == 0:
+            inicio = DESDE + timedelta(days=slot % DIAS, minutes=30 * (slot // DIAS))
+            desde_pac = random.randrange(len(pac_ids))
+        filas.append({
+            "paciente_id": pac_ids[(desde_pac + i_prof) % len(pac_ids)],
+            "profesional_id": prof_ids[i_prof],
+            "estado_id": random.choice(estado_ids),
+            "fecha_hora_inicio": inicio,
+            "fecha_hora_fin": inicio + timedelta(minutes=30),
+            "creado_en": DESDE,
+        })
+        if len(filas) == 20_000:
+            db.execute(insert(Turno), filas)
+            filas = []
+    if filas:
+        db.execute(insert(Turno), filas)
+    db.commit()
+
+
+def filtros_al_azar() -> dict:
+    desde = DESDE + timedelta(days=random.randrange(DIAS - 30))
+    filtros = {"desde": desde, "hasta": desde + timedelta(days=30)}
+    tipo = random.random()
+    if tipo < 0.4:
+        filtros["paciente_nombre"] = random.choice(APELLIDOS)
+    elif tipo < 0.8:
+        filtros["paciente_nombre"] = f"{random.choice(NOMBRES)} {random.choice(APELLIDOS)}"
+    else:
+        filtros["profesional_nombre"] = random.choice(PROFESIONALES).split()[1]
+        filtros["paciente_nombre"] = random.choice(APELLIDOS)
+    if random.random() < 0.3:
+        filtros["estado"] = random.choice(("RESERVADO", "CONFIRMADO"))
+    return filtros
+
+
+def ilike(db, filtros: dict, limit: int) -> bytes:
+    # El camino anterior: join con pacientes/profesionales (ya está en select_turnos_out) + ILIKE '%x%'
+    otros = {k: v for k, v in filtros.items() if k not in ("paciente_nombre", "profesional_nombre")}
+    condiciones = condiciones_turnos_filtrados(db, **otros)
+    if filtros.get("paciente_nombre"):
+        condiciones.append(Paciente.nombre.ilike(f"%{filtros['paciente_nombre']}%"))
+    if filtros.get("profesional_nombre"):
+        condiciones.append(Profesional.nombre.ilike(f"%{filtros['profesional_nombre']}%"))
+    cuerpo, _ = listar_turnos_json(db, condiciones, limit=limit)
+    return cuerpo
+
+
+def indice(db, filtros: dict, limit: int) -> bytes:
+    cuerpo, _ = listar_turnos_json(db, condiciones_turnos_filtrados(db, **filtros), limit=limit)
+    return cuerpo
+
+
+def medir(nombre, fn, db, consultas, limit):
+    tiempos = []
+    cuerpos = []
+    for filtros in consultas:
+        db.expunge_all()
+        t0 = time.perf_counter()
+        cuerpos.append(fn(db, filtros, limit))
+        tiempos.append((time.perf_counter() - t0) * 1000)
+        db.rollback()
+    tiempos.sort()
+    p = lambda q: tiempos[min(len(tiempos) - 1, int(q * len(tiempos)))]
+    print(f"{nombre:8s} n={len(tiempos)}  media={statistics.mean(tiempos):.2f}ms  "
+          f"p50={p(0.50):.2f}ms  p95={p(0.95):.2f}ms  p99={p(0.99):.2f}ms")
+    return cuerpos
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turnos", type=int, default=1_000_000)
+    ap.add_argument("--pacientes", type=int, default=100_000)
+    ap.add_argument("--consultas", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=200)
+    ap.add_argument("--sqlite", action="store_true", help="usar una base SQLite en memoria")
+    ap.add_argument("--si-es-descartable", action="store_true", help="confirma que la base se puede ensuciar")
+    args = ap.parse_args()
+    if args.sqlite:
+        usar_sqlite()
+    elif not args.si_es_descartable:
+        raise SystemExit("Este benchmark inserta filas en la base configurada: pasá --si-es-descartable o --sqlite.")
+
+    random.seed(1)
+    db = database.SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        poblar(db, args.turnos, args.pacientes)
+        reindexar_pacientes()
+        reindexar_profesionales()
+        print(f"{args.turnos} turnos y {args.pacientes} pacientes cargados e indexados en {time.perf_counter() - t0:.1f}s")
+
+        consultas = [filtros_al_azar() for _ in range(args.consultas)]
+        a = medir("ilike", ilike, db, consultas, args.limit)
+        b = medir("indice", indice, db, consultas, args.limit)
+        iguales = sum(x == y for x, y in zip(a, b))
+        # Las diferencias son esperables: "José Gómez" con ILIKE exige esas dos palabras juntas y en ese orden
+        # (el índice, cada una en cualquier lugar), e ILIKE encuentra subcadenas en medio de una palabra
+        print(f"mismos resultados: {iguales}/{len(consultas)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Costo de armar la respuesta de GET /api/turnos para una página de N filas.
+
+Compara:
+  - orm:     query_turnos_filtrados + paginar_turnos (Turno con joins hidratados) + validación/serialización con list[TurnoOut]
+  - liviano: turnos_lectura_service.listar_turnos_json (filas Core con las columnas de TurnoOut -> json.dumps)
+
+Además verifica que los dos cuerpos sean idénticos byte a byte.
+
+Con --sqlite corre contra una base en memoria (no necesita MySQL). Sin eso usa la base configurada en .env (DB_*)
+y le inserta datos sintéticos: correrlo SOLO contra una base descartable.
+
+    python -m benchmarks.bench_listado_turnos --sqlite --filas 1000 --repeticiones 30
+    python -m benchmarks.bench_listado_turnos --filas 1000 --si-es-descartable
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select, func
+from starlette.responses import JSONResponse
+
+import app.database as database
+import app.models  # noqa: F401 (registra todos los modelos)
+from app.models.turno_model import Turno
+from app.models.paciente_model import Paciente
+from app.models.profesional_model import Profesional
+from app.models.estado_turno_model import EstadoTurno
+from app.schemas.turno_schema import TurnoOut
+from app.services.turnos_service import query_turnos_filtrados, paginar_turnos, condiciones_turnos_filtrados
+from app.services.turnos_lectura_service import listar_turnos_json
+from benchmarks.comun import usar_sqlite
+
+DESDE = datetime(2031, 1, 1, 8, 0)
+
+_turnos_out = TypeAdapter(list[TurnoOut])
+
+
+def poblar(db, n_filas: int, n_pacientes: int = 200, n_profesionales: int = 10):
+    database.Base.metadata.create_all(database.engine)
+    db.execute(insert(Profesional), [
+        {"nombre": f"Profesional {i}", "especialidad": "Kinesiología", "duracion_turno_min": 60}
+        for i in range(n_profesionales)
+    ])
+    db.execute(insert(Paciente), [
+        {"nombre": f"Paciente Núñez {i}", "telefono": f"9{i:09d}", "canal_contacto": "whatsapp", "fecha_alta": datetime(2024, 1, 1)}
+        for i in range(n_pacientes)
+    ])
+    db.commit()
+
+    prof_ids = db.execute(select(Profesional.id)).scalars().all()
+    pac_ids = db.execute(select(Paciente.id)).scalars().all()
+    estado_ids = db.execute(select(EstadoTurno.id)).scalars().all()
+    filas = []
+    for k in range(n_filas):
+        inicio = DESDE + timedelta(minutes=30 * k)
+        filas.append({
+            "paciente_id": random.choice(pac_ids),
+            "profesional_id": random.choice(prof_ids),
+            "estado_id": random.choice(estado_ids),
+            "fecha_hora_inicio": inicio,
+            "fecha_hora_fin": inicio + timedelta(minutes=30),
+            "creado_en": datetime.now(),
+        })
+    db.execute(insert(Turno), filas)
+    db.commit()
+
+
+def orm(db, filtros: dict, limit: int) -> bytes:
+    turnos, _ = paginar_turnos(query_turnos_filtrados(db, **filtros), limit=limit)
+    # Lo mismo que hace FastAPI con response_model=list[TurnoOut]
+    contenido = _turnos_out.dump_python(_turnos_out.validate_python(turnos, from_attributes=True), mode="json")
+    return JSONResponse(contenido).body
+
+
+def liviano(db, filtros: dict, limit: int) -> bytes:
+    cuerpo, _ = listar_turnos_json(db, condiciones_turnos_filtrados(db, **filtros), limit=limit)
+    return cuerpo
+
+
+def medir(nombre, fn, db, filtros, limit, repeticiones):
+    tiempos = []
+    cuerpo = b""
+    for _ in range(repeticiones):
+        db.expunge_all()  # cada request arranca con una sesión vacía
+        t0 = time.perf_counter()
+        cuerpo = fn(db, filtros, limit)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    p = lambda q: tiempos[min(len(tiempos) - 1, int(q * len(tiempos)))]
+    print(f"{nombre:8s} n={len(tiempos)}  media={statistics.mean(tiempos):.2f}ms  "
+          f"p50={p(0.50):.2f}ms  p95={p(0.95):.2f}ms  bytes={len(cuerpo)}")
+    return cuerpo
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--filas", type=int, default=1000)
+    ap.add_argument("--repeticiones", type=int, default=30)
+    ap.add_argument("--sqlite", action="store_true", help="usar una base SQLite en memoria")
+    ap.add_argument("--si-es-descartable", action="store_true", help="confirma que la base se puede ensuciar")
+    args = ap.parse_args()
+    if args.sqlite:
+        usar_sqlite()
+    elif not args.si_es_descartable:
+        raise SystemExit("Este benchmark inserta filas en la base configurada: pasá --si-es-descartable o --sqlite.")
+
+    db = database.SessionLocal()
+    try:
+        poblar(db, args.filas)
+        ultimo = db.execute(select(func.max(Turno.fecha_hora_fin))).scalar_one()
+        filtros = {"desde": DESDE, "hasta": ultimo}
+
+        a = medir("orm", orm, db, filtros, args.filas, args.repeticiones)
+        b = medir("liviano", liviano, db, filtros, args.filas, args.repeticiones)
+        print("cuerpos idénticos:", a == b)
+        if a != b:
+            raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Lo que comparten los benchmarks.
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import app.database as database
+import app.models  # noqa: F401 (registra todos los modelos)
+from app.models.estado_turno_model import EstadoTurno
+
+ESTADOS = ("RESERVADO", "CONFIRMADO", "CANCELADO", "NO_ASISTIO", "COMPLETADO")
+
+
+def usar_sqlite():
+    # Base en memoria con el esquema de los modelos y el catálogo de estados (para --sqlite, sin MySQL)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+    database.Base.metadata.create_all(engine)
+    db = database.SessionLocal()
+    db.add_all(EstadoTurno(id=i, codigo=c, descripcion=c.capitalize()) for i, c in enumerate(ESTADOS, 1))
+    db.commit()
+    db.close()
@@ -0,0 +1,14 @@
+-- Índices compuestos para la detección de conflictos al reservar (turnos_service.detectar_conflicto_turno).
+-- El predicado de solapamiento es: estado activo AND inicio > :inicio - 24h AND inicio < :fin AND fin > :inicio,
+-- así que (entidad, estado_id, fecha_hora_inicio, fecha_hora_fin) permite un rango acotado resuelto desde el índice.
+
+ALTER TABLE turnos
+  ADD INDEX idx_turno_prof_estado_rango (profesional_id, estado_id, fecha_hora_inicio, fecha_hora_fin),
+  ADD INDEX idx_turno_pac_estado_rango (paciente_id, estado_id, fecha_hora_inicio, fecha_hora_fin),
+  ALGORITHM=INPLACE, LOCK=NONE;
+
+-- Reemplaza a idx_bloq_prof_activo (mismo prefijo, así que sigue sirviendo para la FK a profesionales)
+ALTER TABLE bloqueos_agenda
+  ADD INDEX idx_bloq_prof_activo_rango (profesional_id, activo, fecha_hora_inicio, fecha_hora_fin),
+  DROP INDEX idx_bloq_prof_activo,
+  ALGORITHM=INPLACE, LOCK=NONE;
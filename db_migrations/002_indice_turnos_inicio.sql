@@ -0,0 +1,7 @@
+-- Paginación keyset de GET /api/turnos por (fecha_hora_inicio, id).
+-- Con filtro de profesional/paciente alcanzan los UNIQUE (entidad, fecha_hora_inicio); sin filtro hace falta
+-- este índice (InnoDB agrega el PK id al final, así que ya queda ordenado por (fecha_hora_inicio, id)).
+
+ALTER TABLE turnos
+  ADD INDEX idx_turno_inicio (fecha_hora_inicio),
+  ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,8 @@
+-- Sweeper de turnos (app/scheduler.py): cada lote es un rango sobre estos índices en vez de recorrer la tabla.
+--   reservas vencidas:   estado_id = RESERVADO  AND creado_en < ?       ORDER BY creado_en
+--   no asistió:          estado_id = CONFIRMADO AND fecha_hora_fin < ?  ORDER BY fecha_hora_fin
+
+ALTER TABLE turnos
+  ADD INDEX idx_turno_estado_creado (estado_id, creado_en),
+  ADD INDEX idx_turno_estado_fin (estado_id, fecha_hora_fin),
+  ALGORITHM=INPLACE, LOCK=NONE;
@@ -0,0 +1,8 @@
+-- Reclamo de notificaciones con lease: varios despachadores pueden correr en paralelo sin enviar dos veces
+-- (ver notificaciones_service.reclamar_notificaciones).
+
+ALTER TABLE notificaciones
+  ADD COLUMN reclamada_por VARCHAR(100) NULL,
+  ADD COLUMN reclamada_hasta DATETIME NULL,
+  ADD INDEX idx_notif_estado_programada (estado, programada_para),
+  ALGORITHM=INPLACE, LOCK=NONE;
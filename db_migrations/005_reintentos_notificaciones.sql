@@ -0,0 +1,14 @@
+-- Reintentos con backoff: cada notificación pendiente se intenta cuando llega su proxima_ejecucion
+-- (al principio = programada_para; después de cada fallo se corre con backoff exponencial).
+-- Las que ya agotaron los intentos pasan a FALLIDA (estado terminal).
+
+ALTER TABLE notificaciones ADD COLUMN proxima_ejecucion DATETIME NULL;
+
+UPDATE notificaciones SET proxima_ejecucion = programada_para;
+
+UPDATE notificaciones SET estado = 'FALLIDA' WHERE estado = 'PENDIENTE' AND intentos >= 3;
+
+ALTER TABLE notificaciones
+  MODIFY proxima_ejecucion DATETIME NOT NULL,
+  DROP INDEX idx_notif_estado_programada,
+  ADD INDEX idx_notif_estado_proxima (estado, proxima_ejecucion);
@@ -0,0 +1,6 @@
+-- Plantillas: las notificaciones nuevas guardan solo sus parámetros (JSON) y el texto se arma al enviar.
+-- Las filas existentes conservan su mensaje y se siguen enviando tal cual.
+
+ALTER TABLE notificaciones
+  ADD COLUMN parametros JSON NULL AFTER tipo,
+  MODIFY mensaje TEXT COLLATE utf8mb4_spanish_ci NULL;
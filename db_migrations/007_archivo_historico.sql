@@ -0,0 +1,52 @@
+-- Retención: tablas de archivo para turnos y notificaciones cerrados más viejos que ARCHIVO_HORIZONTE_DIAS.
+-- Las llena el job archivar_historico (app/archivado.py) de a lotes; los ids se conservan.
+-- Sin FK a turnos desde notificaciones_archivo: el turno puede estar vivo o archivado.
+
+CREATE TABLE turnos_archivo (
+  id int NOT NULL,
+  paciente_id int NOT NULL,
+  profesional_id int NOT NULL,
+  estado_id int NOT NULL,
+  fecha_hora_inicio datetime NOT NULL,
+  fecha_hora_fin datetime NOT NULL,
+  creado_en datetime NOT NULL,
+  confirmado_en datetime DEFAULT NULL,
+  cancelado_en datetime DEFAULT NULL,
+  creado_por_usuario_id int DEFAULT NULL,
+  actualizado_por_usuario_id int DEFAULT NULL,
+  actualizado_en datetime DEFAULT NULL,
+  archivado_en datetime NOT NULL,
+  PRIMARY KEY (id),
+  KEY idx_turno_arch_inicio (fecha_hora_inicio),
+  KEY idx_turno_arch_prof_inicio (profesional_id, fecha_hora_inicio),
+  KEY idx_turno_arch_pac_inicio (paciente_id, fecha_hora_inicio),
+  KEY idx_turno_arch_fin (fecha_hora_fin),
+  CONSTRAINT fk_turno_arch_paciente FOREIGN KEY (paciente_id) REFERENCES pacientes (id),
+  CONSTRAINT fk_turno_arch_profesional FOREIGN KEY (profesional_id) REFERENCES profesionales (id),
+  CONSTRAINT fk_turno_arch_estado FOREIGN KEY (estado_id) REFERENCES estados_turno (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_spanish_ci;
+
+CREATE TABLE notificaciones_archivo (
+  id int NOT NULL,
+  turno_id int DEFAULT NULL,
+  paciente_id int NOT NULL,
+  canal enum('whatsapp','telegram','sms') NOT NULL,
+  tipo varchar(30) NOT NULL,
+  parametros json DEFAULT NULL,
+  mensaje text,
+  programada_para datetime NOT NULL,
+  proxima_ejecucion datetime NOT NULL,
+  estado enum('PENDIENTE','ENVIADA','FALLIDA','CANCELADA') NOT NULL,
+  intentos int NOT NULL,
+  ultimo_error text,
+  proveedor_msg_id varchar(100) DEFAULT NULL,
+  creado_en datetime DEFAULT NULL,
+  enviada_en datetime DEFAULT NULL,
+  cancelada_en datetime DEFAULT NULL,
+  dedupe_key varchar(120) NOT NULL,
+  archivado_en datetime NOT NULL,
+  PRIMARY KEY (id),
+  KEY idx_notif_arch_turno (turno_id),
+  KEY idx_notif_arch_programada (programada_para),
+  CONSTRAINT fk_notif_arch_paciente FOREIGN KEY (paciente_id) REFERENCES pacientes (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_spanish_ci;
@@ -0,0 +1,11 @@
+-- Índice de búsqueda por prefijo (autocompletar de pacientes): palabras ya normalizadas como utf8mb4_spanish_ci
+-- (minúsculas, sin acentos, ñ distinta de n), por eso la columna token es binaria.
+-- Después de aplicarla, llenarla con: python -m app.reindexar_busqueda
+
+CREATE TABLE tokens_busqueda (
+  entidad varchar(20) NOT NULL,
+  token varchar(64) COLLATE utf8mb4_bin NOT NULL,
+  entidad_id int NOT NULL,
+  PRIMARY KEY (entidad, token, entidad_id),
+  KEY idx_token_busq_entidad_id (entidad, entidad_id, token)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_spanish_ci;
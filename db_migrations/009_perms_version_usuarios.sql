@@ -0,0 +1,5 @@
+-- Versión de permisos por usuario (AUTH_PERMS_CLAIMS): los tokens firman su "pv" y solo autorizan mientras
+-- coincida con esta columna. Se incrementa en la misma transacción que un cambio de roles o de activo, así
+-- que todos los procesos de la API lo ven en el request siguiente.
+
+ALTER TABLE usuarios ADD COLUMN perms_version INT NOT NULL DEFAULT 0;
@@ -0,0 +1,9 @@
+-- Contadores de generación compartidos entre procesos (app/core/generaciones.py): cada escritura que cambia la
+-- agenda de un profesional incrementa su fila en la misma transacción, y las caches en memoria de cada worker
+-- comparan contra estas filas antes de usar una entrada. La clave es binaria para que un prefijo sea un rango.
+
+CREATE TABLE generaciones (
+  clave varchar(40) CHARACTER SET ascii COLLATE ascii_bin NOT NULL,
+  gen bigint NOT NULL DEFAULT 0,
+  PRIMARY KEY (clave)
+) ENGINE=InnoDB;
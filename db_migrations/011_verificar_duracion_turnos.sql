@@ -0,0 +1,16 @@
+-- Precondición de las consultas de solapamiento (001 y turnos_service): acotan fecha_hora_inicio por abajo con
+-- DURACION_MAXIMA_TURNO (24 h), así que un turno existente más largo dejaría de detectarse como conflicto. Si hay
+-- alguno la migración se corta acá: corregirlo (o partirlo) y volver a correrla. La API rechaza con 400 los turnos
+-- nuevos de más de 24 h.
+DROP PROCEDURE IF EXISTS _verificar_duracion_turnos;
+DELIMITER //
+CREATE PROCEDURE _verificar_duracion_turnos()
+BEGIN
+  IF EXISTS (SELECT 1 FROM turnos WHERE fecha_hora_fin > fecha_hora_inicio + INTERVAL 24 HOUR) THEN
+    SIGNAL SQLSTATE '45000'
+      SET MESSAGE_TEXT = 'Hay turnos de mas de 24 h (SELECT id FROM turnos WHERE fecha_hora_fin > fecha_hora_inicio + INTERVAL 24 HOUR)';
+  END IF;
+END //
+DELIMITER ;
+CALL _verificar_duracion_turnos();
+DROP PROCEDURE _verificar_duracion_turnos;
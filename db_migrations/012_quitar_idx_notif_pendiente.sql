@@ -0,0 +1,7 @@
+-- idx_notif_pendiente (estado, programada_para) viene del dump y quedó sin uso: el despacho, el timer y el
+-- archivado van por idx_notif_estado_proxima (005). 004 había agregado una copia (idx_notif_estado_programada)
+-- que 005 ya reemplazó; esta era la otra mitad, que igual había que mantener en cada escritura.
+
+ALTER TABLE notificaciones
+  DROP INDEX idx_notif_pendiente,
+  ALGORITHM=INPLACE, LOCK=NONE;
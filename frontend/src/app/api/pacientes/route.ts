@@ -7,13 +7,20 @@ export async function GET(req: Request) {
   const cookieStore = cookies()
   const token = cookieStore.get('access_token')?.value
 
-  const res = await fetch(`${BACKEND}/api/pacientes`, {
+  const url = new URL(req.url)
+  const search = url.search || ''
+
+  const res = await fetch(`${BACKEND}/api/pacientes${search}`, {
     method: 'GET',
     headers: token ? { Authorization: `Bearer ${token}` } : {},
   })
 
   const text = await res.text()
-  return new NextResponse(text, { status: res.status, headers: { 'Content-Type': 'application/json' } })
+  const headers: Record<string, string> = { 'Content-Type': 'application/json' }
+  // paginación por cursor: el backend manda el cursor de la página siguiente en este header
+  const nextCursor = res.headers.get('X-Next-Cursor')
+  if (nextCursor) headers['X-Next-Cursor'] = nextCursor
+  return new NextResponse(text, { status: res.status, headers })
 }
 
 export async function POST(req: Request) {
@@ -7,11 +7,24 @@ export async function GET(req: Request) {
   const cookieStore = cookies()
   const token = cookieStore.get('access_token')?.value
 
+  // GET condicional: el navegador revalida con If-None-Match y el backend contesta 304 si no cambió
+  const ifNoneMatch = req.headers.get('If-None-Match')
   const res = await fetch(`${BACKEND}/api/profesionales`, {
     method: 'GET',
-    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    headers: {
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      ...(ifNoneMatch ? { 'If-None-Match': ifNoneMatch } : {}),
+    },
+    cache: 'no-store',
   })
 
+  const headers: Record<string, string> = { 'Content-Type': 'application/json' }
+  for (const h of ['ETag', 'Cache-Control']) {
+    const v = res.headers.get(h)
+    if (v) headers[h] = v
+  }
+  if (res.status === 304) return new NextResponse(null, { status: 304, headers })
+
   const text = await res.text()
-  return new NextResponse(text, { status: res.status, headers: { 'Content-Type': 'application/json' } })
+  return new NextResponse(text, { status: res.status, headers })
 }
@@ -10,14 +10,32 @@ type Paciente = {
   nombre: string
   dni?: string | null
   cuil?: string | null
+  telefono?: string | null
   activo?: boolean
 }
 
-async function fetchPacientes() {
-  const res = await fetch('/api/pacientes', { credentials: 'include' })
+type PaginaPacientes = { pacientes: Paciente[]; next: string | null }
+
+const PATIENTS_PAGE_SIZE = 10
+const BUSQUEDA_LIMIT = 50
+
+async function fetchPacientesPagina(cursor: string | null): Promise<PaginaPacientes> {
+  // sin filtros: una página por vez, paginada por cursor (X-Next-Cursor)
+  const params = new URLSearchParams({ limit: String(PATIENTS_PAGE_SIZE) })
+  if (cursor) params.set('cursor', cursor)
+  const res = await fetch(`/api/pacientes?${params.toString()}`, { credentials: 'include' })
   if (res.status === 401 || res.status === 403) throw { status: res.status }
   if (!res.ok) throw new Error('Error fetching pacientes')
-  return res.json()
+  return { pacientes: await res.json(), next: res.headers.get('X-Next-Cursor') }
+}
+
+async function buscarPacientes(q: string): Promise<PaginaPacientes> {
+  // con búsqueda: resuelve el backend (cada palabra tiene que ser el comienzo de una palabra del nombre, DNI, CUIL o teléfono)
+  const params = new URLSearchParams({ q, limit: String(BUSQUEDA_LIMIT) })
+  const res = await fetch(`/api/pacientes/buscar?${params.toString()}`, { credentials: 'include' })
+  if (res.status === 401 || res.status === 403) throw { status: res.status }
+  if (!res.ok) throw new Error('Error fetching pacientes')
+  return { pacientes: await res.json(), next: null }
 }
 
 async function createPaciente(payload: Partial<Paciente>) {
@@ -72,7 +90,6 @@ async function patchPaciente(id: number, payload: any) {
 
 export default function PacientesPage() {
   const qc = useQueryClient()
-  const { data, isLoading, isError } = useQuery(['pacientes'], fetchPacientes, { retry: false })
   const meQuery = useMe()
   const me = meQuery.data as any | undefined
 
@@ -100,12 +117,29 @@ export default function PacientesPage() {
     return () => clearTimeout(t)
   }, [toast])
 
-  // pagination for pacientes listing
+  // pagination for pacientes listing: cursores[i] es el cursor de la página i+1 (el de la 1 es null)
   const [patientPage, setPatientPage] = React.useState(1)
-  const PATIENTS_PAGE_SIZE = 10
-  const [openFilter, setOpenFilter] = React.useState<string | null>(null)
-  const [tempValue, setTempValue] = React.useState<string>('')
-  const [filters, setFilters] = React.useState<{ nombre?: string; telefono?: string; dni?: string; cuil?: string }>({})
+  const [cursores, setCursores] = React.useState<Array<string | null>>([null])
+  // una sola búsqueda (el backend no distingue campos): texto es lo que se está escribiendo, busqueda lo aplicado
+  const [texto, setTexto] = React.useState('')
+  const [busqueda, setBusqueda] = React.useState('')
+
+  const q = busqueda.trim()
+  const { data, isLoading, isError, isPreviousData } = useQuery(
+    ['pacientes', q, q ? 1 : patientPage],
+    () => (q ? buscarPacientes(q) : fetchPacientesPagina(cursores[patientPage - 1] ?? null)),
+    { retry: false, keepPreviousData: true },
+  )
+
+  React.useEffect(() => {
+    // isPreviousData: mientras llega la página nueva, data sigue siendo la anterior (su cursor no es el de esta)
+    if (q || !data || isPreviousData) return
+    setCursores(prev => {
+      const copy = prev.slice(0, patientPage)
+      if (data.next) copy.push(data.next)
+      return copy
+    })
+  }, [data, q, patientPage, isPreviousData])
 
   const onCreate = async (vals: any) => {
     try {
@@ -202,109 +236,43 @@ export default function PacientesPage() {
 
       <section>
         <h2 className="font-semibold mb-2">Listado</h2>
+        <form onSubmit={(e) => { e.preventDefault(); setBusqueda(texto.trim()); setPatientPage(1) }} className="mb-1 flex items-center gap-2 max-w-xl">
+          <input value={texto} onChange={(e) => setTexto(e.target.value)} maxLength={100} placeholder="Buscar por nombre, DNI, CUIL o teléfono" className="border p-2 rounded flex-1" />
+          <button type="submit" className="px-3 py-2 bg-blue-600 text-white rounded">Buscar</button>
+          {q && <button type="button" onClick={() => { setTexto(''); setBusqueda(''); setPatientPage(1) }} className="px-2 py-2 text-sm bg-red-100 text-red-700 rounded">Limpiar</button>}
+        </form>
+        <div className="mb-3 text-xs text-gray-500">Cada palabra tiene que ser el comienzo de una palabra del nombre, DNI, CUIL o teléfono.</div>
         {isLoading && <div>Cargando...</div>}
         {isError && <div className="text-red-600">Error al cargar pacientes</div>}
-        {data && data.length === 0 && <div className="text-gray-600">No hay pacientes.</div>}
-        {/* Active filters summary */}
-        {Object.values(filters).some(v => v !== undefined && v !== null && v !== '') && (
-          <div className="mb-3 flex flex-wrap items-center gap-2">
-            {Object.entries(filters).filter(([k, v]) => v !== undefined && v !== null && v !== '').map(([k, v]) => {
-              const label = k === 'nombre' ? 'Nombre'
-                : k === 'telefono' ? 'Teléfono'
-                : k === 'dni' ? 'DNI'
-                : k === 'cuil' ? 'CUIL' : k
-              const display = String(v)
-              return (
-                <div key={k} className="flex items-center bg-gray-100 border rounded px-2 py-1 text-sm">
-                  <span className="font-medium mr-2">{label}:</span>
-                  <span className="mr-2 text-gray-700">{display}</span>
-                  <button title="Quitar filtro" onClick={() => { setFilters((prev:any) => { const copy = { ...prev }; delete copy[k]; return copy }) ; setPatientPage(1) }} className="text-gray-500 hover:text-gray-800">✕</button>
-                </div>
-              )
-            })}
-            <button onClick={() => { setFilters({}); setPatientPage(1) }} className="ml-2 px-2 py-1 text-sm bg-red-100 text-red-700 rounded">Limpiar filtros</button>
-          </div>
-        )}
-
-        {data && data.length > 0 && (() => {
-          // apply client-side filters
-          const filtered = data.filter((p: any) => {
-            if (filters.nombre && !(p.nombre || '').toLowerCase().includes(filters.nombre.toLowerCase())) return false
-            if (filters.telefono && !(p.telefono || '').toLowerCase().includes(filters.telefono.toLowerCase())) return false
-            if (filters.dni && !((p.dni || '').toLowerCase().includes(filters.dni.toLowerCase()))) return false
-            if (filters.cuil && !((p.cuil || '').toLowerCase().includes(filters.cuil.toLowerCase()))) return false
-            return true
-          })
-          const total = filtered.length
+        {data && data.pacientes.length === 0 && <div className="text-gray-600">{q ? 'No hay pacientes que coincidan.' : 'No hay pacientes.'}</div>}
+        {data && data.pacientes.length > 0 && (() => {
+          // con búsqueda: hasta BUSQUEDA_LIMIT resultados, paginados acá; sin búsqueda: la página que mandó el backend
+          const total = data.pacientes.length
           const totalPages = Math.max(1, Math.ceil(total / PATIENTS_PAGE_SIZE))
-          const start = total === 0 ? 0 : (patientPage - 1) * PATIENTS_PAGE_SIZE + 1
-          const end = Math.min(patientPage * PATIENTS_PAGE_SIZE, total)
-          const paginated = filtered.slice((patientPage - 1) * PATIENTS_PAGE_SIZE, patientPage * PATIENTS_PAGE_SIZE)
+          const paginated = q ? data.pacientes.slice((patientPage - 1) * PATIENTS_PAGE_SIZE, patientPage * PATIENTS_PAGE_SIZE) : data.pacientes
+          const haySiguiente = q ? patientPage < totalPages : !!data.next
+          const start = (patientPage - 1) * PATIENTS_PAGE_SIZE + 1
+          const end = start + paginated.length - 1
           return (
             <>
               <div className="mb-2 flex items-center justify-between">
-                <div className="text-sm text-gray-600">Mostrando {start}-{end} de {total}</div>
+                <div className="text-sm text-gray-600">
+                  {q
+                    ? <>Mostrando {start}-{end} de {total}{total >= BUSQUEDA_LIMIT && ' (refiná la búsqueda para ver más)'}</>
+                    : <>Mostrando {start}-{end}</>}
+                </div>
                 <div className="flex items-center gap-2">
                   <button disabled={patientPage <= 1} onClick={() => setPatientPage(p => Math.max(1, p - 1))} className="px-2 py-1 bg-gray-200 rounded">Anterior</button>
-                  <div className="text-sm">Página {patientPage} / {totalPages}</div>
-                  <button disabled={patientPage >= totalPages} onClick={() => setPatientPage(p => Math.min(totalPages, p + 1))} className="px-2 py-1 bg-gray-200 rounded">Siguiente</button>
+                  <div className="text-sm">Página {patientPage}{q && ` / ${totalPages}`}</div>
+                  <button disabled={!haySiguiente} onClick={() => setPatientPage(p => p + 1)} className="px-2 py-1 bg-gray-200 rounded">Siguiente</button>
                 </div>
               </div>
               <table className="w-full table-auto border-collapse">
                 <thead>
                   <tr className="text-left">
-                    <th className="border p-2 relative">Nombre
-                      <button onClick={() => { setTempValue(filters.nombre || ''); setOpenFilter('nombre') }} title="Filtrar nombre" className="ml-2 text-gray-500 hover:text-gray-800">
-                        <svg xmlns="http://www.w3.org/2000/svg" className="h-4 w-4 inline" viewBox="0 0 24 24" fill="none" stroke="currentColor">
-                          <path strokeWidth="2" strokeLinecap="round" strokeLinejoin="round" d="M3 4a1 1 0 0 1 1-1h16a1 1 0 0 1 1 1v2a1 1 0 0 1-.293.707L14 14.414V19a1 1 0 0 1-.553.894l-4 2A1 1 0 0 1 8 21v-6.586L3.293 6.707A1 1 0 0 1 3 6V4z" />
-                        </svg>
-                      </button>
-                      {openFilter === 'nombre' && (
-                        <div data-filter="nombre" className="absolute z-50 bg-white border rounded p-3 shadow mt-2" style={{ minWidth: 220 }}>
-                          <div className="mb-2 text-sm font-medium">Filtrar por Nombre</div>
-                          <input className="w-full border p-1 rounded mb-2" value={tempValue} onChange={(e)=>setTempValue(e.target.value)} placeholder="Nombre o parte" />
-                          <div className="flex gap-2 justify-end">
-                            <button className="px-2 py-1 bg-gray-200 rounded" onClick={() => { setFilters(prev=>{ const c = { ...prev }; delete c.nombre; return c }); setOpenFilter(null) }}>Limpiar</button>
-                            <button className="px-2 py-1 bg-blue-600 text-white rounded" onClick={() => { setFilters(prev=>({ ...prev, nombre: tempValue || undefined })); setPatientPage(1); setOpenFilter(null) }}>Aplicar</button>
-                          </div>
-                        </div>
-                      )}
-                    </th>
-                    <th className="border p-2 relative">Teléfono
-                      <button onClick={() => { setTempValue(filters.telefono || ''); setOpenFilter('telefono') }} title="Filtrar teléfono" className="ml-2 text-gray-500 hover:text-gray-800">
-                        <svg xmlns="http://www.w3.org/2000/svg" className="h-4 w-4 inline" viewBox="0 0 24 24" fill="none" stroke="currentColor">
-                          <path strokeWidth="2" strokeLinecap="round" strokeLinejoin="round" d="M3 4a1 1 0 0 1 1-1h16a1 1 0 0 1 1 1v2a1 1 0 0 1-.293.707L14 14.414V19a1 1 0 0 1-.553.894l-4 2A1 1 0 0 1 8 21v-6.586L3.293 6.707A1 1 0 0 1 3 6V4z" />
-                        </svg>
-                      </button>
-                      {openFilter === 'telefono' && (
-                        <div data-filter="telefono" className="absolute z-50 bg-white border rounded p-3 shadow mt-2" style={{ minWidth: 220 }}>
-                          <div className="mb-2 text-sm font-medium">Filtrar por Teléfono</div>
-                          <input className="w-full border p-1 rounded mb-2" value={tempValue} onChange={(e)=>setTempValue(e.target.value)} placeholder="Teléfono o parte" />
-                          <div className="flex gap-2 justify-end">
-                            <button className="px-2 py-1 bg-gray-200 rounded" onClick={() => { setFilters(prev=>{ const c = { ...prev }; delete c.telefono; return c }); setOpenFilter(null) }}>Limpiar</button>
-                            <button className="px-2 py-1 bg-blue-600 text-white rounded" onClick={() => { setFilters(prev=>({ ...prev, telefono: tempValue || undefined })); setPatientPage(1); setOpenFilter(null) }}>Aplicar</button>
-                          </div>
-                        </div>
-                      )}
-                    </th>
-                    <th className="border p-2 relative">DNI / CUIL
-                      <button onClick={() => { setTempValue(filters.dni || ''); setOpenFilter('dni') }} title="Filtrar dni" className="ml-2 text-gray-500 hover:text-gray-800">
-                        <svg xmlns="http://www.w3.org/2000/svg" className="h-4 w-4 inline" viewBox="0 0 24 24" fill="none" stroke="currentColor">
-                          <path strokeWidth="2" strokeLinecap="round" strokeLinejoin="round" d="M3 4a1 1 0 0 1 1-1h16a1 1 0 0 1 1 1v2a1 1 0 0 1-.293.707L14 14.414V19a1 1 0 0 1-.553.894l-4 2A1 1 0 0 1 8 21v-6.586L3.293 6.707A1 1 0 0 1 3 6V4z" />
-                        </svg>
-                      </button>
-                      {openFilter === 'dni' && (
-                        <div data-filter="dni" className="absolute z-50 bg-white border rounded p-3 shadow mt-2" style={{ minWidth: 220 }}>
-                          <div className="mb-2 text-sm font-medium">Filtrar por DNI</div>
-                          <input className="w-full border p-1 rounded mb-2" value={tempValue} onChange={(e)=>setTempValue(e.target.value)} placeholder="DNI o parte" />
-                          <div className="flex gap-2 justify-end">
-                            <button className="px-2 py-1 bg-gray-200 rounded" onClick={() => { setFilters(prev=>{ const c = { ...prev }; delete c.dni; return c }); setOpenFilter(null) }}>Limpiar</button>
-                            <button className="px-2 py-1 bg-blue-600 text-white rounded" onClick={() => { setFilters(prev=>({ ...prev, dni: tempValue || undefined })); setPatientPage(1); setOpenFilter(null) }}>Aplicar</button>
-                          </div>
-                        </div>
-                      )}
-                      <div className="mt-1 text-xs text-gray-500">(también filtra CUIL)</div>
-                    </th>
+                    <th className="border p-2">Nombre</th>
+                    <th className="border p-2">Teléfono</th>
+                    <th className="border p-2">DNI / CUIL</th>
                     <th className="border p-2">Activo</th>
                     <th className="border p-2">Acciones</th>
                   </tr>
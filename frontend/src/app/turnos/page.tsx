@@ -218,6 +218,9 @@ export default function TurnosPage() {
   const [profesionalSelected, setProfesionalSelected] = React.useState<{ id: number; nombre: string } | null>(null)
   const [openList, setOpenList] = React.useState<string | null>(null)
   const [pacientePage, setPacientePage] = React.useState(1)
+  // listado completo de pacientes paginado por cursor: cursores[i] es el de la página i+1 (el de la 1 es null)
+  const [pacientesPagina, setPacientesPagina] = React.useState<Array<{ id: number; nombre: string; dni?: string }>>([])
+  const [pacienteCursores, setPacienteCursores] = React.useState<Array<string | null>>([null])
   const [profesionalPage, setProfesionalPage] = React.useState(1)
   const ITEMS_PER_PAGE = 5
   const [showPacienteSuggestions, setShowPacienteSuggestions] = React.useState(false)
@@ -278,12 +281,7 @@ export default function TurnosPage() {
   }
 
   React.useEffect(() => {
-    // fetch pacientes and profesionales lists once (simple approach)
-    fetch('/api/pacientes', { credentials: 'include' }).then(async (res) => {
-      if (!res.ok) return
-      const j = await res.json()
-      setPacientesList(j.map((p: any) => ({ id: p.id, nombre: p.nombre, dni: p.dni })))
-    }).catch(() => {})
+    // profesionales: son pocos, se traen una vez (los pacientes se buscan a medida que se escribe)
     fetch('/api/profesionales', { credentials: 'include' }).then(async (res) => {
       if (!res.ok) return
       const j = await res.json()
@@ -291,6 +289,43 @@ export default function TurnosPage() {
     }).catch(() => {})
   }, [])
 
+  // autocompletar pacientes: busca en el backend (por nombre, DNI, CUIL o teléfono) con un pequeño debounce
+  React.useEffect(() => {
+    const q = pacienteQuery.trim()
+    if (!q || pacienteSelected) {
+      setPacientesList([])
+      return
+    }
+    const ctrl = new AbortController()
+    const timer = setTimeout(() => {
+      fetch(`/api/pacientes/buscar?q=${encodeURIComponent(q)}&limit=10`, { credentials: 'include', signal: ctrl.signal }).then(async (res) => {
+        if (!res.ok) return
+        const j = await res.json()
+        setPacientesList(j.map((p: any) => ({ id: p.id, nombre: p.nombre, dni: p.dni })))
+      }).catch(() => {})
+    }, 200)
+    return () => { clearTimeout(timer); ctrl.abort() }
+  }, [pacienteQuery, pacienteSelected])
+
+  // "ver todos los pacientes": trae solo la página abierta
+  React.useEffect(() => {
+    if (openList !== 'paciente') return
+    const cursor = pacienteCursores[pacientePage - 1]
+    const params = new URLSearchParams({ limit: String(ITEMS_PER_PAGE) })
+    if (cursor) params.set('cursor', cursor)
+    fetch(`/api/pacientes?${params.toString()}`, { credentials: 'include' }).then(async (res) => {
+      if (!res.ok) return
+      const j = await res.json()
+      setPacientesPagina(j.map((p: any) => ({ id: p.id, nombre: p.nombre, dni: p.dni })))
+      const next = res.headers.get('X-Next-Cursor')
+      setPacienteCursores(prev => {
+        const copy = prev.slice(0, pacientePage)
+        if (next) copy.push(next)
+        return copy
+      })
+    }).catch(() => {})
+  }, [openList, pacientePage])
+
   // close popups when clicking outside
   React.useEffect(() => {
     function onDocClick(e: MouseEvent) {
@@ -329,8 +364,9 @@ export default function TurnosPage() {
       let finalPaciente = pacienteSelected
       let finalProfesional = profesionalSelected
       if (!finalPaciente && pacienteQuery) {
+        // pacientesList tiene los resultados de la búsqueda de lo que se escribió (ya ordenados por relevancia)
         const exact = pacientesList.find(p => p.nombre.toLowerCase() === pacienteQuery.toLowerCase())
-        finalPaciente = exact ?? pacientesList.find(p => p.nombre.toLowerCase().includes(pacienteQuery.toLowerCase())) ?? null
+        finalPaciente = exact ?? pacientesList[0] ?? null
       }
       if (!finalProfesional && profesionalQuery) {
         const exactP = profesionalesList.find(p => p.nombre.toLowerCase() === profesionalQuery.toLowerCase())
@@ -367,7 +403,7 @@ export default function TurnosPage() {
             <label className="block text-sm">Paciente (nombre)</label>
             <div className="flex items-center">
               <input type="text" value={pacienteSelected ? pacienteSelected.nombre : pacienteQuery} onChange={(e) => { setPacienteQuery(e.target.value); setPacienteSelected(null) }} onFocus={() => setShowPacienteSuggestions(true)} className="flex-1 border p-2 rounded" placeholder="Buscar paciente por nombre" />
-              <button type="button" title="Ver todos los pacientes" onClick={() => { setOpenList('paciente'); setPacientePage(1) }} className="ml-2 p-2 text-gray-600 hover:text-gray-900">
+              <button type="button" title="Ver todos los pacientes" onClick={() => { setOpenList('paciente'); setPacientePage(1); setPacienteCursores([null]) }} className="ml-2 p-2 text-gray-600 hover:text-gray-900">
                 <svg xmlns="http://www.w3.org/2000/svg" className="h-5 w-5" viewBox="0 0 24 24" fill="none" stroke="currentColor">
                   <circle cx="11" cy="11" r="7" strokeWidth="2" />
                   <path d="M21 21l-4.35-4.35" strokeWidth="2" strokeLinecap="round" />
@@ -376,7 +412,7 @@ export default function TurnosPage() {
             </div>
             {pacienteQuery.length > 0 && !pacienteSelected && showPacienteSuggestions && (
               <div className="absolute z-40 bg-white border rounded mt-1 w-full max-h-48 overflow-auto">
-                {pacientesList.filter(p => p.nombre.toLowerCase().includes(pacienteQuery.toLowerCase())).map(p => (
+                {pacientesList.map(p => (
                       <div key={p.id} className="p-2 hover:bg-gray-100 cursor-pointer" onClick={() => { setPacienteSelected(p); setPacienteQuery(p.nombre) }}>
                         {p.nombre} <span className="text-xs text-gray-500">{p.dni ?? '-'}</span>
                       </div>
@@ -389,7 +425,7 @@ export default function TurnosPage() {
               <div data-popup="paciente" className="absolute z-50 bg-white border rounded p-3 shadow mt-2" style={{ minWidth: 320 }}>
                 <div className="mb-2 font-medium">Pacientes (página {pacientePage})</div>
                 <div className="max-h-48 overflow-auto">
-                  {pacientesList.slice((pacientePage-1)*ITEMS_PER_PAGE, pacientePage*ITEMS_PER_PAGE).map(p => (
+                  {pacientesPagina.map(p => (
                     <div key={p.id} className="p-2 hover:bg-gray-100 cursor-pointer flex justify-between" onClick={() => { setPacienteSelected(p); setPacienteQuery(p.nombre); setOpenList(null) }}>
                       <div>{p.nombre}</div>
                       <div className="text-xs text-gray-500">DNI: {p.dni ?? '-'}</div>
@@ -398,8 +434,7 @@ export default function TurnosPage() {
                 </div>
                 <div className="mt-2 flex justify-between">
                   <button disabled={pacientePage <= 1} className="px-2 py-1 bg-gray-200 rounded" onClick={() => setPacientePage(p => Math.max(1, p-1))}>Anterior</button>
-                  <div className="text-sm text-gray-600">{Math.max(1, Math.ceil(pacientesList.length / ITEMS_PER_PAGE))} páginas</div>
-                  <button disabled={pacientePage >= Math.ceil(pacientesList.length / ITEMS_PER_PAGE)} className="px-2 py-1 bg-gray-200 rounded" onClick={() => setPacientePage(p => p + 1)}>Siguiente</button>
+                  <button disabled={pacienteCursores.length <= pacientePage} className="px-2 py-1 bg-gray-200 rounded" onClick={() => setPacientePage(p => p + 1)}>Siguiente</button>
                 </div>
               </div>
             )}